@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the CPU time spent by the search controller per minimization, for a
+slow gap function which spends its time waiting (e.g. for an external code).
+"""
+
+import time
+import asyncio
+
+import numpy as np
+
+import nodefinder as nf
+
+DELAY = 0.01
+
+
+async def gap_fct(pos):
+    await asyncio.sleep(DELAY)
+    dx, dy, dz = (np.array(pos) % 1) - 0.5
+    return np.sqrt(dx**2 + dy**2 + dz**2)
+
+
+if __name__ == '__main__':
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    result = nf.search.run(
+        gap_fct,
+        initial_mesh_size=4,
+        refinement_stencil=None,
+        feature_size=0.1,
+        num_minimize_parallel=50,
+    )
+    wall_time = time.perf_counter() - start_wall
+    cpu_time = time.process_time() - start_cpu
+    num_minimizations = len(result.minimization_results)
+    num_fev = sum(res.num_fev for res in result.minimization_results)
+    print('Minimizations:             {}'.format(num_minimizations))
+    print('Function evaluations:      {}'.format(num_fev))
+    print('Wall time:                 {:.2f} s'.format(wall_time))
+    print('CPU time:                  {:.2f} s'.format(cpu_time))
+    print(
+        'CPU time per minimization: {:.2f} ms'.format(
+            1e3 * cpu_time / num_minimizations
+        )
+    )
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the wall time of minimizing the initial mesh for a cheap,
+vectorized gap function, with and without the lockstep ensemble
+minimization.
+"""
+
+import time
+
+import numpy as np
+
+import nodefinder as nf
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.99, 0.01, 0.0], [0.7, 0.2,
+                                                                0.8]])
+
+
+def batch_gap_fct(positions):
+    deltas = (positions[:, None, :] - NODE_POSITIONS) % 1
+    deltas_periodic = np.minimum(deltas, 1 - deltas)
+    return np.min(np.linalg.norm(deltas_periodic, axis=-1), axis=-1)
+
+
+if __name__ == '__main__':
+    for ensemble_initial_mesh in [False, True]:
+        start = time.perf_counter()
+        result = nf.search.run(
+            batch_gap_fct=batch_gap_fct,
+            initial_mesh_size=10,
+            refinement_stencil=None,
+            num_minimize_parallel=1000,
+            ensemble_initial_mesh=ensemble_initial_mesh,
+        )
+        wall_time = time.perf_counter() - start
+        print(
+            'ensemble_initial_mesh={!s:<5} wall time: {:.2f} s, '
+            'minimizations: {}, evaluations: {}'.format(
+                ensemble_initial_mesh, wall_time,
+                len(result.minimization_results),
+                sum(res.num_fev for res in result.minimization_results)
+            )
+        )
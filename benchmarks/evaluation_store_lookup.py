@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the time per lookup in an :class:`.EvaluationStore` for a growing
+number of stored values.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+import nodefinder as nf
+
+NUM_LOOKUPS = 10000
+TOLERANCE = 1e-10
+
+
+def random_keys(num_keys, random_state):
+    return [
+        tuple(key) for key in random_state.
+        randint(0, int(1 / TOLERANCE), size=(num_keys, 3), dtype=np.int64)
+    ]
+
+
+if __name__ == '__main__':
+    MAX_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    RANDOM_STATE = np.random.RandomState(42)
+    with tempfile.TemporaryDirectory() as dirname:
+        with nf.search.EvaluationStore(
+            os.path.join(dirname, 'evaluations.sqlite'),
+            fingerprint='benchmark',
+            batch_size=10**5
+        ) as store:
+            size = 0
+            target_size = 10**4
+            while target_size <= MAX_SIZE:
+                start = time.perf_counter()
+                for key in random_keys(target_size - size, RANDOM_STATE):
+                    store.add(key, 0., tolerance=TOLERANCE)
+                store.flush()
+                insert_time = (time.perf_counter() -
+                               start) / (target_size - size)
+                size = target_size
+                stored_keys = random_keys(NUM_LOOKUPS, RANDOM_STATE)
+                for key in stored_keys:
+                    store.add(key, 1., tolerance=TOLERANCE)
+                store.flush()
+                size += NUM_LOOKUPS
+                start = time.perf_counter()
+                for key in stored_keys:
+                    assert store.get(key, tolerance=TOLERANCE) == 1.
+                lookup_time = (time.perf_counter() - start) / NUM_LOOKUPS
+                print(
+                    '{:>10} values: {:.2f} us per insert, {:.2f} us per lookup'
+                    .format(size, 1e6 * insert_time, 1e6 * lookup_time)
+                )
+                target_size *= 10
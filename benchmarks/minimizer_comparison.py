@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Compares the number of gap function evaluations per found node of the
+built-in minimizers, for the nodal point, line and surface potentials used
+in the tests. The accuracy is given as the largest distance of a node from
+the nodal feature, and the coverage as the largest distance of a point on
+the feature from the closest node. The Gauss-Newton minimizer is only run
+for the nodal points, where the gradient is known.
+"""
+
+import numpy as np
+
+from nodefinder.search import run
+from nodefinder.search.refinement_stencil import get_mesh_stencil
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.99, 0.01, 0.0], [0.7, 0.2,
+                                                                0.8]])
+
+RADIUS = 0.2
+
+
+def get_deltas(pos):
+    return (np.array(pos) - NODE_POSITIONS + 0.5) % 1 - 0.5
+
+
+def nodal_point_dist(pos):
+    return np.min(np.linalg.norm(get_deltas(pos), axis=-1))
+
+
+def nodal_point_gap(pos):
+    return nodal_point_dist(pos)
+
+
+def nodal_point_gap_with_gradient(pos):
+    deltas = get_deltas(pos)
+    distances = np.linalg.norm(deltas, axis=-1)
+    idx = np.argmin(distances)
+    if distances[idx] == 0:
+        return 0., np.zeros(len(pos))
+    return distances[idx], deltas[idx] / distances[idx]
+
+
+def nodal_line_dist(pos):
+    dx, dy, dz = (np.array(pos) % 1) - 0.5
+    return np.sqrt(np.abs(dx**2 + dy**2 - RADIUS**2) + dz**2)
+
+
+def nodal_line_gap(pos):
+    dx = (pos[0] % 1) - 0.5
+    return nodal_line_dist(pos) * (0.1 + 10 * dx**2)
+
+
+def nodal_surface_dist(pos):
+    return abs((pos[2] % 1) - 0.5)
+
+
+def nodal_surface_gap(pos):
+    dx = (pos[0] % 1) - 0.5
+    return nodal_surface_dist(pos)**2 * (0.1 + 10 * dx**2)
+
+
+PHI = np.linspace(0, 2 * np.pi, 1000, endpoint=False)
+NODAL_LINE_SAMPLES = np.array([
+    0.5 + RADIUS * np.cos(PHI), 0.5 + RADIUS * np.sin(PHI),
+    np.full_like(PHI, 0.5)
+]).T
+
+GRID = np.linspace(0, 1, 50, endpoint=False)
+NODAL_SURFACE_SAMPLES = np.array([[x, y, 0.5] for x in GRID for y in GRID])
+
+CASES = [
+    (
+        'nodal points', nodal_point_gap, nodal_point_dist, NODE_POSITIONS,
+        dict(initial_mesh_size=3)
+    ),
+    (
+        'nodal points (fake potential)', nodal_point_gap, nodal_point_dist,
+        NODE_POSITIONS, dict(initial_mesh_size=3, use_fake_potential=True)
+    ),
+    (
+        'nodal line', nodal_line_gap, nodal_line_dist, NODAL_LINE_SAMPLES,
+        dict(
+            gap_threshold=2e-4,
+            feature_size=0.05,
+            initial_mesh_size=3,
+            use_fake_potential=True
+        )
+    ),
+    (
+        'nodal surface', nodal_surface_gap, nodal_surface_dist,
+        NODAL_SURFACE_SAMPLES,
+        dict(
+            gap_threshold=1e-4,
+            feature_size=0.1,
+            refinement_stencil=get_mesh_stencil(mesh_size=(2, 2, 2)),
+            initial_mesh_size=3
+        )
+    ),
+]
+
+
+def count_evaluations(func):
+    def inner(pos):
+        inner.num_evaluations += 1
+        return func(pos)
+
+    inner.num_evaluations = 0
+    return inner
+
+
+def measure(gap_fct, dist_fct, samples, minimizer, run_kwargs):
+    counting_gap_fct = count_evaluations(gap_fct)
+    result = run(counting_gap_fct, minimizer=minimizer, **run_kwargs)
+    node_positions = [node.pos for node in result.nodes]
+    accuracy = max((dist_fct(pos) for pos in node_positions), default=0.)
+    coverage = max(
+        min((
+            result.coordinate_system.distance(pos, sample)
+            for pos in node_positions
+        ),
+            default=np.inf) for sample in samples
+    )
+    return counting_gap_fct.num_evaluations, len(
+        node_positions
+    ), accuracy, coverage
+
+
+if __name__ == '__main__':
+    for label, gap_fct, dist_fct, samples, run_kwargs in CASES:
+        print(label)
+        minimizers = [
+            ('nelder_mead', gap_fct),
+            ('pattern_search', gap_fct),
+        ]
+        if gap_fct is nodal_point_gap:
+            minimizers.append(('gauss_newton', nodal_point_gap_with_gradient))
+        for minimizer, fct in minimizers:
+            num_evaluations, num_nodes, accuracy, coverage = measure(
+                fct, dist_fct, samples, minimizer, run_kwargs
+            )
+            print(
+                '    {:<16} evaluations: {:>7}, nodes: {:>5}, '
+                'per node: {:>6.1f}, accuracy: {:.1e}, coverage: {:.1e}'.
+                format(
+                    minimizer, num_evaluations, num_nodes,
+                    num_evaluations / max(num_nodes, 1), accuracy, coverage
+                )
+            )
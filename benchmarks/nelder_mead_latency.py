@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the wall time of a single minimization for a slow gap function,
+with and without evaluating the points of a Nelder-Mead iteration
+concurrently.
+"""
+
+import time
+import asyncio
+
+import numpy as np
+
+from nodefinder.search._minimization import run_minimization
+
+DELAY = 0.01
+
+INITIAL_SIMPLEX = np.array([[0.1, 0.1, 0.1], [0.3, 0.1, 0.1], [0.1, 0.3, 0.1],
+                            [0.1, 0.1, 0.3]])
+
+
+async def gap_fct(pos):
+    await asyncio.sleep(DELAY)
+    dx, dy, dz = np.array(pos) - 0.5
+    return np.sqrt(dx**2 + 2 * dy**2 + 3 * dz**2)
+
+
+def measure(**kwargs):
+    start = time.perf_counter()
+    result = asyncio.get_event_loop().run_until_complete(
+        run_minimization(
+            gap_fct,
+            initial_simplex=INITIAL_SIMPLEX,
+            nelder_mead_kwargs=dict(ftol=1e-8, xtol=1e-8, **kwargs)
+        )
+    )
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    for label, kwargs in [
+        ('sequential', dict(parallel_shrink=False)),
+        ('parallel shrink', dict()),
+        ('speculative', dict(speculative=True)),
+    ]:
+        wall_time, result = measure(**kwargs)
+        print(
+            '{:<16} wall time: {:.2f} s, evaluations: {}, iterations: {}'.
+            format(label, wall_time, result.num_fev, result.num_iter)
+        )
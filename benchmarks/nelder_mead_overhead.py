@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the overhead per iteration of the Nelder-Mead algorithm, for a gap
+function which is cheap enough that the time is dominated by the algorithm
+itself.
+"""
+
+import time
+import asyncio
+
+import numpy as np
+
+from nodefinder.search._minimization._nelder_mead import root_nelder_mead
+
+NUM_RUNS = 100
+
+
+async def gap_fct(pos):
+    return abs(pos[0]) + 2 * abs(pos[1]) + 3 * abs(pos[-1])
+
+
+def measure(dim, **kwargs):
+    """
+    Get the average time per iteration of a series of minimizations.
+    """
+    initial_simplex = np.concatenate([np.zeros((1, dim)), np.eye(dim)]) + 0.1
+    loop = asyncio.get_event_loop()
+    num_iter = 0
+    num_fev = 0
+    start = time.perf_counter()
+    for _ in range(NUM_RUNS):
+        result = loop.run_until_complete(
+            root_nelder_mead(
+                gap_fct,
+                initial_simplex=initial_simplex,
+                xtol=1e-12,
+                ftol=1e-12,
+                **kwargs
+            )
+        )
+        num_iter += result.num_iter
+        num_fev += result.num_fev
+    return (time.perf_counter() - start) / num_iter, num_iter / NUM_RUNS
+
+
+if __name__ == '__main__':
+    for dim in [2, 3, 6]:
+        for label, kwargs in [
+            ('default', dict()),
+            ('fprime_cutoff', dict(fprime_cutoff=1e10)),
+            ('no history', dict(keep_history=False)),
+        ]:
+            time_per_iter, num_iter = measure(dim, **kwargs)
+            print(
+                'dim {}, {:<14} time per iteration: {:.1f} us, '
+                'iterations: {:.0f}'.format(
+                    dim, label, 1e6 * time_per_iter, num_iter
+                )
+            )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the time per gap evaluation of sparse lattice Hamiltonians of
+growing size, for the full diagonalization with :class:`.gap.HamiltonianGap`
+and the partial spectrum with :class:`.gap.ShiftInvertGap`. The positions
+are taken along a short path, as in a Nelder-Mead minimization.
+"""
+
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+import nodefinder as nf
+
+NUM_POSITIONS = 10
+LATTICE_SIZES = [6, 8, 10, 12]
+
+
+def create_hamiltonian(lattice_size):
+    """
+    Create the Hamiltonian of a cubic lattice with random on-site energies,
+    where the hopping depends on the position.
+    """
+    hopping = sp.diags([1, 1], [-1, 1], shape=(lattice_size, lattice_size))
+    identity = sp.identity(lattice_size)
+    hoppings = [
+        sp.kron(sp.kron(hopping, identity), identity),
+        sp.kron(sp.kron(identity, hopping), identity),
+        sp.kron(sp.kron(identity, identity), hopping),
+    ]
+    onsite = sp.diags(
+        np.random.RandomState(42).uniform(-1, 1, size=lattice_size**3)
+    )
+
+    def hamiltonian(pos):
+        return (
+            sum(np.cos(2 * np.pi * k) * h
+                for k, h in zip(pos, hoppings)) + onsite
+        ).tocsc()
+
+    return hamiltonian
+
+
+def measure(gap_fct, positions):
+    start = time.perf_counter()
+    values = [gap_fct(pos) for pos in positions]
+    return (time.perf_counter() - start) / len(positions), np.array(values)
+
+
+if __name__ == '__main__':
+    POSITIONS = 0.1 + 1e-3 * np.random.RandomState(0).uniform(
+        size=(NUM_POSITIONS, 3)
+    )
+    for lattice_size in LATTICE_SIZES:
+        hamiltonian = create_hamiltonian(lattice_size)
+        num_orbitals = lattice_size**3
+        full_time, full_values = measure(
+            nf.gap.HamiltonianGap(
+                lambda pos: hamiltonian(pos).toarray(),
+                band_index=num_orbitals // 2 - 1
+            ), POSITIONS
+        )
+        times = []
+        for warm_start in [False, True]:
+            partial_time, partial_values = measure(
+                nf.gap.ShiftInvertGap(
+                    hamiltonian,
+                    energy=np.mean(
+                        np.linalg.eigvalsh(
+                            hamiltonian(POSITIONS[0]).toarray()
+                        )[num_orbitals // 2 - 1:num_orbitals // 2 + 1]
+                    ),
+                    warm_start=warm_start
+                ), POSITIONS
+            )
+            assert np.allclose(partial_values, full_values)
+            times.append(partial_time)
+        print(
+            '{:>5} orbitals: full {:9.1f} ms, shift-invert {:7.1f} ms, '
+            'with warm start {:7.1f} ms'.format(
+                num_orbitals, 1e3 * full_time, *(1e3 * t for t in times)
+            )
+        )
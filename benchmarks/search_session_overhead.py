@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the wall time per search for a sweep of many small searches, with
+separate calls to :func:`.search.run` and within a :class:`.SearchSession`.
+"""
+
+import time
+
+import numpy as np
+
+import nodefinder as nf
+
+NUM_SEARCHES = 100
+
+
+def gap_fct(pos, *, node_position):
+    return np.linalg.norm(np.array(pos) - node_position)
+
+
+def run_sweep(run_fct):
+    start = time.perf_counter()
+    for offset in np.linspace(0.1, 0.9, NUM_SEARCHES):
+        run_fct(
+            lambda pos: gap_fct(pos, node_position=offset),
+            initial_mesh_size=1,
+            num_minimize_parallel=1,
+            nelder_mead_kwargs=dict(maxfev=4),
+        )
+    return (time.perf_counter() - start) / NUM_SEARCHES
+
+
+if __name__ == '__main__':
+    print(
+        'search.run:     {:.2f} ms per search'.format(
+            1e3 * run_sweep(nf.search.run)
+        )
+    )
+    with nf.search.SearchSession() as session:
+        print(
+            'SearchSession:  {:.2f} ms per search'.format(
+                1e3 * run_sweep(session.run)
+            )
+        )
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Measures the time per gap evaluation of random tight-binding models, for the
+naive loop over the hopping matrices and for the
+:class:`.gap.TightBindingHamiltonian`, evaluated per k-point and in batches.
+"""
+
+import time
+
+import numpy as np
+
+import nodefinder as nf
+
+NUM_POSITIONS = 200
+BATCH_SIZE = 100
+# Number of orbitals and maximum hopping distance of the models.
+MODEL_SIZES = [(4, 1), (16, 2), (64, 2)]
+
+
+def random_hoppings(num_orbitals, max_distance, random_state):
+    hoppings = dict()
+    distances = range(-max_distance, max_distance + 1)
+    for R in np.array(np.meshgrid(distances, distances,
+                                  distances)).reshape(3, -1).T:
+        R = tuple(R)
+        minus_R = tuple(-x for x in R)
+        if minus_R in hoppings:
+            hoppings[R] = hoppings[minus_R].conj().T
+        else:
+            matrix = random_state.normal(
+                size=(num_orbitals, num_orbitals)
+            ) + 1j * random_state.normal(size=(num_orbitals, num_orbitals))
+            if R == minus_R:
+                matrix += matrix.conj().T
+            hoppings[R] = matrix
+    return hoppings
+
+
+def naive_gap(k, hoppings, band_index):
+    hamiltonian = sum(
+        np.exp(2j * np.pi * np.dot(k, R)) * hopping_matrix
+        for R, hopping_matrix in hoppings.items()
+    )
+    eigenvalues = np.linalg.eigvalsh(hamiltonian)
+    return eigenvalues[band_index + 1] - eigenvalues[band_index]
+
+
+def measure(func, positions):
+    start = time.perf_counter()
+    values = func(positions)
+    return (time.perf_counter() - start) / len(positions), np.array(values)
+
+
+if __name__ == '__main__':
+    RANDOM_STATE = np.random.RandomState(42)
+    POSITIONS = RANDOM_STATE.uniform(size=(NUM_POSITIONS, 3))
+    for num_orbitals, max_distance in MODEL_SIZES:
+        hoppings = random_hoppings(num_orbitals, max_distance, RANDOM_STATE)
+        band_index = num_orbitals // 2 - 1
+        gap = nf.gap.HamiltonianGap(
+            nf.gap.TightBindingHamiltonian(hoppings),
+            vectorized=True,
+            band_index=band_index
+        )
+        naive_time, naive_values = measure(
+            lambda positions:
+            [naive_gap(k, hoppings, band_index) for k in positions], POSITIONS
+        )
+        scalar_time, scalar_values = measure(
+            lambda positions: [gap(k) for k in positions], POSITIONS
+        )
+        batch_time, batch_values = measure(
+            lambda positions: np.concatenate([
+                gap.batch(positions[i:i + BATCH_SIZE])
+                for i in range(0, len(positions), BATCH_SIZE)
+            ]), POSITIONS
+        )
+        assert np.allclose(naive_values, scalar_values)
+        assert np.allclose(naive_values, batch_values)
+        print(
+            '{:>3} orbitals, {:>3} hoppings: naive {:8.1f} us, '
+            'scalar {:8.1f} us, batch {:8.1f} us per k-point'.format(
+                num_orbitals, len(hoppings), 1e6 * naive_time,
+                1e6 * scalar_time, 1e6 * batch_time
+            )
+        )
@@ -10,7 +10,8 @@ __version__ = '0.1.1'
 from . import coordinate_system
 from . import search
 from . import identify
+from . import gap
 from . import io
 from . import _logging
 
-__all__ = ['search', 'identify', 'io', 'coordinate_system']
+__all__ = ['search', 'identify', 'gap', 'io', 'coordinate_system']
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Submodule with helpers for creating gap functions from Hamiltonians, which
+can be used with the :mod:`.search` submodule.
+"""
+
+from ._hamiltonian import *
+from ._tight_binding import *
+from ._shift_invert import *
+
+__all__ = _hamiltonian.__all__ + _tight_binding.__all__ + _shift_invert.__all__  # pylint: disable=undefined-variable
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the gap function between two bands of a Hamiltonian.
+"""
+
+from functools import partial
+
+import numpy as np
+from fsc.export import export
+
+
+@export
+class HamiltonianGap:
+    """
+    Gap function given by the difference between the eigenvalues of two
+    neighbouring bands of a Hamiltonian. Instances can be passed directly as
+    ``gap_fct`` to :func:`.search.run`, and their :meth:`batch` method as
+    ``batch_gap_fct``.
+
+    The Hamiltonian is given either as a function of the position, or as a
+    list of ``terms``, each consisting of a coefficient and a constant
+    matrix. The constant matrices are stored in a single array, such that
+    the Hamiltonians for a batch of positions are computed by a single
+    matrix product, and diagonalized by a single call to
+    :func:`numpy.linalg.eigvalsh`.
+
+    Arguments
+    ---------
+    hamiltonian : collections.abc.Callable
+        Function which takes a position and returns the Hamiltonian matrix.
+        If ``vectorized`` is set, it instead takes an array of positions with
+        shape (N, dim) and returns an array of N Hamiltonians.
+    terms : list(tuple)
+        Terms ``(coefficient, matrix)`` whose sum is the Hamiltonian. The
+        ``coefficient`` is either a number, or a function which takes an
+        array of positions with shape (N, dim) and returns N values. Cannot
+        be used together with ``hamiltonian``.
+    band_index : int or list(int)
+        Index of the lower of the two bands, counting from zero. The gap is
+        the difference between the eigenvalues ``band_index + 1`` and
+        ``band_index``, in ascending order. If a list of indices is given,
+        the gap function is vector-valued and returns the gap for each
+        index, from a single diagonalization. It can then be used with the
+        ``num_channels`` option of :func:`.search.run`.
+    vectorized : bool
+        Indicates whether the ``hamiltonian`` function takes an array of
+        positions.
+    hamiltonian_gradient : collections.abc.Callable
+        Function which takes a position and returns the derivatives of the
+        Hamiltonian with respect to each coordinate, as an array of shape
+        (dim, num_bands, num_bands). It takes an array of positions if
+        ``vectorized`` is set or ``terms`` are given. This is needed only for
+        :meth:`value_and_gradient`.
+    """
+    def __init__(
+        self,
+        hamiltonian=None,
+        *,
+        terms=None,
+        band_index,
+        vectorized=False,
+        hamiltonian_gradient=None
+    ):
+        if (hamiltonian is None) == (terms is None):
+            raise ValueError(
+                "Exactly one of 'hamiltonian' and 'terms' must be given."
+            )
+        self._band_indices = np.array(band_index, dtype=int, ndmin=1)
+        if self._band_indices.ndim != 1 or len(self._band_indices) == 0:
+            raise ValueError(
+                "The 'band_index' must be an integer or a non-empty list of "
+                "integers, got {}.".format(band_index)
+            )
+        if np.any(self._band_indices < 0):
+            raise ValueError(
+                "The 'band_index' must not be negative, got {}.".
+                format(band_index)
+            )
+        self.band_index = band_index
+        self._is_scalar = np.ndim(band_index) == 0
+        if terms is not None:
+            terms = list(terms)
+            if not terms:
+                raise ValueError("The 'terms' must not be empty.")
+            coefficients, matrices = zip(*terms)
+            self._coefficients = list(coefficients)
+            matrices = np.array(matrices)
+            self._matrix_shape = matrices.shape[1:]
+            self._check_band_index(self._matrix_shape[-1])
+            self._matrices = np.ascontiguousarray(
+                matrices.reshape(len(terms), -1)
+            )
+            self._hamiltonian = self._sum_terms
+        elif vectorized:
+            self._hamiltonian = hamiltonian
+        else:
+            self._hamiltonian = partial(self._map_scalar, hamiltonian)
+        if hamiltonian_gradient is None or vectorized or terms is not None:
+            self._hamiltonian_gradient = hamiltonian_gradient
+        else:
+            self._hamiltonian_gradient = partial(
+                self._map_scalar, hamiltonian_gradient
+            )
+
+    @staticmethod
+    def _map_scalar(fct, positions):
+        """
+        Evaluate a function which takes a single position for an array of
+        positions. This is used instead of a lambda, such that the instance
+        can be pickled.
+        """
+        return np.array([fct(pos) for pos in positions])
+
+    def _check_band_index(self, num_bands):
+        if np.max(self._band_indices) + 1 >= num_bands:
+            raise ValueError(
+                "The 'band_index' {} is out of range for a Hamiltonian with {} bands."
+                .format(self.band_index, num_bands)
+            )
+
+    def _sum_terms(self, positions):
+        num_positions = len(positions)
+        coefficients = np.empty((num_positions, len(self._coefficients)),
+                                dtype=np.result_type(float, self._matrices))
+        for i, coeff in enumerate(self._coefficients):
+            coefficients[:, i] = coeff(positions) if callable(coeff) else coeff
+        return (coefficients @ self._matrices).reshape((num_positions, ) +
+                                                       self._matrix_shape)
+
+    def hamiltonians(self, positions):
+        """
+        Get the Hamiltonians for an array of positions.
+
+        Arguments
+        ---------
+        positions : numpy.ndarray
+            Array of positions with shape (N, dim).
+
+        Returns
+        -------
+        numpy.ndarray :
+            Array of Hamiltonians with shape (N, num_bands, num_bands).
+        """
+        return self._hamiltonian(np.asarray(positions, dtype=float))
+
+    def batch(self, positions):
+        """
+        Vectorized gap function, which takes an array of positions with
+        shape (N, dim) and returns an array of N gap values, or of shape
+        (N, num_channels) if a list of band indices is given.
+        """
+        eigenvalues = np.linalg.eigvalsh(self.hamiltonians(positions))
+        self._check_band_index(eigenvalues.shape[-1])
+        gaps = eigenvalues[:, self._band_indices +
+                           1] - eigenvalues[:, self._band_indices]
+        if self._is_scalar:
+            return gaps[:, 0]
+        return gaps
+
+    def __call__(self, pos):
+        gaps = self.batch(np.asarray(pos, dtype=float)[np.newaxis])[0]
+        if self._is_scalar:
+            return float(gaps)
+        return gaps
+
+    def batch_value_and_gradient(self, positions):
+        """
+        Vectorized version of :meth:`value_and_gradient`, which takes an
+        array of positions with shape (N, dim) and returns a tuple of the N
+        gap values and their gradients with shape (N, dim). If a list of
+        band indices is given, the shapes are (N, num_channels) and
+        (N, num_channels, dim).
+        """
+        if self._hamiltonian_gradient is None:
+            raise ValueError(
+                "The 'hamiltonian_gradient' must be given to compute the "
+                "gradient of the gap."
+            )
+        positions = np.asarray(positions, dtype=float)
+        eigenvalues, eigenvectors = np.linalg.eigh(
+            self.hamiltonians(positions)
+        )
+        self._check_band_index(eigenvalues.shape[-1])
+        hamiltonian_gradients = np.asarray(
+            self._hamiltonian_gradient(positions)
+        )
+
+        def get_band_gradients(band_indices):
+            vectors = eigenvectors[:, :, band_indices]
+            return np.einsum(
+                'nac,ndab,nbc->ncd',
+                vectors.conj(),
+                hamiltonian_gradients,
+                vectors,
+                optimize=True
+            ).real
+
+        gaps = eigenvalues[:, self._band_indices +
+                           1] - eigenvalues[:, self._band_indices]
+        upper_gradients = get_band_gradients(self._band_indices + 1)
+        lower_gradients = get_band_gradients(self._band_indices)
+        gradients = upper_gradients - lower_gradients
+        if self._is_scalar:
+            return gaps[:, 0], gradients[:, 0]
+        return gaps, gradients
+
+    def value_and_gradient(self, pos):
+        """
+        Get the gap and its gradient at a given position. The gradient is
+        computed from the eigenvectors and the ``hamiltonian_gradient``
+        (Hellmann-Feynman theorem), and is not defined at degeneracies. This
+        method can be passed as ``gap_fct`` to :func:`.search.run` with
+        ``minimizer='gauss_newton'``, and :meth:`batch_value_and_gradient`
+        as ``batch_gap_fct``.
+        """
+        gaps, gradients = self.batch_value_and_gradient(
+            np.asarray(pos, dtype=float)[np.newaxis]
+        )
+        if self._is_scalar:
+            return float(gaps[0]), gradients[0]
+        return gaps[0], gradients[0]
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the gap function of a Hamiltonian at a given energy, computed from
+a part of the spectrum.
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+import scipy.sparse.linalg as sla
+from fsc.export import export
+
+
+@export
+class ShiftInvertGap:
+    """
+    Gap function given by the difference between the eigenvalues of a
+    Hamiltonian directly above and below a given ``energy``, such as the
+    Fermi level. Only the ``num_eigenvalues`` eigenvalues closest to the
+    energy are computed, with the shift-invert mode of
+    :func:`scipy.sparse.linalg.eigsh`. For sparse Hamiltonians, this is
+    much faster than computing the full spectrum, since the cost is
+    dominated by a sparse LU decomposition instead of the dense
+    diagonalization. For dense Hamiltonians, :class:`.HamiltonianGap` is
+    usually faster.
+
+    If all computed eigenvalues are on the same side of the energy, the
+    closest eigenvalue on the other side is not known, but it is farther
+    from the energy than all computed eigenvalues. The gap is then
+    estimated from below, using the farthest computed eigenvalue in place
+    of the unknown one.
+
+    Arguments
+    ---------
+    hamiltonian : collections.abc.Callable
+        Function which takes a position and returns the Hamiltonian, as a
+        dense array or a :mod:`scipy.sparse` matrix.
+    energy : float
+        Energy at which the gap is computed.
+    num_eigenvalues : int
+        Number of eigenvalues which are computed.
+    warm_start : bool
+        If set, the iterative solver is started from the eigenvectors of the
+        closest recently evaluated position. Since the consecutive
+        evaluations of a Nelder-Mead minimization are close to each other,
+        this can reduce the number of iterations. However, the cost is
+        usually dominated by the LU decomposition, which is not affected.
+    num_warm_start_positions : int
+        Number of recently evaluated positions whose eigenvectors are kept
+        for the warm start. This should be at least the number of
+        minimizations running in parallel.
+    """
+    def __init__(
+        self,
+        hamiltonian,
+        *,
+        energy,
+        num_eigenvalues=4,
+        warm_start=False,
+        num_warm_start_positions=16
+    ):
+        if num_eigenvalues < 2:
+            raise ValueError(
+                "The 'num_eigenvalues' must be at least 2, got {}.".
+                format(num_eigenvalues)
+            )
+        self.hamiltonian = hamiltonian
+        self.energy = energy
+        self.num_eigenvalues = num_eigenvalues
+        self.warm_start = warm_start
+        # The gap function can be evaluated concurrently in a thread pool.
+        self._lock = threading.Lock()
+        self._recent_eigenvectors = deque(maxlen=num_warm_start_positions)
+
+    def __getstate__(self):
+        # Exclude the lock and the eigenvectors when the gap function is
+        # sent to a process pool.
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_recent_eigenvectors'] = deque(
+            maxlen=self._recent_eigenvectors.maxlen
+        )
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get_initial_vector(self, pos):
+        if not self.warm_start:
+            return None
+        with self._lock:
+            recent_eigenvectors = list(self._recent_eigenvectors)
+        if not recent_eigenvectors:
+            return None
+        _, eigenvectors = min(
+            recent_eigenvectors,
+            key=lambda entry: np.linalg.norm(entry[0] - pos)
+        )
+        return np.sum(eigenvectors, axis=-1)
+
+    def eigenvalues(self, pos):
+        """
+        Get the ``num_eigenvalues`` eigenvalues closest to the energy, in
+        ascending order.
+        """
+        pos = np.array(pos, dtype=float)
+        hamiltonian = self.hamiltonian(pos)
+        initial_vector = self._get_initial_vector(pos)
+        if initial_vector is not None and len(initial_vector
+                                              ) != hamiltonian.shape[-1]:
+            initial_vector = None
+        eigenvalues, eigenvectors = sla.eigsh(
+            hamiltonian,
+            k=self.num_eigenvalues,
+            sigma=self.energy,
+            v0=initial_vector,
+            return_eigenvectors=True
+        )
+        if self.warm_start:
+            with self._lock:
+                self._recent_eigenvectors.append((pos, eigenvectors))
+        return np.sort(eigenvalues)
+
+    def __call__(self, pos):
+        eigenvalues = self.eigenvalues(pos) - self.energy
+        below = eigenvalues[eigenvalues <= 0]
+        above = eigenvalues[eigenvalues > 0]
+        if len(below) == 0:
+            return float(above[0] + above[-1])
+        if len(above) == 0:
+            return float(-below[-1] - below[0])
+        return float(above[0] - below[-1])
+
+    def batch(self, positions):
+        """
+        Vectorized gap function, which takes an array of positions with
+        shape (N, dim) and returns an array of N gap values.
+        """
+        return np.array([self(pos) for pos in positions])
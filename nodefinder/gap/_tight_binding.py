@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the Bloch Hamiltonian of a tight-binding model.
+"""
+
+import numpy as np
+from fsc.export import export
+
+
+@export
+class TightBindingHamiltonian:
+    """
+    Bloch Hamiltonian of a tight-binding model, given by the Fourier sum
+    :math:`H(k) = \\sum_R e^{2 \\pi i k \\cdot R} H_R` over the hopping
+    matrices :math:`H_R`. The lattice vectors and hopping matrices are
+    stored in contiguous arrays, such that the Hamiltonians for a batch of
+    k-points are computed from a single matrix of phases, multiplied with
+    the stacked hopping matrices.
+
+    The instance takes either a single k-point, or an array of k-points with
+    shape (N, dim), and returns the Hamiltonian or an array of N
+    Hamiltonians. It can be used as the (vectorized) ``hamiltonian`` of a
+    :class:`.HamiltonianGap`.
+
+    Arguments
+    ---------
+    hoppings : dict
+        Mapping of the lattice vectors :math:`R`, given in reduced
+        coordinates, to the hopping matrices :math:`H_R`. Since the
+        Hamiltonian is not symmetrized, the hopping matrices for both
+        :math:`R` and :math:`-R` must be given.
+
+    Attributes
+    ----------
+    lattice_vectors : numpy.ndarray
+        Array of the lattice vectors with shape (M, dim).
+    num_orbitals : int
+        Size of the Hamiltonian matrix.
+    """
+    def __init__(self, hoppings):
+        hoppings = dict(hoppings)
+        if not hoppings:
+            raise ValueError("The 'hoppings' must not be empty.")
+        lattice_vectors, hopping_matrices = zip(*hoppings.items())
+        self.lattice_vectors = np.array(lattice_vectors, dtype=float)
+        if self.lattice_vectors.ndim != 2:
+            raise ValueError(
+                'The lattice vectors must all have the same dimension.'
+            )
+        hopping_matrices = np.array(hopping_matrices, dtype=complex)
+        self.num_orbitals = hopping_matrices.shape[-1]
+        if hopping_matrices.shape[1:] != (
+            self.num_orbitals, self.num_orbitals
+        ):
+            raise ValueError(
+                'The hopping matrices must be square, and of equal size.'
+            )
+        self._hopping_matrices = np.ascontiguousarray(
+            hopping_matrices.reshape(len(hoppings), -1)
+        )
+        # Include the factor 2 pi of the phases in the transposed lattice
+        # vectors.
+        self._phase_matrix = np.ascontiguousarray(
+            2 * np.pi * self.lattice_vectors.T
+        )
+
+    def __call__(self, k):
+        k = np.asarray(k, dtype=float)
+        phases = np.exp(1j * (k @ self._phase_matrix))
+        return (
+            phases @ self._hopping_matrices
+        ).reshape(k.shape[:-1] + (self.num_orbitals, self.num_orbitals))
+
+    def gradient(self, k):
+        """
+        Get the derivatives of the Hamiltonian with respect to each
+        component of the k-point, which can be used as the
+        ``hamiltonian_gradient`` of a :class:`.HamiltonianGap`.
+
+        Arguments
+        ---------
+        k : numpy.ndarray
+            A single k-point, or an array of k-points with shape (N, dim).
+
+        Returns
+        -------
+        numpy.ndarray :
+            Array with shape (dim, num_orbitals, num_orbitals) for a single
+            k-point, or (N, dim, num_orbitals, num_orbitals).
+        """
+        k = np.asarray(k, dtype=float)
+        phases = np.exp(1j * (k @ self._phase_matrix))
+        weighted_phases = 1j * phases[..., np.newaxis, :] * self._phase_matrix
+        return (weighted_phases @ self._hopping_matrices
+                ).reshape(k.shape + (self.num_orbitals, self.num_orbitals))
@@ -8,7 +8,19 @@ given as a "point-cloud" of nodes.
 """
 
 from ._run import *
+from ._concurrency import *
+from ._cache import *
+from ._store import *
+from ._decomposed import *
+from ._worker import *
+from ._iter import *
+from ._session import *
 from . import result
+from . import minimizer
 from . import plot
 
-__all__ = _run.__all__ + ['result', 'plot']  # pylint: disable=undefined-variable
+__all__ = (
+    _run.__all__ + _concurrency.__all__ + _cache.__all__ + _store.__all__ +
+    _decomposed.__all__ + _worker.__all__ + _iter.__all__ + _session.__all__ +
+    ['result', 'minimizer', 'plot']
+)  # pylint: disable=undefined-variable
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines helper functions for evaluating vectorized gap functions in batches.
+"""
+
+from types import MappingProxyType
+from collections import ChainMap
+
+import numpy as np
+from fsc.async_tools import BatchSubmitter, wrap_to_coroutine
+
+_DEFAULT_BATCH_KWARGS = MappingProxyType({
+    'timeout': 1e-3,
+    'max_batch_size': 1000
+})
+
+
+def _stack_inputs(batch_gap_fct):
+    """
+    Wraps a vectorized gap function such that it takes a list of positions
+    and returns a list of values, or of arrays of values for a vector-valued
+    gap function. If the gap function returns a tuple of the values and
+    their gradients, a list of ``(value, gradient)`` tuples is returned.
+    """
+    batch_gap_fct = wrap_to_coroutine(batch_gap_fct)
+
+    async def inner(positions):
+        res = await batch_gap_fct(np.array(positions))
+        if isinstance(res, tuple):
+            # Gap functions which also return the gradients.
+            values, gradients = res
+            return list(zip(_split_values(values, len(positions)), gradients))
+        return _split_values(res, len(positions))
+
+    return inner
+
+
+def _split_values(values, num_positions):
+    """
+    Split the values returned by a vectorized gap function into a list,
+    keeping the values of a vector-valued gap function together.
+    """
+    values = np.reshape(values, (num_positions, -1))
+    if values.shape[1] == 1:
+        return list(values[:, 0])
+    return list(values)
+
+
+class _BatchSubmitter(BatchSubmitter):
+    """
+    Batch submitter which skips the results of evaluations that were
+    cancelled while their batch was running, e.g. because the evaluation
+    budget or the deadline of the search was reached.
+    """
+    def _process_finished_batch(self, batch_future):
+        task_futures = self._batches.pop(batch_future)
+        try:
+            results = batch_future.result()
+        except Exception as exc:  # pylint: disable=broad-except
+            for fut in task_futures:
+                if not fut.done():
+                    fut.set_exception(exc)
+        else:
+            assert len(results) == len(task_futures)
+            for fut, res in zip(task_futures, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+
+def create_batch_evaluator(batch_gap_fct, batch_kwargs=MappingProxyType({})):
+    """
+    Create a coroutine which evaluates a single position, by collecting
+    concurrent calls into batches which are passed to the vectorized
+    ``batch_gap_fct``.
+
+    Arguments
+    ---------
+    batch_gap_fct : collections.abc.Callable
+        Function or coroutine which takes an array of shape (N, dim) and
+        returns N gap values.
+    batch_kwargs : collections.abc.Mapping
+        Keyword arguments passed to :class:`fsc.async_tools.BatchSubmitter`.
+    """
+    return _BatchSubmitter(
+        _stack_inputs(batch_gap_fct),
+        **ChainMap(batch_kwargs, _DEFAULT_BATCH_KWARGS)
+    )
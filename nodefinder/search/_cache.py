@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the cache for the gap function evaluations.
+"""
+
+import asyncio
+from collections import OrderedDict
+
+import numpy as np
+from fsc.export import export
+
+
+@export
+class EvaluationCache:
+    """
+    Least-recently-used cache for the values of the gap function. The cache
+    keys are the positions quantized to multiples of ``tolerance``, such that
+    numerically identical positions share a value. When a value is requested
+    while it is already being evaluated for another minimization, the
+    running evaluation is awaited instead of starting a new one.
+
+    Arguments
+    ---------
+    max_size : int
+        Maximum number of cached values. When it is exceeded, the least
+        recently used value is removed.
+    tolerance : float
+        Step to which the positions are quantized. If ``None``, the
+        ``tolerance`` of the ``store`` is used if it is given. Otherwise, it
+        is set by the search to a small fraction of the Nelder-Mead
+        ``xtol``.
+    store : EvaluationStore
+        Persistent store which is consulted for values which are not in the
+        cache, and to which the evaluated values are added.
+
+    Attributes
+    ----------
+    num_hits : int
+        Number of values which were taken from the cache, or from an
+        evaluation running for another minimization.
+    num_misses : int
+        Number of values which were evaluated.
+    num_store_hits : int
+        Number of values which were taken from the persistent store. These
+        are also counted in ``num_hits``.
+    """
+    def __init__(self, *, max_size=100000, tolerance=None, store=None):
+        if max_size < 1:
+            raise ValueError(
+                "The 'max_size' must be positive, got {}.".format(max_size)
+            )
+        self.max_size = max_size
+        if tolerance is None and store is not None:
+            tolerance = store.tolerance
+        self.tolerance = tolerance
+        self.store = store
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_store_hits = 0
+        self._values = OrderedDict()
+        self._running = dict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get_key(self, pos):
+        """
+        Get the cache key for a given position.
+        """
+        return tuple(
+            np.round(np.asarray(pos, dtype=float) / self.tolerance
+                     ).astype(np.int64)
+        )
+
+    def lookup(self, pos):
+        """
+        Get the known value at a given position from the cache or the
+        persistent store, without evaluating it. Returns ``None`` if the value
+        is not known.
+        """
+        key = self.get_key(pos)
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        if self.store is not None:
+            return self.store.get(key, tolerance=self.tolerance)
+        return None
+
+    def add(self, pos, value):
+        """
+        Add a value which was evaluated outside of the cache. It is counted
+        as a miss.
+        """
+        self.num_misses += 1
+        key = self.get_key(pos)
+        self._add_value(key, value)
+        if self.store is not None:
+            self.store.add(key, value, tolerance=self.tolerance)
+
+    def wrap(self, func):
+        """
+        Wraps a coroutine function such that it is evaluated through the
+        cache.
+        """
+        async def inner(pos):
+            return await self.evaluate(func, pos)
+
+        return inner
+
+    def flush(self):
+        """
+        Write the pending values of the persistent store to its file.
+        """
+        if self.store is not None:
+            self.store.flush()
+
+    async def evaluate(self, func, pos):
+        """
+        Get the value of a coroutine function at a given position, from the
+        cache if possible.
+        """
+        key = self.get_key(pos)
+        while True:
+            try:
+                value = self._values[key]
+            except KeyError:
+                pass
+            else:
+                self._values.move_to_end(key)
+                self.num_hits += 1
+                return value
+            running = self._running.get(key)
+            if running is None:
+                break
+            # If the running evaluation is cancelled (because the
+            # minimization which started it was cancelled), try again.
+            await asyncio.wait([running])
+            if not running.cancelled():
+                self.num_hits += 1
+                return running.result()
+
+        if self.store is not None:
+            value = self.store.get(key, tolerance=self.tolerance)
+            if value is not None:
+                self.num_hits += 1
+                self.num_store_hits += 1
+                self._add_value(key, value)
+                return value
+
+        self.num_misses += 1
+        running = asyncio.get_event_loop().create_future()
+        self._running[key] = running
+        try:
+            value = await func(pos)
+        except asyncio.CancelledError:
+            running.cancel()
+            raise
+        except Exception as exc:
+            running.set_exception(exc)
+            # Mark the exception as retrieved, since there may not be any
+            # other minimization waiting for it.
+            running.exception()
+            raise exc
+        finally:
+            del self._running[key]
+        running.set_result(value)
+        self._add_value(key, value)
+        if self.store is not None:
+            self.store.add(key, value, tolerance=self.tolerance)
+        return value
+
+    def _add_value(self, key, value):
+        self._values[key] = value
+        if len(self._values) > self.max_size:
+            self._values.popitem(last=False)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the search for the nodes of a vector-valued gap function, with a
+separate search for each channel.
+"""
+
+import asyncio
+
+from fsc.async_tools import wrap_to_coroutine
+
+from ._cache import EvaluationCache
+from ._controller import Controller, _CACHE_TOLERANCE_FACTOR
+from ._executor import get_executor, shutdown_executor_async
+from ._logging import SEARCH_LOGGER
+
+
+async def run_channels(
+    *, num_channels, gap_fct, batch_gap_fct, batch_kwargs, executor,
+    evaluation_cache, initial_state, save_file, node_callback, **kwargs
+):
+    """
+    Run a separate search for each channel of a vector-valued gap function.
+    The channels share the evaluations of the gap function through an
+    :class:`.EvaluationCache`, such that positions which are requested by
+    multiple channels are evaluated only once.
+
+    Arguments are the same as defined in :func:`.search.run`. The
+    ``kwargs`` are passed to the :class:`.Controller` of each channel.
+    """
+    if num_channels < 1:
+        raise ValueError(
+            "The 'num_channels' must be positive, got {}.".
+            format(num_channels)
+        )
+    if evaluation_cache is False:
+        raise ValueError(
+            "The 'evaluation_cache' cannot be disabled when 'num_channels' "
+            "is given, since it is used to share the evaluations."
+        )
+    if evaluation_cache is None or evaluation_cache is True:
+        evaluation_cache = EvaluationCache()
+    if evaluation_cache.store is not None:
+        raise ValueError(
+            "The 'evaluation_cache' cannot have a persistent store when "
+            "'num_channels' is given, since the store can only contain "
+            "scalar values."
+        )
+    if initial_state is None:
+        initial_state = [None] * num_channels
+    elif len(initial_state) != num_channels:
+        raise ValueError(
+            "The 'initial_state' must contain one state for each channel."
+        )
+
+    executor, owns_executor = get_executor(executor)
+    try:
+        shared_gap_fct = Controller.create_gap_fct(
+            gap_fct=gap_fct,
+            batch_gap_fct=batch_gap_fct,
+            batch_kwargs=batch_kwargs,
+            executor=executor
+        )
+        controllers = [
+            Controller(
+                gap_fct=_get_channel_gap_fct(
+                    shared_gap_fct,
+                    evaluation_cache=evaluation_cache,
+                    channel=channel
+                ),
+                initial_state=channel_initial_state,
+                save_file=(
+                    None if save_file is None else
+                    '{}.channel_{}'.format(save_file, channel)
+                ),
+                node_callback=(
+                    None if node_callback is None else
+                    _get_channel_callback(node_callback, channel=channel)
+                ),
+                **kwargs
+            ) for channel, channel_initial_state in enumerate(initial_state)
+        ]
+        if evaluation_cache.tolerance is None:
+            evaluation_cache.tolerance = _CACHE_TOLERANCE_FACTOR * controllers[
+                0].nelder_mead_kwargs['xtol']
+        SEARCH_LOGGER.debug(
+            'Running search controllers for {} channels.'.format(num_channels)
+        )
+        tasks = [
+            asyncio.ensure_future(controller.run())
+            for controller in controllers
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except (Exception, asyncio.CancelledError) as exc:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise exc
+    finally:
+        if owns_executor:
+            await shutdown_executor_async(executor)
+    SEARCH_LOGGER.info(
+        'Evaluation cache shared by the channels: {} hits, {} misses.'.format(
+            evaluation_cache.num_hits, evaluation_cache.num_misses
+        )
+    )
+    return [controller.state.result for controller in controllers]
+
+
+def _get_channel_gap_fct(shared_gap_fct, *, evaluation_cache, channel):
+    """
+    Create the coroutine which evaluates a single channel of the gap
+    function, through the shared cache.
+    """
+    async def inner(pos):
+        res = await evaluation_cache.evaluate(shared_gap_fct, pos)
+        if isinstance(res, tuple):
+            values, gradients = res
+            return values[channel], gradients[channel]
+        return res[channel]
+
+    return inner
+
+
+def _get_channel_callback(node_callback, *, channel):
+    """
+    Wraps the node callback such that it is also passed the channel.
+    """
+    node_callback = wrap_to_coroutine(node_callback)
+
+    async def inner(node):
+        await node_callback(node, channel)
+
+    return inner
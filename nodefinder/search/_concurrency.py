@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the adaptive control of the number of parallel minimizations.
+"""
+
+import time
+from types import SimpleNamespace
+from collections import deque
+
+from fsc.export import export
+
+from ._logging import SEARCH_LOGGER
+
+
+@export
+class AdaptiveConcurrency:
+    """
+    Controls the number of minimizations which run in parallel, based on the
+    observed latency and throughput of the gap function evaluations. The
+    number is adjusted with an additive-increase / multiplicative-decrease
+    (AIMD) scheme after each window of evaluations:
+
+    * If the average latency exceeds ``latency_tolerance`` times the lowest
+      average latency of the last ``baseline_windows`` windows, the
+      evaluations are queueing up and the limit is decreased by
+      ``decrease_factor``.
+    * If the previous increase did not improve the throughput by at least a
+      factor ``1 + throughput_gain``, the increase is reverted.
+    * Otherwise, if all allowed minimizations are running and further
+      simplices are queued, the limit is increased by ``increase``. Without
+      queued simplices, additional minimizations could not be started.
+
+    Arguments
+    ---------
+    initial : int
+        The initial number of parallel minimizations.
+    minimum : int
+        The minimum number of parallel minimizations.
+    maximum : int
+        The maximum number of parallel minimizations.
+    increase : int
+        Step by which the number of parallel minimizations is increased.
+    decrease_factor : float
+        Factor by which the number of parallel minimizations is decreased.
+    latency_tolerance : float
+        Maximum ratio between the current and the lowest average latency,
+        before the number of parallel minimizations is decreased.
+    baseline_windows : int
+        Number of recent windows from which the lowest average latency is
+        taken. Older windows are discarded, such that the baseline follows
+        lasting changes of the latency.
+    throughput_gain : float
+        Minimum relative throughput gain needed to keep an increase.
+    min_window : int
+        Minimum number of evaluations in each window. The window size is the
+        larger of this value and the current limit.
+
+    Attributes
+    ----------
+    limit : int
+        The current number of parallel minimizations.
+    history : list
+        The chosen limits, together with the latency and throughput which
+        lead to that choice.
+    """
+    def __init__(
+        self,
+        *,
+        initial=10,
+        minimum=1,
+        maximum=1000,
+        increase=1,
+        decrease_factor=0.75,
+        latency_tolerance=2.,
+        baseline_windows=10,
+        throughput_gain=0.02,
+        min_window=10
+    ):
+        if not 0 < minimum <= initial <= maximum:
+            raise ValueError(
+                'Inconsistent limits: minimum={}, initial={}, maximum={}'.
+                format(minimum, initial, maximum)
+            )
+        if baseline_windows < 1:
+            raise ValueError(
+                "The 'baseline_windows' must be positive, got {}.".
+                format(baseline_windows)
+            )
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.baseline_windows = baseline_windows
+        self.throughput_gain = throughput_gain
+        self.min_window = min_window
+        self.history = []
+
+        self._recent_latencies = deque(maxlen=self.baseline_windows)
+        self._last_throughput = None
+        self._last_step = 0
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = time.monotonic()
+        self._window_latencies = []
+
+    def record(self, latency, *, num_running, num_queued):
+        """
+        Record the latency of a finished evaluation, and adjust the limit at
+        the end of a window.
+
+        Arguments
+        ---------
+        latency : float
+            Time (in seconds) from requesting to receiving the evaluation.
+        num_running : int
+            The number of currently running minimizations.
+        num_queued : int
+            The number of simplices which are queued to be minimized.
+
+        Returns
+        -------
+        bool :
+            Indicates whether the limit has changed.
+        """
+        self._window_latencies.append(latency)
+        num_evaluations = len(self._window_latencies)
+        if num_evaluations < max(self.min_window, self.limit):
+            return False
+
+        duration = time.monotonic() - self._window_start
+        latency = sum(self._window_latencies) / num_evaluations
+        throughput = num_evaluations / max(duration, 1e-12)
+        self._reset_window()
+        self._recent_latencies.append(latency)
+
+        if latency > self.latency_tolerance * min(self._recent_latencies):
+            new_limit = int(self.limit * self.decrease_factor)
+        elif self._last_step > 0 and throughput < (
+            1 + self.throughput_gain
+        ) * self._last_throughput:
+            new_limit = self.limit - self._last_step
+        elif num_running >= self.limit and num_queued > 0:
+            new_limit = self.limit + self.increase
+        else:
+            new_limit = self.limit
+        new_limit = max(self.minimum, min(self.maximum, new_limit))
+
+        self._last_step = new_limit - self.limit
+        self._last_throughput = throughput
+        self.history.append(
+            SimpleNamespace(
+                limit=new_limit, latency=latency, throughput=throughput
+            )
+        )
+        changed = new_limit != self.limit
+        if changed:
+            SEARCH_LOGGER.debug(
+                'Setting num_minimize_parallel to {} (average latency {:.3g} s, throughput {:.3g} evaluations / s).'
+                .format(new_limit, latency, throughput)
+            )
+        self.limit = new_limit
+        return changed
@@ -7,11 +7,17 @@ Defines the Controller, which implements the evaluation of the search step.
 """
 
 import os
+import time
 import numbers
 import asyncio
+import datetime
+import itertools
 import tempfile
+from functools import partial
 from collections import ChainMap
 
+from types import MappingProxyType
+
 import numpy as np
 from fsc.export import export
 from fsc.async_tools import PeriodicTask, wrap_to_coroutine
@@ -21,12 +27,24 @@ from ..coordinate_system import CoordinateSystem
 from .result import SearchResultContainer, ControllerState
 from ._queue import SimplexQueue, PositionQueue
 from ._minimization import run_minimization
+from ._minimization._run import resolve_speculative
+from ._minimization._registry import get_minimizer
+from ._minimization._nelder_mead import root_nelder_mead
+from ._minimization._gauss_newton import root_gauss_newton
+from ._minimization._ensemble import run_ensemble_minimization
 from ._fake_potential import FakePotential
+from ._batch import create_batch_evaluator
+from ._executor import get_executor, wrap_to_executor, shutdown_executor_async
+from ._concurrency import AdaptiveConcurrency
+from ._cache import EvaluationCache
 from ._logging import SEARCH_LOGGER
 from ._mesh_helper import _generate_mesh_simplices
 from .refinement_stencil import get_auto_stencil
+from .priority import get_priority_policy
 
 _DIST_CUTOFF_FACTOR = 3
+# Default quantization step of the evaluation cache, relative to 'xtol'.
+_CACHE_TOLERANCE_FACTOR = 1e-6
 
 
 @export
@@ -57,10 +75,23 @@ class Controller:
         use_fake_potential=True,
         recheck_pos_dist=True,
         recheck_count_cutoff=0,
-        simplex_check_cutoff=0
+        simplex_check_cutoff=0,
+        batch_gap_fct=None,
+        batch_kwargs=MappingProxyType({}),
+        executor=None,
+        simplex_priority=None,
+        max_fev=None,
+        deadline=None,
+        abort_redundant=False,
+        ensemble_initial_mesh=False,
+        node_callback=None,
+        saturation_window=None,
+        evaluation_cache=None,
+        coarse_gap_fct=None,
+        coarse_threshold_factor=100,
+        minimizer='nelder_mead'
     ):
-        self.gap_fct = wrap_to_coroutine(gap_fct)
-
+        self.simplex_priority = get_priority_policy(simplex_priority)
         self.coordinate_system = CoordinateSystem(
             limits=limits, periodic=periodic
         )
@@ -71,6 +102,15 @@ class Controller:
         self.save_delay = save_delay
 
         self.dist_cutoff = feature_size / _DIST_CUTOFF_FACTOR
+        self.nelder_mead_kwargs = ChainMap(
+            nelder_mead_kwargs, {
+                'ftol': 0.05 * gap_threshold,
+                'xtol': 0.03 * self.dist_cutoff
+            }
+        )
+        # The evaluation cache is created before the state, such that its
+        # values can be used for the priorities of the initial simplices.
+        self.evaluation_cache = self._create_evaluation_cache(evaluation_cache)
         self.state = self.create_state(
             initial_state=initial_state,
             load=load,
@@ -96,18 +136,228 @@ class Controller:
             self.refinement_stencil = refinement_stencil * self.dist_cutoff
         else:
             self.refinement_stencil = None
-        self.num_minimize_parallel = num_minimize_parallel
-        self.nelder_mead_kwargs = ChainMap(
-            nelder_mead_kwargs, {
-                'ftol': 0.05 * gap_threshold,
-                'xtol': 0.03 * self.dist_cutoff
-            }
+        if isinstance(num_minimize_parallel, AdaptiveConcurrency):
+            self.concurrency = num_minimize_parallel
+        elif num_minimize_parallel == 'auto':
+            self.concurrency = AdaptiveConcurrency()
+        else:
+            if not isinstance(
+                num_minimize_parallel, numbers.Integral
+            ) or num_minimize_parallel < 1:
+                raise ValueError(
+                    "The 'num_minimize_parallel' must be a positive integer "
+                    "or 'auto', got {}.".format(num_minimize_parallel)
+                )
+            self.concurrency = None
+            self._num_minimize_parallel = num_minimize_parallel
+        self._run_nelder_mead_kwargs = resolve_speculative(
+            self.nelder_mead_kwargs,
+            has_spare_capacity=self._has_spare_capacity
         )
 
         self.task_futures = set()
+        self._done_futures = []
+        self._task_done_event = asyncio.Event()
+        self.num_fev = 0
+        self.max_fev = max_fev
+        self.deadline = deadline
+        self._deadline_time = None
+        self._deadline_handle = None
         self.recheck_pos_dist = recheck_pos_dist
         self.recheck_count_cutoff = recheck_count_cutoff
         self.simplex_check_cutoff = simplex_check_cutoff
+        self.abort_redundant = abort_redundant
+        self.ensemble_initial_mesh = ensemble_initial_mesh
+        if coarse_gap_fct is not None and ensemble_initial_mesh:
+            raise ValueError(
+                "The 'coarse_gap_fct' cannot be used together with "
+                "'ensemble_initial_mesh'."
+            )
+        self.coarse_threshold = coarse_threshold_factor * gap_threshold
+        self.minimizer = minimizer
+        self._minimizer = get_minimizer(minimizer)
+        if ensemble_initial_mesh and self._minimizer is not root_nelder_mead:
+            raise ValueError(
+                "The 'ensemble_initial_mesh' option can only be used with "
+                "the Nelder-Mead minimizer."
+            )
+        if self._minimizer is root_gauss_newton and isinstance(
+            evaluation_cache, EvaluationCache
+        ) and evaluation_cache.store is not None:
+            raise ValueError(
+                "The 'evaluation_cache' cannot have a persistent store when "
+                "using the Gauss-Newton minimizer, since the store cannot "
+                "contain the gradients."
+            )
+        self.num_coarse_fev = 0
+        if node_callback is not None:
+            node_callback = wrap_to_coroutine(node_callback)
+        self.node_callback = node_callback
+        if saturation_window is not None and saturation_window < 1:
+            raise ValueError(
+                "The 'saturation_window' must be positive, got {}.".
+                format(saturation_window)
+            )
+        self.saturation_window = saturation_window
+        self._num_minimizations = 0
+        self._num_new_nodes = 0
+        self._num_since_new_node = 0
+        self._num_fev_since_new_node = 0
+        # Best positions and values of the running minimizations which have
+        # converged to within dist_cutoff and reached the gap threshold.
+        self._converging = {}
+        self._run_counter = itertools.count()
+
+        # The executor is created last, such that it is not left running if
+        # any of the other inputs are invalid.
+        self.executor, self._owns_executor = get_executor(executor)
+        try:
+            self.gap_fct = self.create_gap_fct(
+                gap_fct=gap_fct,
+                batch_gap_fct=batch_gap_fct,
+                batch_kwargs=batch_kwargs,
+                executor=self.executor
+            )
+        except Exception as exc:
+            self.shutdown_executor()
+            raise exc
+        # The vectorized gap function is also used directly by the ensemble
+        # minimization, without collecting the evaluations into batches.
+        if batch_gap_fct is None:
+            self._batch_gap_fct = None
+        elif self.executor is not None:
+            self._batch_gap_fct = wrap_to_executor(
+                batch_gap_fct, self.executor
+            )
+        else:
+            self._batch_gap_fct = wrap_to_coroutine(batch_gap_fct)
+        if self.concurrency is not None:
+            self.gap_fct = self._add_latency_measurement(self.gap_fct)
+        self.gap_fct = self._add_evaluation_count(self.gap_fct)
+        # The coarse gap function is not cached, and does not count towards
+        # the 'max_fev' budget.
+        if coarse_gap_fct is None:
+            self.coarse_gap_fct = None
+        else:
+            if self.executor is not None:
+                coarse_gap_fct = wrap_to_executor(
+                    coarse_gap_fct, self.executor
+                )
+            else:
+                coarse_gap_fct = wrap_to_coroutine(coarse_gap_fct)
+            self.coarse_gap_fct = self._add_evaluation_count(
+                coarse_gap_fct, coarse=True
+            )
+        if self.evaluation_cache is not None:
+            self.gap_fct = self.evaluation_cache.wrap(self.gap_fct)
+
+    @staticmethod
+    def create_gap_fct(*, gap_fct, batch_gap_fct, batch_kwargs, executor):
+        """
+        Create the coroutine which is used to evaluate the gap function.
+        """
+        if (gap_fct is None) == (batch_gap_fct is None):
+            raise ValueError(
+                "Exactly one of 'gap_fct' and 'batch_gap_fct' must be given."
+            )
+        if batch_gap_fct is not None:
+            if executor is not None:
+                batch_gap_fct = wrap_to_executor(batch_gap_fct, executor)
+            return create_batch_evaluator(
+                batch_gap_fct, batch_kwargs=batch_kwargs
+            )
+        if executor is not None:
+            return wrap_to_executor(gap_fct, executor)
+        return wrap_to_coroutine(gap_fct)
+
+    def _create_evaluation_cache(self, evaluation_cache):
+        """
+        Create the evaluation cache from the given input, which can be either
+        a boolean or an :class:`.EvaluationCache`.
+        """
+        if evaluation_cache is None or evaluation_cache is False:
+            return None
+        if evaluation_cache is True:
+            evaluation_cache = EvaluationCache()
+        if evaluation_cache.tolerance is None:
+            evaluation_cache.tolerance = _CACHE_TOLERANCE_FACTOR * self.nelder_mead_kwargs[
+                'xtol']
+        return evaluation_cache
+
+    def _add_latency_measurement(self, gap_fct):
+        """
+        Wraps the gap function such that the latency of each evaluation is
+        passed to the adaptive concurrency control.
+        """
+        async def inner(pos):
+            start = time.monotonic()
+            res = await gap_fct(pos)
+            if self.concurrency.record(
+                time.monotonic() - start,
+                num_running=self.state.simplex_queue.num_running,
+                num_queued=self.state.simplex_queue.num_queued
+            ):
+                # Wake up the controller to schedule new minimizations.
+                self._task_done_event.set()
+            return res
+
+        return inner
+
+    def _add_evaluation_count(self, gap_fct, *, coarse=False):
+        """
+        Wraps the gap function such that the number of evaluations is counted,
+        and the controller is woken up when the evaluation budget is used up.
+        Once the budget or the deadline is reached, the minimization
+        requesting the evaluation is cancelled. Evaluations of the coarse gap
+        function are counted separately in ``num_coarse_fev``.
+        """
+        async def inner(pos):
+            if self.get_stop_reason() is not None:
+                self._task_done_event.set()
+                raise asyncio.CancelledError
+            res = await gap_fct(pos)
+            if coarse:
+                self.num_coarse_fev += 1
+                return res
+            self.num_fev += 1
+            if self.max_fev is not None and self.num_fev == self.max_fev:
+                self._task_done_event.set()
+            return res
+
+        return inner
+
+    @property
+    def num_minimize_parallel(self):
+        """
+        The current maximum number of parallel minimizations.
+        """
+        if self.concurrency is not None:
+            return self.concurrency.limit
+        return self._num_minimize_parallel
+
+    def _has_spare_capacity(self):
+        """
+        Check whether fewer than ``num_minimize_parallel`` minimizations are
+        running, which means that no other simplices are waiting.
+        """
+        return self.state.simplex_queue.num_running < self.num_minimize_parallel
+
+    def shutdown_executor(self):
+        """
+        Shut down the executor if it was created by the controller.
+        """
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+            self._owns_executor = False
+
+    async def shutdown_executor_async(self):
+        """
+        Shut down the executor if it was created by the controller, without
+        blocking the event loop.
+        """
+        if self._owns_executor:
+            self._owns_executor = False
+            await shutdown_executor_async(self.executor)
 
     @staticmethod
     def check_dimensions(limits, mesh_size):
@@ -151,15 +401,21 @@ class Controller:
                 refined_results=initial_state.result.refined_results
             )
             simplex_queue = SimplexQueue(
-                objects=initial_state.simplex_queue.objects
+                objects=initial_state.simplex_queue.objects,
+                priorities=initial_state.simplex_queue.priorities
             )
             position_queue = PositionQueue(
                 objects=initial_state.position_queue.objects
             )
+            checkpoints = initial_state.checkpoints
             if force_initial_mesh:
+                initial_simplices = self.get_initial_simplices(
+                    initial_mesh_size=initial_mesh_size
+                )
                 simplex_queue.add_objects(
-                    self.get_initial_simplices(
-                        initial_mesh_size=initial_mesh_size
+                    initial_simplices,
+                    priorities=self.get_priorities(
+                        initial_simplices, is_refinement=False, result=result
                     )
                 )
         else:
@@ -168,14 +424,20 @@ class Controller:
                 gap_threshold=gap_threshold,
                 dist_cutoff=dist_cutoff,
             )
+            initial_simplices = self.get_initial_simplices(initial_mesh_size)
             simplex_queue = SimplexQueue(
-                self.get_initial_simplices(initial_mesh_size)
+                initial_simplices,
+                priorities=self.get_priorities(
+                    initial_simplices, is_refinement=False, result=result
+                )
             )
             position_queue = PositionQueue()
+            checkpoints = ()
         return ControllerState(
             result=result,
             simplex_queue=simplex_queue,
-            position_queue=position_queue
+            position_queue=position_queue,
+            checkpoints=checkpoints
         )
 
     def get_initial_simplices(self, initial_mesh_size):
@@ -185,93 +447,453 @@ class Controller:
             periodic=self.coordinate_system.periodic
         )
 
+    def get_priorities(self, simplices, *, is_refinement, result=None):
+        """
+        Get the priorities of the given simplices from the priority policy.
+        Returns ``None`` (meaning that the simplices are queued in order) if
+        no policy is set.
+        """
+        if self.simplex_priority is None:
+            return None
+        if result is None:
+            result = self.state.result
+        return [
+            self.simplex_priority(
+                simplex,
+                is_refinement=is_refinement,
+                result=result,
+                vertex_values=self._get_cached_values(simplex)
+            ) for simplex in simplices
+        ]
+
+    def _get_cached_values(self, simplex):
+        """
+        Get the cached gap values of the simplex vertices, or ``None`` for
+        the vertices whose value is not known.
+        """
+        if self.evaluation_cache is None:
+            return [None] * len(simplex)
+        return [self.evaluation_cache.lookup(pos) for pos in simplex]
+
     async def run(self):
-        await self.create_tasks()
+        """
+        Run the search, and shut down the executor when it is finished.
+        """
+        self._start_deadline_timer()
+        try:
+            for node in self.state.result.nodes.values():
+                await self.report_node(node)
+            await self.create_tasks()
+            if self.evaluation_cache is not None:
+                SEARCH_LOGGER.info(
+                    'Evaluation cache: {} hits ({} from store), {} misses.'.
+                    format(
+                        self.evaluation_cache.num_hits,
+                        self.evaluation_cache.num_store_hits,
+                        self.evaluation_cache.num_misses
+                    )
+                )
+            if self.coarse_gap_fct is not None:
+                SEARCH_LOGGER.info(
+                    'Gap function evaluations: {} accurate, {} coarse.'.format(
+                        self.num_fev, self.num_coarse_fev
+                    )
+                )
+        except (Exception, asyncio.CancelledError) as exc:
+            # Also cancel the minimizations when the search itself is
+            # cancelled, e.g. by closing 'iter_search_async' early.
+            await self.cancel_tasks()
+            raise exc
+        finally:
+            if self._deadline_handle is not None:
+                self._deadline_handle.cancel()
+                self._deadline_handle = None
+            if self.evaluation_cache is not None:
+                self.evaluation_cache.flush()
+            await self.shutdown_executor_async()
+
+    def _start_deadline_timer(self):
+        """
+        Schedule waking up the controller at the deadline.
+        """
+        if self.deadline is None:
+            return
+        if isinstance(self.deadline, datetime.datetime):
+            delay = (
+                self.deadline - datetime.datetime.now(tz=self.deadline.tzinfo)
+            ).total_seconds()
+        else:
+            delay = self.deadline
+        self._deadline_time = time.monotonic() + delay
+        self._deadline_handle = asyncio.get_event_loop().call_later(
+            max(delay, 0), self._task_done_event.set
+        )
+
+    def get_stop_reason(self):
+        """
+        Check if the evaluation budget or the deadline has been reached.
+
+        Returns
+        -------
+        str or None :
+            The reason for stopping the search, or ``None`` if the search
+            should continue.
+        """
+        if self.max_fev is not None and self.num_fev >= self.max_fev:
+            return 'max_fev'
+        if (
+            self._deadline_time is not None
+            and time.monotonic() >= self._deadline_time
+        ):
+            return 'deadline'
+        if (
+            self.saturation_window is not None
+            and self._num_since_new_node >= self.saturation_window
+        ):
+            return 'saturation'
+        return None
+
+    async def cancel_tasks(self):
+        """
+        Cancel all running minimizations. The corresponding simplices stay in
+        the running state, such that they are re-queued when the calculation
+        is restarted.
+        """
+        for fut in self.task_futures:
+            fut.cancel()
+        await asyncio.gather(*self.task_futures, return_exceptions=True)
+        self.task_futures.clear()
+        self._done_futures = []
 
     async def create_tasks(self):
         """
-        Create minimization tasks until the calculation is finished.
+        Create minimization tasks until the calculation is finished. Between
+        scheduling new tasks, the controller sleeps until one of the running
+        minimizations has finished.
         """
         async with PeriodicTask(self.save, delay=self.save_delay):
+            if self.ensemble_initial_mesh:
+                await self.run_ensemble()
             while (
                 not self.state.simplex_queue.finished
             ) or self.state.position_queue.has_queued:
-                # if (not self.state.simplex_queue.has_queued) and (self.state.position_queue.has_queued):
-                while (
-                    self.state.simplex_queue.num_running <
-                    self.num_minimize_parallel
-                ):
-                    while not self.state.simplex_queue.has_queued:
-                        if self.state.position_queue.has_queued:
-                            pos = self.state.position_queue.pop_queued()
-                            if (not self.recheck_pos_dist
-                                ) or self._check_pos_refinement(
-                                    pos,
-                                    count_cutoff=self.recheck_count_cutoff
-                                ):
-                                self.state.simplex_queue.add_objects(
-                                    pos + self.refinement_stencil
-                                )
-                                self.state.result.set_refined(np.array(pos))
-                            else:
-                                SEARCH_LOGGER.debug(
-                                    'Discarding refinement of position {}'.
-                                    format(pos)
-                                )
-                        else:
-                            break
-                    if self.state.simplex_queue.has_queued:
-                        simplex = self.state.simplex_queue.pop_queued()
-                        if self._check_simplex(simplex):
-                            self.schedule_minimization(simplex)
-                        else:
-                            self.state.simplex_queue.set_finished(simplex)
-                    else:
-                        break
-
-                await asyncio.sleep(0.)
-
-                # Retrieve all exceptions, to avoid 'exception never retrieved'
-                # warning, but raise only the first one.
-                done_futures = [fut for fut in self.task_futures if fut.done()]
-                exceptions = [fut.exception() for fut in done_futures]
-                exceptions = [exc for exc in exceptions if exc is not None]
-                if exceptions:
-                    raise exceptions[0]
-
-                self.task_futures.difference_update(done_futures)
+                stop_reason = self.get_stop_reason()
+                if stop_reason is not None:
+                    SEARCH_LOGGER.info(
+                        "Stopping the search before it is finished, reason: '{}'."
+                        .format(stop_reason)
+                    )
+                    await self.cancel_tasks()
+                    self.state.result.stop_reason = stop_reason
+                    self.state.result.needs_saving = True
+                    break
+                self.fill_tasks()
+                if self.task_futures:
+                    await self._task_done_event.wait()
+                self._task_done_event.clear()
+                self._collect_done_futures()
         await asyncio.gather(*self.task_futures)
 
+    async def run_ensemble(self):
+        """
+        Minimize all simplices which are queued at the start of the search,
+        i.e. the initial mesh, in lockstep with the ensemble Nelder-Mead
+        algorithm.
+        """
+        simplices = []
+        while self.state.simplex_queue.has_queued:
+            simplex = self.state.simplex_queue.pop_queued()
+            if not self._check_simplex(simplex):
+                self.set_finished(simplex)
+            elif self.state.get_checkpoint(simplex) is not None:
+                # Minimizations which were interrupted are resumed
+                # separately from their checkpoint.
+                self.schedule_minimization(simplex)
+            else:
+                simplices.append(simplex)
+        if not simplices:
+            return
+        SEARCH_LOGGER.debug(
+            'Running ensemble minimization of {} simplices.'.format(
+                len(simplices)
+            )
+        )
+        try:
+            results = await run_ensemble_minimization(
+                self._evaluate_batch,
+                initial_simplices=np.array(simplices),
+                fake_potential=self.fake_potential,
+                nelder_mead_kwargs={
+                    key: value
+                    for key, value in self.nelder_mead_kwargs.items()
+                    if key not in ['parallel_shrink', 'speculative']
+                }
+            )
+        except asyncio.CancelledError:
+            # The simplices stay in the running state, such that they are
+            # re-queued when the calculation is restarted.
+            if self.get_stop_reason() is None:
+                raise
+            return
+        for simplex, result in zip(simplices, results):
+            if self.process_result(result):
+                await self.report_node(result)
+            self.set_finished(simplex)
+
+    async def _evaluate_batch(self, positions):
+        """
+        Evaluate the gap function at the given positions, for the ensemble
+        minimization. The values are taken from the evaluation cache if
+        possible. If the remaining evaluation budget does not suffice for
+        the batch, the budget is used up and the minimization is cancelled.
+        """
+        if self.get_stop_reason() is not None:
+            raise asyncio.CancelledError
+        if self._batch_gap_fct is None:
+            return await asyncio.gather(
+                *[self.gap_fct(pos) for pos in positions]
+            )
+        if self.evaluation_cache is None:
+            values = [None] * len(positions)
+        else:
+            values = [self.evaluation_cache.lookup(pos) for pos in positions]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.num_hits += len(positions) - len(missing)
+        if self.max_fev is not None:
+            missing = missing[:max(self.max_fev - self.num_fev, 0)]
+        if missing:
+            new_values = await self._batch_gap_fct(
+                np.array([positions[i] for i in missing])
+            )
+            self.num_fev += len(missing)
+            for i, value in zip(missing, new_values):
+                values[i] = value
+                if self.evaluation_cache is not None:
+                    self.evaluation_cache.add(positions[i], value)
+        if any(value is None for value in values):
+            self._task_done_event.set()
+            raise asyncio.CancelledError
+        return np.array(values)
+
+    def fill_tasks(self):
+        """
+        Schedule minimizations from the queued simplices and refinement
+        positions, until ``num_minimize_parallel`` are running.
+        """
+        while self.state.simplex_queue.num_running < self.num_minimize_parallel:
+            # Without priorities, refinement positions are only expanded once
+            # all other simplices have been started. When using priorities,
+            # they are expanded immediately such that the refinement
+            # simplices can be sorted in.
+            while (
+                self.simplex_priority is not None
+                or not self.state.simplex_queue.has_queued
+            ):
+                if self.state.position_queue.has_queued:
+                    self._add_refinement(
+                        self.state.position_queue.pop_queued()
+                    )
+                else:
+                    break
+            if self.state.simplex_queue.has_queued:
+                simplex = self.state.simplex_queue.pop_queued()
+                if self._check_simplex(simplex):
+                    self.schedule_minimization(simplex)
+                else:
+                    self.set_finished(simplex)
+            else:
+                break
+
+    def _add_refinement(self, pos):
+        """
+        Add the refinement simplices around a given position to the queue,
+        unless the position has been refined already.
+        """
+        if (not self.recheck_pos_dist) or self._check_pos_refinement(
+            pos, count_cutoff=self.recheck_count_cutoff
+        ):
+            simplices = pos + self.refinement_stencil
+            self.state.simplex_queue.add_objects(
+                simplices,
+                priorities=self.get_priorities(simplices, is_refinement=True)
+            )
+            self.state.result.set_refined(np.array(pos))
+        else:
+            SEARCH_LOGGER.debug(
+                'Discarding refinement of position {}'.format(pos)
+            )
+
+    def _collect_done_futures(self):
+        """
+        Remove the finished minimization tasks.
+        """
+        done_futures = self._done_futures
+        self._done_futures = []
+        self.task_futures.difference_update(done_futures)
+
+        # Retrieve all exceptions, to avoid 'exception never retrieved'
+        # warning, but raise only the first one. Cancelled tasks are left to
+        # be handled by the stopping criteria.
+        exceptions = [
+            fut.exception() for fut in done_futures if not fut.cancelled()
+        ]
+        exceptions = [exc for exc in exceptions if exc is not None]
+        if exceptions:
+            raise exceptions[0]
+
+    def _task_done_callback(self, fut):
+        self._done_futures.append(fut)
+        self._task_done_event.set()
+
     def schedule_minimization(self, simplex):
         SEARCH_LOGGER.debug(
             'Scheduling minimization of simplex {}'.format(simplex)
         )
-        self.task_futures.add(asyncio.ensure_future(self.run_simplex(simplex)))
+        fut = asyncio.ensure_future(self.run_simplex(simplex))
+        fut.add_done_callback(self._task_done_callback)
+        self.task_futures.add(fut)
 
     async def run_simplex(self, simplex):
         """
-        Run the minimization for a given starting simplex.
+        Run the minimization for a given starting simplex. The minimization
+        is resumed from its checkpoint if it was interrupted previously.
         """
-        result = await run_minimization(
-            self.gap_fct,
-            initial_simplex=simplex,
-            fake_potential=self.fake_potential,
-            nelder_mead_kwargs=self.nelder_mead_kwargs,
-        )
-        self.process_result(result)
+        if self.abort_redundant:
+            run_id = next(self._run_counter)
+            should_continue = partial(self._check_not_redundant, run_id=run_id)
+        else:
+            should_continue = None
+        try:
+            result = await run_minimization(
+                self.gap_fct,
+                initial_simplex=simplex,
+                fake_potential=self.fake_potential,
+                nelder_mead_kwargs=self._run_nelder_mead_kwargs,
+                should_continue=should_continue,
+                checkpoint=partial(self.state.set_checkpoint, simplex),
+                resume_from=self.state.get_checkpoint(simplex),
+                coarse_func=self.coarse_gap_fct,
+                coarse_threshold=self.coarse_threshold,
+                minimizer=self._minimizer
+            )
+        finally:
+            if self.abort_redundant:
+                self._converging.pop(run_id, None)
+        if self.process_result(result):
+            await self.report_node(result)
+        self.set_finished(simplex)
+
+    def set_finished(self, simplex):
+        """
+        Mark the minimization of a given simplex as finished, and remove its
+        checkpoint.
+        """
+        self.state.remove_checkpoint(simplex)
         self.state.simplex_queue.set_finished(simplex)
 
+    def _check_not_redundant(self, simplex, values, *, run_id):
+        """
+        Check whether a running minimization should be continued. Once all
+        vertices are within ``dist_cutoff`` of the best vertex, it is aborted
+        if they are also within ``dist_cutoff`` of an existing node, or of the
+        best vertex of another such minimization which has already reached
+        the gap threshold with a lower function value.
+        """
+        best_pos = np.copy(simplex[0])
+        if np.max(
+            self.coordinate_system.distance(best_pos, simplex)
+        ) >= self.dist_cutoff:
+            self._converging.pop(run_id, None)
+            return True
+        candidates = [
+            node.pos for node in self.state.result.nodes.get_neighbour_values(
+                frac=self.coordinate_system.
+                get_frac(self.coordinate_system.normalize_position(best_pos))
+            )
+        ]
+        key = (values[0], run_id)
+        candidates.extend(
+            other_pos
+            for other_id, (other_pos, other_key) in self._converging.items()
+            if other_id != run_id and other_key < key
+        )
+        for pos in candidates:
+            if np.all(
+                self.coordinate_system.distance(pos, simplex) <
+                self.dist_cutoff
+            ):
+                return False
+        if values[0] <= self.state.result.gap_threshold:
+            self._converging[run_id] = (best_pos, key)
+        else:
+            self._converging.pop(run_id, None)
+        return True
+
+    async def report_node(self, node):
+        """
+        Pass a node to the ``node_callback``. The minimization which found
+        the node is finished only after the callback returns, such that no
+        new minimizations are started while the callback is blocked.
+        """
+        if self.node_callback is not None:
+            await self.node_callback(node)
+
     def process_result(self, result):
         """
         Update the state with a given result, and add new simplices if needed.
+        Returns whether the result is a node.
         """
+        if self.saturation_window is not None:
+            is_new_node = self._is_new_node(result)
         is_node = self.state.result.add_result(result)
+        if self.saturation_window is not None:
+            self._update_saturation(
+                result, is_new_node=is_new_node and is_node
+            )
         if is_node and self.refinement_stencil is not None:
             pos = result.pos
             SEARCH_LOGGER.info('Found node at position {}'.format(pos))
             if self._check_pos_refinement(pos):
                 SEARCH_LOGGER.info('Scheduling refinement around node.')
                 self.state.position_queue.add_objects([pos])
+        return is_node
+
+    def _is_new_node(self, result):
+        """
+        Check whether the position of a result is not within ``dist_cutoff``
+        of an existing node.
+        """
+        pos = self.coordinate_system.normalize_position(result.pos)
+        return all(
+            self.coordinate_system.distance(pos, node.pos) >= self.dist_cutoff
+            for node in self.state.result.nodes.get_neighbour_values(
+                frac=self.coordinate_system.get_frac(pos)
+            )
+        )
+
+    def _update_saturation(self, result, *, is_new_node):
+        """
+        Update the statistics of the saturation stopping criterion with a
+        finished minimization, and store them in the result.
+        """
+        self._num_minimizations += 1
+        if is_new_node:
+            self._num_new_nodes += 1
+            self._num_since_new_node = 0
+            self._num_fev_since_new_node = 0
+        else:
+            self._num_since_new_node += 1
+            self._num_fev_since_new_node += result.num_fev
+        self.state.result.saturation_statistics = {
+            'saturation_window': self.saturation_window,
+            'num_minimizations': self._num_minimizations,
+            'num_new_nodes': self._num_new_nodes,
+            'num_fev': self.num_fev,
+            'num_since_new_node': self._num_since_new_node,
+            'num_fev_since_new_node': self._num_fev_since_new_node,
+        }
+        self.state.result.needs_saving = True
 
     def _check_pos_refinement(self, pos, count_cutoff=0):
         """
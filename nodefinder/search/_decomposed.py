@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the function which runs the search step on separate domains in
+parallel processes.
+"""
+
+import os
+import numbers
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from fsc.export import export
+
+from ..coordinate_system import CoordinateSystem
+from .result import SearchResultContainer
+from ._run import run
+from ._controller import _DIST_CUTOFF_FACTOR
+from ._executor import check_picklable
+from ._logging import SEARCH_LOGGER
+
+
+@export
+def run_decomposed(
+    gap_fct,
+    *,
+    num_domains,
+    limits=((0, 1), ) * 3,
+    periodic=True,
+    initial_mesh_size=10,
+    gap_threshold=1e-6,
+    feature_size=2e-3,
+    halo=None,
+    save_file=None,
+    num_processes=None,
+    **kwargs
+):
+    """Run the nodal point search on separate domains in parallel processes.
+
+    The box given by ``limits`` is split into domains, and an independent
+    search is run for each domain, extended by a halo on each side. The
+    results are merged into a single :class:`.SearchResultContainer`, where
+    each node is taken from the domain which owns its position. Nodes which
+    ended up outside the core of every domain, for example beyond the
+    ``limits`` of a non-periodic box, are kept only if they are not
+    duplicates of an existing node.
+
+    Arguments
+    ---------
+    gap_fct : collections.abc.Callable
+        Function or coroutine describing the potential of which nodes should be
+        found. It must be picklable, since it is passed to the processes
+        running the domains.
+    num_domains : int or tuple(int)
+        Number of domains in each dimension.
+    limits : tuple(tuple(float))
+        The limits of the box where nodes are searched.
+    periodic : bool
+        Indicates whether periodic boundary conditions are used for the
+        coordinate system.
+    initial_mesh_size : int or tuple(int)
+        Size of the initial mesh of the whole box. Each domain uses the
+        corresponding fraction of the mesh.
+    gap_threshold : float
+        Threshold for the function value for which a given point is considered
+        to be a node.
+    feature_size : float
+        Threshold for the distance between two nodes where they are considered
+        distinct.
+    halo : float
+        Width of the halo by which each domain is extended. Defaults to
+        ``feature_size``.
+    save_file : str
+        Prefix of the files where the intermediate results of each domain are
+        stored. The domain index is appended to this prefix.
+    num_processes : int
+        The number of processes in which the domains are run. Defaults to the
+        smaller of the number of domains and the number of CPUs.
+    kwargs :
+        Additional keyword arguments passed to :func:`.run` for each domain.
+
+    Returns
+    -------
+    SearchResultContainer:
+        The merged result of all domains.
+    """
+    check_picklable(gap_fct)
+    coordinate_system = CoordinateSystem(limits=limits, periodic=periodic)
+    dim = coordinate_system.dim
+    num_domains = _to_tuple(num_domains, dim=dim)
+    initial_mesh_size = _to_tuple(initial_mesh_size, dim=dim)
+    if halo is None:
+        halo = feature_size
+
+    domains = get_domains(
+        coordinate_system=coordinate_system,
+        num_domains=num_domains,
+        halo=halo
+    )
+    domain_mesh_size = tuple(
+        max(1, int(np.ceil(m / n)))
+        for m, n in zip(initial_mesh_size, num_domains)
+    )
+    if num_processes is None:
+        num_processes = min(len(domains), os.cpu_count() or 1)
+
+    SEARCH_LOGGER.info(
+        'Running search on {} domains in {} processes.'.format(
+            len(domains), num_processes
+        )
+    )
+    with ProcessPoolExecutor(max_workers=num_processes) as executor:
+        futures = [
+            executor.submit(
+                run,
+                gap_fct,
+                limits=extended_limits,
+                periodic=False,
+                initial_mesh_size=domain_mesh_size,
+                gap_threshold=gap_threshold,
+                feature_size=feature_size,
+                save_file=(
+                    None if save_file is None else
+                    '{}.domain_{}'.format(save_file, i)
+                ),
+                **kwargs
+            ) for i, (_, extended_limits) in enumerate(domains)
+        ]
+        domain_results = [fut.result() for fut in futures]
+
+    return merge_domain_results(
+        domain_results,
+        core_limits=[core_limits for core_limits, _ in domains],
+        coordinate_system=coordinate_system,
+        gap_threshold=gap_threshold,
+        dist_cutoff=feature_size / _DIST_CUTOFF_FACTOR
+    )
+
+
+def _to_tuple(value, *, dim):
+    if isinstance(value, numbers.Integral):
+        return (value, ) * dim
+    if len(value) != dim:
+        raise ValueError(
+            'Inconsistent dimensions given: expected {}, got {}'.format(
+                dim, len(value)
+            )
+        )
+    return tuple(value)
+
+
+def get_domains(*, coordinate_system, num_domains, halo):
+    """
+    Split the box of the coordinate system into domains.
+
+    Returns
+    -------
+    list(tuple(numpy.ndarray, numpy.ndarray)) :
+        The limits of the core of each domain, and the limits extended by the
+        halo. For non-periodic coordinate systems, the halo is cut off at the
+        limits of the box.
+    """
+    edges = [
+        np.linspace(lower, upper, n + 1)
+        for (lower, upper), n in zip(coordinate_system.limits, num_domains)
+    ]
+    domains = []
+    for index in itertools.product(*[range(n) for n in num_domains]):
+        core_limits = np.array([
+            edge[i:i + 2] for edge, i in zip(edges, index)
+        ])
+        extended_limits = core_limits + np.array([-halo, halo])
+        if not coordinate_system.periodic:
+            extended_limits = np.clip(
+                extended_limits,
+                coordinate_system.limits[:, :1],
+                coordinate_system.limits[:, 1:],
+            )
+        domains.append((core_limits, extended_limits))
+    return domains
+
+
+def merge_domain_results(
+    domain_results, *, core_limits, coordinate_system, gap_threshold,
+    dist_cutoff
+):
+    """
+    Merge the results of the different domains into a single result.
+
+    Arguments
+    ---------
+    domain_results : list(SearchResultContainer)
+        The results of the searches on each domain.
+    core_limits : list(numpy.ndarray)
+        The limits of the core of each domain.
+    coordinate_system : CoordinateSystem
+        The coordinate system of the merged result.
+    gap_threshold : float
+        Threshold for the function value for which a given point is considered
+        to be a node.
+    dist_cutoff : float
+        Cutoff distance for the merged result.
+    """
+    owned_results = []
+    other_nodes = []
+    for result, limits in zip(domain_results, core_limits):
+        owned_results.extend(result.rejected_results)
+        for node in result.nodes:
+            pos = coordinate_system.normalize_position(node.pos)
+            if _is_in_core(
+                pos, limits=limits, coordinate_system=coordinate_system
+            ):
+                owned_results.append(node)
+            else:
+                other_nodes.append(node)
+
+    merged_result = SearchResultContainer(
+        coordinate_system=coordinate_system,
+        minimization_results=owned_results,
+        gap_threshold=gap_threshold,
+        dist_cutoff=dist_cutoff,
+        refined_results=[
+            pos for result in domain_results for pos in result.refined_results
+        ],
+    )
+    for node in other_nodes:
+        node.pos = coordinate_system.normalize_position(node.pos)
+        # Nodes in the core of another domain are reported by that domain.
+        if any(
+            _is_in_core(
+                node.pos, limits=limits, coordinate_system=coordinate_system
+            ) for limits in core_limits
+        ):
+            continue
+        # The neighbour iterators of the result skip nodes at the same
+        # position, which are exactly the duplicates to be removed here.
+        if all(
+            coordinate_system.distance(node.pos, neighbour.pos) >= dist_cutoff
+            for neighbour in merged_result.nodes.get_neighbour_values(
+                frac=coordinate_system.get_frac(node.pos)
+            )
+        ):
+            merged_result.add_result(node)
+
+    for result in domain_results:
+        if not result.complete:
+            merged_result.stop_reason = result.stop_reason
+            break
+    return merged_result
+
+
+def _is_in_core(pos, *, limits, coordinate_system):
+    """
+    Check if a (normalized) position is in the core of a domain. The upper
+    limits are exclusive, except at the upper limit of the whole box.
+    """
+    lower = limits[:, 0]
+    upper = limits[:, 1]
+    at_box_upper = np.isclose(upper, coordinate_system.limits[:, 1])
+    return np.all((pos >= lower)
+                  & ((pos < upper) | (at_box_upper & (pos <= upper))))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines helper functions for evaluating synchronous gap functions in an
+executor.
+"""
+
+import pickle
+import asyncio
+import numbers
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+
+def get_executor(executor):
+    """
+    Get the executor from the given input, which can be either an
+    :class:`concurrent.futures.Executor`, a number of worker processes,
+    or ``None``.
+
+    Returns
+    -------
+    tuple(concurrent.futures.Executor, bool)
+        The executor, and a flag indicating whether the executor was created
+        here and thus needs to be shut down by the caller.
+    """
+    if executor is None or isinstance(executor, Executor):
+        return executor, False
+    if isinstance(executor, numbers.Integral):
+        if executor <= 0:
+            raise ValueError(
+                "The number of executor workers must be positive, got {}.".
+                format(executor)
+            )
+        return ProcessPoolExecutor(max_workers=executor), True
+    raise TypeError(
+        "Invalid type '{}' for the 'executor', must be an Executor or an integer."
+        .format(type(executor))
+    )
+
+
+async def shutdown_executor_async(executor):
+    """
+    Shut down an executor, waiting for the running evaluations to finish
+    without blocking the event loop.
+    """
+    await asyncio.get_event_loop().run_in_executor(None, executor.shutdown)
+
+
+def wrap_to_executor(func, executor):
+    """
+    Wraps a synchronous function into a coroutine which evaluates it in the
+    given executor.
+    """
+    if asyncio.iscoroutinefunction(func):
+        raise ValueError(
+            'Coroutine gap functions cannot be evaluated in an executor.'
+        )
+    if isinstance(executor, ProcessPoolExecutor):
+        check_picklable(func)
+
+    async def inner(*args):
+        return await asyncio.get_event_loop().run_in_executor(
+            executor, func, *args
+        )
+
+    return inner
+
+
+def check_picklable(func):
+    """
+    Check that the gap function can be pickled, such that it can be passed
+    to a different process.
+    """
+    try:
+        pickle.dumps(func)
+    except Exception as exc:
+        raise ValueError(
+            'The gap function cannot be pickled, and can thus not be '
+            'evaluated in a different process. Use a module-level function '
+            'or a functools.partial of such a function instead.'
+        ) from exc
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines generators which yield the nodes while the search is running.
+"""
+
+import queue
+import asyncio
+import threading
+
+from fsc.export import export
+
+from ._run import run_async
+
+
+@export
+async def iter_search_async(*args, buffer_size=10, **kwargs):
+    """Run the nodal point search, yielding each node as soon as it is found.
+
+    The nodes are yielded as :class:`.MinimizationResult` instances, starting
+    with the nodes of the initial state (if any). If ``num_channels`` is
+    given, tuples ``(node, channel)`` are yielded. At most ``buffer_size``
+    nodes are buffered: when the buffer is full, the minimizations which find
+    new nodes wait until the consumer catches up, and no new minimizations
+    are started. Closing the generator early cancels the search.
+
+    Arguments
+    ---------
+    args : tuple
+        Positional arguments passed to :func:`.run_async`.
+    buffer_size : int
+        Maximum number of nodes which are buffered for the consumer.
+    kwargs : collections.abc.Mapping
+        Keyword arguments passed to :func:`.run_async`. The ``save_file``
+        can be used to retrieve the complete result after the search.
+    """
+    if buffer_size < 1:
+        raise ValueError(
+            "The 'buffer_size' must be positive, got {}.".format(buffer_size)
+        )
+    node_queue = asyncio.Queue(maxsize=buffer_size)
+    if kwargs.get('num_channels') is None:
+        node_callback = node_queue.put
+    else:
+
+        async def node_callback(node, channel):
+            await node_queue.put((node, channel))
+
+    search = asyncio.ensure_future(
+        run_async(*args, node_callback=node_callback, **kwargs)
+    )
+    get_node = None
+    try:
+        while True:
+            get_node = asyncio.ensure_future(node_queue.get())
+            await asyncio.wait([get_node, search],
+                               return_when=asyncio.FIRST_COMPLETED)
+            if get_node.done():
+                yield get_node.result()
+                continue
+            get_node.cancel()
+            while not node_queue.empty():
+                yield node_queue.get_nowait()
+            # Raise the exception if the search failed.
+            search.result()
+            return
+    finally:
+        if get_node is not None:
+            get_node.cancel()
+        if not search.done():
+            search.cancel()
+            await asyncio.gather(search, return_exceptions=True)
+
+
+_NODE = 'node'
+_DONE = 'done'
+_ERROR = 'error'
+
+
+@export
+def iter_search(*args, buffer_size=10, **kwargs):
+    """Wrapper around :func:`.iter_search_async` that yields the nodes
+    synchronously.
+
+    The search runs in a separate thread, such that it continues while the
+    consumer processes the nodes.
+
+    Arguments
+    ---------
+    args : tuple
+        Positional arguments passed to :func:`.run_async`.
+    buffer_size : int
+        Maximum number of nodes which are buffered for the consumer.
+    kwargs : collections.abc.Mapping
+        Keyword arguments passed to :func:`.run_async`.
+    """
+    message_queue = queue.Queue(maxsize=buffer_size)
+    stop_event = threading.Event()
+    loop = asyncio.new_event_loop()
+
+    async def forward_nodes():
+        nodes = iter_search_async(*args, buffer_size=buffer_size, **kwargs)
+        try:
+            async for node in nodes:
+                # Wait for the consumer without blocking the event loop, and
+                # give up when the consumer has stopped.
+                while not stop_event.is_set():
+                    try:
+                        message_queue.put((_NODE, node), block=False)
+                        break
+                    except queue.Full:
+                        await asyncio.sleep(0.01)
+                if stop_event.is_set():
+                    return
+        finally:
+            await nodes.aclose()
+
+    forward_task = loop.create_task(forward_nodes())
+
+    def target():
+        try:
+            loop.run_until_complete(forward_task)
+            message = (_DONE, None)
+        except asyncio.CancelledError:
+            message = (_DONE, None)
+        except Exception as exc:  # pylint: disable=broad-except
+            message = (_ERROR, exc)
+        finally:
+            loop.close()
+        while not stop_event.is_set():
+            try:
+                message_queue.put(message, timeout=0.01)
+                break
+            except queue.Full:
+                pass
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    try:
+        while True:
+            kind, value = message_queue.get()
+            if kind == _NODE:
+                yield value
+            elif kind == _ERROR:
+                raise value
+            else:
+                return
+    finally:
+        stop_event.set()
+        # The forwarding task may be waiting for the next node, so it must
+        # be cancelled for the search to stop.
+        try:
+            loop.call_soon_threadsafe(forward_task.cancel)
+        except RuntimeError:
+            # The event loop is already closed.
+            pass
+        thread.join()
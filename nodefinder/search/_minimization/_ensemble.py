@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the ensemble Nelder-Mead algorithm, which runs many minimizations in
+lockstep on stacked simplices.
+"""
+
+import warnings
+from types import MappingProxyType
+
+import numpy as np
+from fsc.export import export
+from fsc.async_tools import wrap_to_coroutine
+
+from ..result._minimization import MinimizationResult, JoinedMinimizationResult
+from ._nelder_mead import _status_message
+
+_RHO = 1
+_CHI = 2
+_PSI = 0.5
+_SIGMA = 0.5
+
+
+@export
+async def ensemble_nelder_mead(
+    batch_func,
+    *,
+    initial_simplices,
+    xtol,
+    ftol,
+    maxiter=None,
+    maxfev=None,
+    fprime_cutoff=None,
+    keep_history=True
+):
+    """
+    Run the root-finding Nelder-Mead algorithm (see :func:`.root_nelder_mead`)
+    for many starting simplices in lockstep. The simplices are stored as a
+    single array, and each step of the algorithm evaluates the required
+    points of all simplices with a single call to the vectorized function.
+    Each simplex follows the same sequence of steps as it would in
+    :func:`.root_nelder_mead`.
+
+    Arguments
+    ---------
+    batch_func : collections.abc.Callable
+        Vectorized function or coroutine, which takes an array of positions
+        with shape (K, N) and returns K values.
+    initial_simplices : numpy.ndarray
+        Coordinates of the initial simplices, with shape (M, N + 1, N).
+    xtol : float
+        Relative error in solution `xopt` acceptable for convergence.
+    ftol : float
+        Relative error in ``fun(xopt)`` acceptable for convergence.
+    maxiter : int
+        Maximum number of iterations to perform for each simplex.
+    maxfev : int
+        Maximum number of function evaluations for each simplex.
+    fprime_cutoff:
+        Cutoff for the additional root-finding aborting criterion.
+    keep_history : bool
+        Store the history of the simplices in the results.
+
+    Returns
+    -------
+    list(MinimizationResult):
+        The results of the minimizations, in the order of the initial
+        simplices.
+    """
+    batch_func = wrap_to_coroutine(batch_func)
+    sim = np.array(initial_simplices, dtype=float)
+    num_simplices, num_vertices, dim = sim.shape
+    assert num_vertices == dim + 1
+    if num_simplices == 0:
+        return []
+    if maxiter is None:
+        maxiter = dim * 200
+    if maxfev is None:
+        maxfev = dim * 200
+
+    async def evaluate(positions):
+        if len(positions) == 0:
+            return np.zeros(0)
+        return np.array(await batch_func(positions), dtype=float)
+
+    fsim = (await evaluate(sim.reshape(-1, dim))).reshape(num_simplices, -1)
+    num_fev = np.full(num_simplices, num_vertices)
+    num_iter = np.ones(num_simplices, dtype=int)
+    sim, fsim = _sort_simplices(sim, fsim)
+
+    simplex_history = [[np.copy(s)] for s in sim]
+    fun_simplex_history = [[np.copy(f)] for f in fsim]
+
+    active = np.ones(num_simplices, dtype=bool)
+    while True:
+        active &= (num_fev < maxfev) & (num_iter < maxiter)
+        if fprime_cutoff is not None:
+            active &= _get_fprime_estimate(sim, fsim[:, 0]) <= fprime_cutoff
+        with warnings.catch_warnings():
+            # Ignore subtraction 'inf - inf' in fsim, since it will correctly
+            # evaluate to False.
+            warnings.simplefilter('ignore')
+            converged = (
+                np.max(np.abs(sim[:, 1:] - sim[:, :1]), axis=(1, 2)) <= xtol
+            ) & (np.max(np.abs(fsim[:, :1] - fsim[:, 1:]), axis=1) <= ftol)
+        active &= ~converged
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+
+        sim_active = sim[idx]
+        fsim_active = fsim[idx]
+        worst = sim_active[:, -1]
+        xbar = np.add.reduce(sim_active[:, :-1], 1) / dim
+        xr = (1 + _RHO) * xbar - _RHO * worst
+        fxr = await evaluate(xr)
+        num_fev[idx] += 1
+
+        expand = fxr < fsim_active[:, 0]
+        accept_reflection = ~expand & (fxr < fsim_active[:, -2])
+        contract_outside = ~expand & ~accept_reflection & (
+            fxr < fsim_active[:, -1]
+        )
+        contract_inside = ~expand & ~accept_reflection & ~contract_outside
+
+        # Each simplex needs at most one additional point, which is either
+        # the expansion, outside contraction or inside contraction point.
+        x_second = np.where(
+            expand[:, None], (1 + _RHO * _CHI) * xbar - _RHO * _CHI * worst,
+            np.where(
+                contract_outside[:, None],
+                (1 + _PSI * _RHO) * xbar - _PSI * _RHO * worst,
+                (1 - _PSI) * xbar + _PSI * worst
+            )
+        )
+        needs_second = ~accept_reflection
+        f_second = np.full(len(idx), np.nan)
+        f_second[needs_second] = await evaluate(x_second[needs_second])
+        num_fev[idx[needs_second]] += 1
+
+        with warnings.catch_warnings():
+            # Ignore comparisons with the 'nan' placeholder.
+            warnings.simplefilter('ignore')
+            use_second = (expand & (f_second < fxr)) | (
+                contract_outside & (f_second <= fxr)
+            ) | (contract_inside & (f_second < fsim_active[:, -1]))
+        shrink = (contract_outside | contract_inside) & ~use_second
+        use_reflection = (expand | accept_reflection) & ~use_second
+
+        sim_active[use_second, -1] = x_second[use_second]
+        fsim_active[use_second, -1] = f_second[use_second]
+        sim_active[use_reflection, -1] = xr[use_reflection]
+        fsim_active[use_reflection, -1] = fxr[use_reflection]
+
+        if np.any(shrink):
+            sim_shrink = sim_active[shrink]
+            sim_shrink[:, 1:] = sim_shrink[:, :1] + _SIGMA * (
+                sim_shrink[:, 1:] - sim_shrink[:, :1]
+            )
+            sim_active[shrink] = sim_shrink
+            f_shrink = await evaluate(sim_shrink[:, 1:].reshape(-1, dim))
+            fsim_active[shrink, 1:] = f_shrink.reshape(-1, dim)
+            num_fev[idx[shrink]] += dim
+
+        sim_active, fsim_active = _sort_simplices(sim_active, fsim_active)
+        sim[idx] = sim_active
+        fsim[idx] = fsim_active
+        num_iter[idx] += 1
+        for i in idx:
+            if keep_history:
+                simplex_history[i].append(np.copy(sim[i]))
+                fun_simplex_history[i].append(np.copy(fsim[i]))
+            else:
+                simplex_history[i][0] = np.copy(sim[i])
+
+    fprime_exceeded = np.zeros(num_simplices, dtype=bool)
+    if fprime_cutoff is not None:
+        fprime_exceeded = _get_fprime_estimate(
+            sim, np.min(fsim, axis=1)
+        ) > fprime_cutoff
+    results = []
+    for i in range(num_simplices):
+        if num_fev[i] >= maxfev:
+            warnflag = 1
+            msg = _status_message['maxfev']
+        elif num_iter[i] >= maxiter:
+            warnflag = 2
+            msg = _status_message['maxiter']
+        elif fprime_exceeded[i]:
+            warnflag = 3
+            msg = _status_message['fprime_cutoff']
+        else:
+            warnflag = 0
+            msg = _status_message['success']
+        if keep_history:
+            hist_kwargs = dict(
+                simplex_history=np.array(simplex_history[i]),
+                fun_simplex_history=np.array(fun_simplex_history[i])
+            )
+        else:
+            hist_kwargs = dict(simplex_history=np.array(simplex_history[i]))
+        results.append(
+            MinimizationResult(
+                pos=sim[i, 0],
+                value=np.min(fsim[i]),
+                num_iter=int(num_iter[i]),
+                num_fev=int(num_fev[i]),
+                status=warnflag,
+                success=(warnflag == 0),
+                message=msg,
+                **hist_kwargs
+            )
+        )
+    return results
+
+
+def _sort_simplices(sim, fsim):
+    """
+    Sort the vertices of each simplex by their function value.
+    """
+    ind = np.argsort(fsim, axis=1)
+    return (
+        np.take_along_axis(sim, ind[:, :, None],
+                           axis=1), np.take_along_axis(fsim, ind, axis=1)
+    )
+
+
+def _get_fprime_estimate(sim, fval):
+    """
+    Estimate the maximum derivative for each simplex, from the function
+    value and the longest edge.
+    """
+    deltas = sim[:, :, None, :] - sim[:, None, :, :]
+    return fval / np.sqrt(
+        np.max(np.sum(np.square(deltas), axis=-1), axis=(1, 2))
+    )
+
+
+@export
+async def run_ensemble_minimization(
+    batch_func,
+    *,
+    initial_simplices,
+    fake_potential=None,
+    nelder_mead_kwargs=MappingProxyType({})
+):
+    """Runs the ensemble minimization, including handling the fake potential.
+
+    This is the ensemble equivalent of :func:`.run_minimization`.
+
+    Arguments
+    ---------
+    batch_func : collections.abc.Callable
+        Vectorized function or coroutine describing the potential to be
+        minimized.
+    initial_simplices : numpy.ndarray
+        Coordinates of the initial simplices, with shape (M, N + 1, N).
+    fake_potential : collections.abc.Callable
+        Function describing the fake potential.
+    nelder_mead_kwargs : collections.abc.Mapping
+        Keyword arguments passed to :func:`.ensemble_nelder_mead`.
+    """
+    if fake_potential is None:
+        return await ensemble_nelder_mead(
+            batch_func,
+            initial_simplices=initial_simplices,
+            **nelder_mead_kwargs
+        )
+
+    batch_func = wrap_to_coroutine(batch_func)
+
+    async def batch_func_with_fake(positions):
+        return np.array(await batch_func(positions)) + np.array([
+            fake_potential(pos) for pos in positions
+        ])
+
+    modified_kwargs = dict(nelder_mead_kwargs)
+    modified_kwargs['ftol'] = float('inf')
+    results_fake = await ensemble_nelder_mead(
+        batch_func_with_fake,
+        initial_simplices=initial_simplices,
+        **modified_kwargs
+    )
+    simplices_blowup = []
+    for res_fake in results_fake:
+        simplex_final = res_fake.simplex_history[-1]
+        simplices_blowup.append(
+            simplex_final[0] + 1.5 * (simplex_final - simplex_final[0])
+        )
+    results = await ensemble_nelder_mead(
+        batch_func,
+        initial_simplices=np.array(simplices_blowup),
+        **nelder_mead_kwargs
+    )
+    return [
+        JoinedMinimizationResult(child=res, ancestor=res_fake)
+        for res, res_fake in zip(results, results_fake)
+    ]
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the damped Gauss-Newton algorithm, which finds the roots of a gap
+function from its values and gradients.
+"""
+
+import numpy as np
+from fsc.export import export
+
+from ..result._minimization import (
+    MinimizationResult, MinimizationCheckpoint, ABORTED_STATUS,
+    STOP_VALUE_STATUS, PRECISION_LOSS_STATUS
+)
+from ._nelder_mead import _status_message, _History
+
+
+@export
+async def root_gauss_newton(
+    func,
+    *,
+    initial_simplex,
+    xtol,
+    ftol,
+    maxiter=None,
+    maxfev=None,
+    fprime_cutoff=None,
+    stop_value=None,
+    keep_history=True,
+    should_continue=None,
+    checkpoint=None,
+    resume_from=None
+):
+    """
+    Root-finding of a non-negative function, using a damped Gauss-Newton
+    algorithm on the function value. The function returns both its value
+    and gradient, which for a gap function of a Hamiltonian can be computed
+    from the eigenvectors (Hellmann-Feynman theorem). At a linear crossing,
+    a single Gauss-Newton step reaches the node.
+
+    The step is limited by a trust radius, which is doubled when a step
+    is accepted, and halved when it does not reduce the function value.
+    The minimization is started from the first vertex of the
+    ``initial_simplex``, with its longest edge as initial trust radius.
+    For compatibility with :func:`.root_nelder_mead`, the state is
+    represented by the simplex spanned by the current position and the
+    trust radius along each axis, where only the first vertex is
+    evaluated. The function values of the other vertices are set to
+    ``nan``. If the function value is not finite, or the gradient vanishes
+    at a non-zero value, the minimization stops with status
+    ``PRECISION_LOSS_STATUS``.
+
+    The ``fprime_cutoff`` criterion of :func:`.root_nelder_mead` is applied
+    with the trust radius in place of the longest edge of the simplex.
+
+    Arguments
+    ---------
+    func : collections.abc.Callable
+        Coroutine which takes a position and returns a tuple containing the
+        function value and its gradient.
+    initial_simplex : numpy.ndarray
+        Coordinates of the initial simplex.
+    xtol : float
+        Trust radius below which the minimization is considered converged.
+    ftol : float
+        Change of the function value within the trust radius (estimated
+        from the gradient) below which the minimization is considered
+        converged.
+    maxiter : int
+        Maximum number of iterations to perform.
+    maxfev : int
+        Maximum number of function evaluations to make.
+    fprime_cutoff:
+        Cutoff for the additional root-finding aborting criterion.
+    stop_value : float
+        The minimization is stopped with status ``STOP_VALUE_STATUS`` once
+        the function value is below this value.
+    keep_history : bool
+        Store the history of the simplices in the result.
+    should_continue : collections.abc.Callable
+        Function which is called with the current simplex and its function
+        values at each iteration. If it returns ``False``, the minimization
+        is aborted with status ``ABORTED_STATUS``.
+    checkpoint : collections.abc.Callable
+        Function which is called with a :class:`.MinimizationCheckpoint` of
+        the current state at the start of each iteration.
+    resume_from : MinimizationCheckpoint
+        Checkpoint from which the minimization is resumed.
+
+    Returns
+    -------
+    MinimizationResult:
+        The result of the optimization.
+    """
+    num_fev = 0
+
+    async def evaluate(pos):
+        nonlocal num_fev
+        num_fev += 1
+        value, gradient = await func(pos)
+        return float(value), np.array(gradient, dtype=float)
+
+    if resume_from is not None:
+        initial_simplex = resume_from.simplex
+    initial_simplex = np.array(initial_simplex, dtype=float)
+    dim = initial_simplex.shape[-1]
+    assert initial_simplex.shape == (dim + 1, dim)
+    if maxiter is None:
+        maxiter = dim * 200
+    if maxfev is None:
+        maxfev = dim * 200
+
+    pos = np.copy(initial_simplex[0])
+    radius = _get_radius(initial_simplex)
+    fun_simplex = np.full(dim + 1, np.nan)
+    history = _History(dim, keep_history=keep_history)
+    if resume_from is None:
+        value, gradient = await evaluate(pos)
+        iterations = 1
+    else:
+        value = float(resume_from.fun_simplex[0])
+        gradient = np.array(resume_from.gradient, dtype=float)
+        num_fev = resume_from.num_fev
+        iterations = resume_from.num_iter
+        if keep_history:
+            for hist_sim, hist_fsim in zip(
+                resume_from.simplex_history, resume_from.fun_simplex_history
+            ):
+                history.append(hist_sim, hist_fsim)
+
+    def update_simplex():
+        nonlocal radius
+        fun_simplex[0] = value
+        simplex = pos + radius * np.eye(dim + 1, dim, k=-1)
+        # Use the radius as it is recovered from the simplex, such that
+        # resuming from a checkpoint gives exactly the same result.
+        radius = _get_radius(simplex)
+        return simplex
+
+    simplex = update_simplex()
+    # When resuming, the current state is already in the history, unless
+    # only the last simplex is kept.
+    if resume_from is None or not keep_history:
+        history.append(simplex, fun_simplex)
+    aborted = False
+    stopped = False
+    fprime_exceeded = False
+    precision_loss = False
+
+    while num_fev < maxfev and iterations < maxiter:
+        if checkpoint is not None:
+            checkpoint(
+                MinimizationCheckpoint(
+                    simplex=simplex,
+                    fun_simplex=fun_simplex,
+                    num_iter=iterations,
+                    num_fev=num_fev,
+                    gradient=gradient,
+                    **history.get_kwargs(copy=not keep_history)
+                )
+            )
+        if stop_value is not None and value < stop_value:
+            stopped = True
+            break
+        if fprime_cutoff is not None and value / radius > fprime_cutoff:
+            fprime_exceeded = True
+            break
+        if value == 0:
+            break
+        gradient_norm_sq = gradient @ gradient
+        if not np.isfinite(value) or not gradient_norm_sq > 0:
+            precision_loss = True
+            break
+        if radius <= xtol and radius * np.sqrt(gradient_norm_sq) <= ftol:
+            break
+        if should_continue is not None and not should_continue(
+            simplex, fun_simplex
+        ):
+            aborted = True
+            break
+
+        step = -value / gradient_norm_sq * gradient
+        step_length = np.linalg.norm(step)
+        if step_length > radius:
+            step *= radius / step_length
+            step_length = radius
+        new_value, new_gradient = await evaluate(pos + step)
+        if new_value < value:
+            pos = pos + step
+            value = new_value
+            gradient = new_gradient
+            radius = 2 * step_length
+        else:
+            radius = 0.5 * step_length
+        iterations += 1
+        simplex = update_simplex()
+        history.append(simplex, fun_simplex)
+
+    if aborted:
+        status = ABORTED_STATUS
+        message = _status_message['aborted']
+    elif stopped:
+        status = STOP_VALUE_STATUS
+        message = _status_message['stop_value']
+    elif num_fev >= maxfev:
+        status = 1
+        message = _status_message['maxfev']
+    elif iterations >= maxiter:
+        status = 2
+        message = _status_message['maxiter']
+    elif fprime_exceeded:
+        status = 3
+        message = _status_message['fprime_cutoff']
+    elif precision_loss:
+        status = PRECISION_LOSS_STATUS
+        message = _status_message['pr_loss']
+    else:
+        status = 0
+        message = _status_message['success']
+
+    return MinimizationResult(
+        pos=pos,
+        value=value,
+        num_iter=iterations,
+        num_fev=num_fev,
+        status=status,
+        success=(status == 0),
+        message=message,
+        **history.get_kwargs(copy=True)
+    )
+
+
+def _get_radius(simplex):
+    """
+    Get the length of the longest edge of the simplex which contains the
+    first vertex.
+    """
+    return np.max(np.linalg.norm(simplex[1:] - simplex[0], axis=-1))
@@ -14,39 +14,39 @@
 # pylint: skip-file
 
 import asyncio
-import warnings
-import itertools
 
 import numpy as np
 from fsc.export import export
 
-from ..result._minimization import MinimizationResult
+from ..result._minimization import (
+    MinimizationResult, MinimizationCheckpoint, ABORTED_STATUS,
+    STOP_VALUE_STATUS
+)
 
 # standard status messages of optimizers
 _status_message = {
-    'success':
-    'Optimization terminated successfully.',
-    'maxfev':
-    'Maximum number of function evaluations has '
+    'success': 'Optimization terminated successfully.',
+    'maxfev': 'Maximum number of function evaluations has '
     'been exceeded.',
-    'maxiter':
-    'Maximum number of iterations has been '
+    'maxiter': 'Maximum number of iterations has been '
     'exceeded.',
-    'pr_loss':
-    'Desired error not necessarily achieved due '
+    'pr_loss': 'Desired error not necessarily achieved due '
     'to precision loss.',
-    'fprime_cutoff':
-    'Cutoff for the maximum estimated derivative'
+    'fprime_cutoff': 'Cutoff for the maximum estimated derivative'
     'has been exceeded.',
+    'aborted': 'Minimization aborted by the continuation check.',
+    'stop_value': 'Function value below the stopping value has been reached.',
 }
 
 
 def wrap_function(function):
     ncalls = [0]
 
-    async def function_wrapper(*args):
+    async def function_wrapper(x):
         ncalls[0] += 1
-        return await function(*args)
+        # The positions are passed as copies, since the simplex and trial
+        # point buffers are re-used in the following iterations.
+        return await function(np.array(x))
 
     return ncalls, function_wrapper
 
@@ -61,7 +61,13 @@ async def root_nelder_mead(
     maxiter=None,
     maxfev=None,
     fprime_cutoff=None,
-    keep_history=True
+    stop_value=None,
+    keep_history=True,
+    should_continue=None,
+    parallel_shrink=True,
+    speculative=False,
+    checkpoint=None,
+    resume_from=None
 ):
     """
     Minimization of scalar function of one or more variables using the
@@ -89,6 +95,32 @@ async def root_nelder_mead(
         Maximum number of function evaluations to make.
     fprime_cutoff:
         Cutoff for the additional root-finding aborting criterion.
+    stop_value : float
+        The minimization is stopped with status ``STOP_VALUE_STATUS`` once
+        the lowest function value of the simplex is below this value.
+    should_continue : collections.abc.Callable
+        Function which is called with the current simplex and its function
+        values at each iteration. If it returns ``False``, the minimization
+        is aborted with status ``ABORTED_STATUS``.
+    parallel_shrink : bool
+        Evaluate the new vertices of a shrink step concurrently.
+    speculative : bool or collections.abc.Callable
+        Evaluate the reflection, expansion and contraction points of each
+        iteration concurrently, instead of only the ones which are needed.
+        This reduces the latency of an iteration to a single evaluation, at
+        the cost of additional evaluations. If a callable is given, it is
+        called without arguments at each iteration to decide whether the
+        speculative evaluation is used, e.g. when there is spare capacity for
+        evaluating the function. When running the search, ``'auto'`` can be
+        given to use the speculative evaluation whenever not all of the
+        ``num_minimize_parallel`` minimizations are running.
+    checkpoint : collections.abc.Callable
+        Function which is called with a :class:`.MinimizationCheckpoint` of
+        the current state at the start of each iteration.
+    resume_from : MinimizationCheckpoint
+        Checkpoint from which the minimization is resumed. The result is the
+        same as if the minimization had not been interrupted. The
+        ``initial_simplex`` is not used in this case.
 
     Returns
     -------
@@ -98,6 +130,8 @@ async def root_nelder_mead(
     maxfun = maxfev
 
     fcalls, func = wrap_function(func)
+    if resume_from is not None:
+        initial_simplex = resume_from.simplex
     N = len(initial_simplex[0])
     if maxiter is None:
         maxiter = N * 200
@@ -110,48 +144,104 @@ async def root_nelder_mead(
     sigma = 0.5
     one2np1 = list(range(1, N + 1))
 
-    sim = np.array(initial_simplex)
+    sim = np.array(initial_simplex, dtype=float)
     assert sim.shape == (N + 1, N)
 
-    fsim = np.array(await asyncio.gather(*[func(x) for x in sim]), dtype=float)
-    assert fsim.shape == (N + 1, )
+    if resume_from is None:
+        fsim = np.array(
+            await asyncio.gather(*[func(x) for x in sim]), dtype=float
+        )
+        assert fsim.shape == (N + 1, )
 
-    ind = np.argsort(fsim)
-    fsim = np.take(fsim, ind, 0)
-    # sort so sim[0,:] has the lowest function value
-    sim = np.take(sim, ind, 0)
+        ind = np.argsort(fsim)
+        fsim = np.take(fsim, ind, 0)
+        # sort so sim[0,:] has the lowest function value
+        sim = np.take(sim, ind, 0)
 
-    # if keep_history is false, we still need the last simplex
-    simplex_history = [np.copy(sim)]
-    if keep_history:
-        fun_simplex_history = [np.copy(fsim)]
+        history = _History(N, keep_history=keep_history)
+        history.append(sim, fsim)
 
-    iterations = 1
+        iterations = 1
+    else:
+        fsim = np.array(resume_from.fun_simplex, dtype=float)
+        fcalls[0] = resume_from.num_fev
+        iterations = resume_from.num_iter
+        history = _History(N, keep_history=keep_history)
+        if keep_history:
+            for hist_sim, hist_fsim in zip(
+                resume_from.simplex_history, resume_from.fun_simplex_history
+            ):
+                history.append(hist_sim, hist_fsim)
+        else:
+            history.append(sim, fsim)
+    aborted = False
+    stopped = False
+
+    # Buffers which are re-used in each iteration. The function is
+    # evaluated on copies of the trial points.
+    xbar = np.empty(N)
+    # The reflection, expansion, contraction and inside contraction points
+    # are 'coeff_xbar * xbar + coeff_worst * sim[-1]'.
+    coeff_xbar = np.array([[1 + rho], [1 + rho * chi], [1 + psi * rho],
+                           [1 - psi]])
+    coeff_worst = np.array([[-rho], [-rho * chi], [-psi * rho], [psi]])
+    trial_points = np.empty((4, N))
+    xr, xe, xc, xcc = trial_points
+    trial_tmp = np.empty((4, N))
+    tmp = np.empty(N)
+    edges = np.empty((N, N))
+    fdiff = np.empty(N)
+    deltas = np.empty((N + 1, N + 1, N))
 
     while (fcalls[0] < maxfun and iterations < maxiter):
+        if checkpoint is not None:
+            checkpoint(
+                MinimizationCheckpoint(
+                    simplex=sim,
+                    fun_simplex=fsim,
+                    num_iter=iterations,
+                    num_fev=fcalls[0],
+                    **history.get_kwargs(copy=not keep_history)
+                )
+            )
+        if stop_value is not None and fsim[0] < stop_value:
+            stopped = True
+            break
         if (
             fprime_cutoff is not None
-            and _get_fprime_estimate(sim=sim, fval=fsim[0]) > fprime_cutoff
+            and _get_fprime_estimate(sim=sim, fval=fsim[0],
+                                     deltas=deltas) > fprime_cutoff
         ):
             break
-        with warnings.catch_warnings():
-            # Ignore subtraction 'inf - inf' in fsim, since it will correctly
-            # evaluate to False.
-            warnings.simplefilter('ignore')
-            if (
-                np.max(np.ravel(np.abs(sim[1:] - sim[0]))) <= xtol
-                and np.max(np.abs(fsim[0] - fsim[1:])) <= ftol
-            ):
-                break
+        np.subtract(sim[1:], sim[0], out=edges)
+        if np.abs(edges, out=edges).max() <= xtol:
+            with np.errstate(invalid='ignore'):
+                # Ignore subtraction 'inf - inf' in fsim, since it will
+                # correctly evaluate to False.
+                np.subtract(fsim[0], fsim[1:], out=fdiff)
+                if np.abs(fdiff, out=fdiff).max() <= ftol:
+                    break
+        if should_continue is not None and not should_continue(sim, fsim):
+            aborted = True
+            break
 
-        xbar = np.add.reduce(sim[:-1], 0) / N
-        xr = (1 + rho) * xbar - rho * sim[-1]
-        fxr = await func(xr)
+        np.add.reduce(sim[:-1], 0, out=xbar)
+        xbar /= N
+        np.multiply(coeff_xbar, xbar, out=trial_points)
+        np.multiply(coeff_worst, sim[-1], out=trial_tmp)
+        trial_points += trial_tmp
+        if speculative is True or (callable(speculative) and speculative()):
+            fxr, fxe, fxc, fxcc = await asyncio.gather(
+                func(xr), func(xe), func(xc), func(xcc)
+            )
+        else:
+            fxr = await func(xr)
+            fxe = fxc = fxcc = None
         doshrink = 0
 
         if fxr < fsim[0]:
-            xe = (1 + rho * chi) * xbar - rho * chi * sim[-1]
-            fxe = await func(xe)
+            if fxe is None:
+                fxe = await func(xe)
 
             if fxe < fxr:
                 sim[-1] = xe
@@ -166,8 +256,8 @@ async def root_nelder_mead(
             else:  # fxr >= fsim[-2]
                 # Perform contraction
                 if fxr < fsim[-1]:
-                    xc = (1 + psi * rho) * xbar - psi * rho * sim[-1]
-                    fxc = await func(xc)
+                    if fxc is None:
+                        fxc = await func(xc)
 
                     if fxc <= fxr:
                         sim[-1] = xc
@@ -176,8 +266,8 @@ async def root_nelder_mead(
                         doshrink = 1
                 else:
                     # Perform an inside contraction
-                    xcc = (1 - psi) * xbar + psi * sim[-1]
-                    fxcc = await func(xcc)
+                    if fxcc is None:
+                        fxcc = await func(xcc)
 
                     if fxcc < fsim[-1]:
                         sim[-1] = xcc
@@ -188,44 +278,49 @@ async def root_nelder_mead(
                 if doshrink:
                     for j in one2np1:
                         sim[j] = sim[0] + sigma * (sim[j] - sim[0])
-                        fsim[j] = await func(sim[j])
+                    if parallel_shrink:
+                        fsim[1:] = await asyncio.gather(
+                            *[func(x) for x in sim[1:]]
+                        )
+                    else:
+                        for j in one2np1:
+                            fsim[j] = await func(sim[j])
 
-        ind = np.argsort(fsim)
-        sim = np.take(sim, ind, 0)
-        fsim = np.take(fsim, ind, 0)
-        iterations += 1
-        if keep_history:
-            simplex_history.append(np.copy(sim))
-            fun_simplex_history.append(np.copy(fsim))
+        if doshrink:
+            ind = np.argsort(fsim)
+            sim[:] = np.take(sim, ind, 0)
+            fsim[:] = np.take(fsim, ind, 0)
         else:
-            simplex_history[0] = np.copy(sim)
+            # Only the last vertex has changed, the others are still sorted.
+            _insert_last(sim, fsim, tmp)
+        iterations += 1
+        history.append(sim, fsim)
 
     x = sim[0]
     fval = np.min(fsim)
     warnflag = 0
 
-    if fcalls[0] >= maxfun:
+    if aborted:
+        warnflag = ABORTED_STATUS
+        msg = _status_message['aborted']
+    elif stopped:
+        warnflag = STOP_VALUE_STATUS
+        msg = _status_message['stop_value']
+    elif fcalls[0] >= maxfun:
         warnflag = 1
         msg = _status_message['maxfev']
     elif iterations >= maxiter:
         warnflag = 2
         msg = _status_message['maxiter']
     elif (
-        fprime_cutoff is not None
-        and _get_fprime_estimate(sim=sim, fval=fval) > fprime_cutoff
+        fprime_cutoff is not None and
+        _get_fprime_estimate(sim=sim, fval=fval, deltas=deltas) > fprime_cutoff
     ):
         warnflag = 3
         msg = _status_message['fprime_cutoff']
     else:
         msg = _status_message['success']
 
-    if keep_history:
-        hist_kwargs = dict(
-            simplex_history=np.array(simplex_history),
-            fun_simplex_history=np.array(fun_simplex_history)
-        )
-    else:
-        hist_kwargs = dict(simplex_history=np.array(simplex_history))
     result = MinimizationResult(
         pos=x,
         value=fval,
@@ -234,19 +329,75 @@ async def root_nelder_mead(
         status=warnflag,
         success=(warnflag == 0),
         message=msg,
-        **hist_kwargs
+        **history.get_kwargs(copy=True)
     )
     return result
 
 
-def _get_fprime_estimate(sim, fval):
-    return fval / np.sqrt(
-        np.max(
-            np.sum(
-                np.square([
-                    p2 - p1 for p1, p2 in itertools.combinations(sim, r=2)
-                ]),
-                axis=-1
-            )
-        )
-    )
+def _insert_last(sim, fsim, tmp):
+    """
+    Move the last vertex of the simplex, which is the only one whose
+    function value has changed, to its sorted position. Vertices with the
+    same function value keep their order.
+    """
+    idx = fsim[:-1].searchsorted(fsim[-1], side='right')
+    if idx == len(fsim) - 1:
+        return
+    value = fsim[-1]
+    tmp[:] = sim[-1]
+    for j in range(len(fsim) - 1, idx, -1):
+        sim[j] = sim[j - 1]
+        fsim[j] = fsim[j - 1]
+    sim[idx] = tmp
+    fsim[idx] = value
+
+
+def _get_fprime_estimate(sim, fval, deltas=None):
+    """
+    Estimate the maximum derivative from the function value and the longest
+    edge of the simplex. The ``deltas`` buffer of shape (N + 1, N + 1, N) is
+    used for the edge vectors if given.
+    """
+    deltas = np.subtract(sim[:, None, :], sim[None, :, :], out=deltas)
+    np.square(deltas, out=deltas)
+    return fval / np.sqrt(deltas.sum(axis=-1).max())
+
+
+class _History:
+    """
+    Stores the simplices and their function values in preallocated arrays,
+    which are enlarged when they are full. If ``keep_history`` is false,
+    only the last simplex is stored.
+    """
+    def __init__(self, N, *, keep_history):
+        self.keep_history = keep_history
+        capacity = 64 if keep_history else 1
+        self._sim = np.empty((capacity, N + 1, N))
+        self._fsim = np.empty((capacity, N + 1))
+        self._size = 0
+
+    def append(self, sim, fsim):
+        if not self.keep_history:
+            self._sim[0] = sim
+            self._size = 1
+            return
+        if self._size == len(self._sim):
+            # Rows which are already filled are never changed, such that
+            # views of them (in the checkpoints) remain valid.
+            self._sim = np.concatenate([self._sim, np.empty_like(self._sim)])
+            self._fsim = np.concatenate([
+                self._fsim, np.empty_like(self._fsim)
+            ])
+        self._sim[self._size] = sim
+        self._fsim[self._size] = fsim
+        self._size += 1
+
+    def get_kwargs(self, *, copy):
+        """
+        Get the history keyword arguments for the result or checkpoint.
+        """
+        convert = np.array if copy else lambda x: x
+        res = dict(simplex_history=convert(self._sim[:self._size]))
+        if self.keep_history:
+            res['fun_simplex_history'] = convert(self._fsim[:self._size])
+        return res
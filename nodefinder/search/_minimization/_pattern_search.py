@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the adaptive pattern search algorithm for finding the roots of a
+gap function.
+"""
+
+import numpy as np
+from fsc.export import export
+
+from ..result._minimization import (
+    MinimizationResult, MinimizationCheckpoint, ABORTED_STATUS,
+    STOP_VALUE_STATUS
+)
+from ._nelder_mead import _status_message, _get_fprime_estimate, _History
+
+
+@export
+async def root_pattern_search(
+    func,
+    *,
+    initial_simplex,
+    xtol,
+    ftol,
+    maxiter=None,
+    maxfev=None,
+    fprime_cutoff=None,
+    stop_value=None,
+    keep_history=True,
+    should_continue=None,
+    checkpoint=None,
+    resume_from=None,
+    expansion=1.,
+    contraction=0.5,
+    search_step=True
+):
+    """
+    Root-finding using an adaptive (compass) pattern search. At each
+    iteration, the points at a distance ``step`` from the current position
+    along the positive and negative coordinate axes are polled one by one,
+    until one of them has a lower function value. The position is then
+    moved to that point, and the step is multiplied by ``expansion``. The
+    direction of the last successful move is polled first in the next
+    iteration.
+
+    If the poll fails, its values give a central-difference estimate of
+    the gradient. If ``search_step`` is set, one additional point is
+    evaluated at the Gauss-Newton step towards the root, limited to the
+    current step. The directions are then polled in the order of the
+    estimated descent, and the step is reduced by ``contraction``, or to
+    a quarter of the estimated distance to the root if that is smaller.
+    For the linear crossings of a gap function, this adapts the step to
+    the distance from the node, such that it decreases by roughly an order
+    of magnitude in each failed poll.
+
+    The state is represented by the simplex spanned by the current
+    position and the step along each of the first ``dim`` poll directions,
+    in the order in which they are polled. Only the first vertex is
+    evaluated, the function values of the other vertices are set to
+    ``nan``. The minimization is started from the centroid of the
+    ``initial_simplex``, with the largest distance to its vertices as
+    initial step. Since the poll accepts any decrease of the function
+    value, the minimization can drift along extended nodal features
+    towards regions of smaller gap. Nodal surfaces are therefore covered
+    less evenly than with :func:`.root_nelder_mead`.
+
+    The ``fprime_cutoff`` criterion of :func:`.root_nelder_mead` is applied
+    after each poll, with the distance between its opposite points (twice
+    the step of the poll) in place of the longest edge of the simplex.
+    Before the first poll, the longest edge of the ``initial_simplex`` is
+    used.
+
+    Arguments
+    ---------
+    func : collections.abc.Callable
+        Coroutine describing the function to be minimized.
+    initial_simplex : numpy.ndarray
+        Coordinates of the initial simplex.
+    xtol : float
+        Step below which the minimization is considered converged.
+    ftol : float
+        Maximum difference between the function values of the current
+        position and the evaluated points around it, below which the
+        minimization is considered converged.
+    maxiter : int
+        Maximum number of iterations to perform.
+    maxfev : int
+        Maximum number of function evaluations to make.
+    fprime_cutoff:
+        Cutoff for the additional root-finding aborting criterion.
+    stop_value : float
+        The minimization is stopped with status ``STOP_VALUE_STATUS`` once
+        the function value is below this value.
+    keep_history : bool
+        Store the history of the simplices in the result.
+    should_continue : collections.abc.Callable
+        Function which is called with the current simplex and its function
+        values at each iteration. If it returns ``False``, the minimization
+        is aborted with status ``ABORTED_STATUS``.
+    checkpoint : collections.abc.Callable
+        Function which is called with a :class:`.MinimizationCheckpoint` of
+        the current state at the start of each iteration.
+    resume_from : MinimizationCheckpoint
+        Checkpoint from which the minimization is resumed.
+    expansion : float
+        Factor by which the step is multiplied after a successful move.
+    contraction : float
+        Factor by which the step is reduced when the poll fails.
+    search_step : bool
+        Evaluate the Gauss-Newton step estimated from a failed poll.
+
+    Returns
+    -------
+    MinimizationResult:
+        The result of the optimization.
+    """
+    num_fev = 0
+
+    async def evaluate(pos):
+        nonlocal num_fev
+        num_fev += 1
+        return float(await func(pos))
+
+    if resume_from is not None:
+        initial_simplex = resume_from.simplex
+    initial_simplex = np.array(initial_simplex, dtype=float)
+    dim = initial_simplex.shape[-1]
+    assert initial_simplex.shape == (dim + 1, dim)
+    if maxiter is None:
+        maxiter = dim * 200
+    if maxfev is None:
+        maxfev = dim * 200
+
+    fun_simplex = np.full(dim + 1, np.nan)
+    history = _History(dim, keep_history=keep_history)
+    if resume_from is None:
+        pos = np.mean(initial_simplex, axis=0)
+        value = await evaluate(pos)
+        step = np.max(np.linalg.norm(initial_simplex - pos, axis=-1))
+        directions = np.eye(dim)
+        iterations = 1
+    else:
+        pos = np.copy(initial_simplex[0])
+        step, directions = _get_step_and_directions(initial_simplex)
+        value = float(resume_from.fun_simplex[0])
+        num_fev = resume_from.num_fev
+        iterations = resume_from.num_iter
+        if keep_history:
+            for hist_sim, hist_fsim in zip(
+                resume_from.simplex_history, resume_from.fun_simplex_history
+            ):
+                history.append(hist_sim, hist_fsim)
+
+    def update_simplex():
+        nonlocal step
+        fun_simplex[0] = value
+        simplex = pos + step * np.concatenate([np.zeros((1, dim)), directions])
+        # Use the step as it is recovered from the simplex, such that
+        # resuming from a checkpoint gives exactly the same result.
+        step = _get_step(simplex)
+        return simplex
+
+    if resume_from is None:
+        simplex = update_simplex()
+        history.append(simplex, fun_simplex)
+    else:
+        simplex = initial_simplex
+        fun_simplex[0] = value
+        # The current state is already in the history, unless only the
+        # last simplex is kept.
+        if not keep_history:
+            history.append(simplex, fun_simplex)
+    aborted = False
+    stopped = False
+    # When resuming, the criterion has already been checked for the
+    # current state.
+    fprime_exceeded = (
+        resume_from is None and fprime_cutoff is not None
+        and _get_fprime_estimate(initial_simplex, value) > fprime_cutoff
+    )
+
+    while not fprime_exceeded and num_fev < maxfev and iterations < maxiter:
+        if checkpoint is not None:
+            checkpoint(
+                MinimizationCheckpoint(
+                    simplex=simplex,
+                    fun_simplex=fun_simplex,
+                    num_iter=iterations,
+                    num_fev=num_fev,
+                    **history.get_kwargs(copy=not keep_history)
+                )
+            )
+        if stop_value is not None and value < stop_value:
+            stopped = True
+            break
+        if value == 0:
+            break
+        if should_continue is not None and not should_continue(
+            simplex, fun_simplex
+        ):
+            aborted = True
+            break
+
+        poll_step = step
+        poll_values = []
+        for direction in np.concatenate([directions, -directions]):
+            if num_fev >= maxfev:
+                break
+            new_pos = pos + step * direction
+            new_value = await evaluate(new_pos)
+            poll_values.append(new_value)
+            if new_value < value:
+                pos = new_pos
+                value = new_value
+                # Evaluate the successful direction first in the next
+                # iteration.
+                is_other = np.any(directions != direction, axis=-1) & np.any(
+                    directions != -direction, axis=-1
+                )
+                directions = np.concatenate([[direction],
+                                             directions[is_other]])
+                step *= expansion
+                break
+        else:
+            poll_values = np.array(poll_values)
+            if step <= xtol and np.isfinite(value) and np.max(
+                np.abs(poll_values - value)
+            ) <= ftol:
+                break
+            new_step = contraction * step
+            if search_step and num_fev < maxfev and np.all(
+                np.isfinite(poll_values)
+            ):
+                # Central-difference estimate of the gradient, from the
+                # values of the failed poll.
+                gradient = directions.T @ (
+                    poll_values[:dim] - poll_values[dim:]
+                ) / (2 * step)
+                gradient_norm_sq = gradient @ gradient
+                slope = max(
+                    np.sqrt(gradient_norm_sq),
+                    np.max(np.abs(poll_values - value)) / step
+                )
+                if gradient_norm_sq > 0:
+                    move = -value / gradient_norm_sq * gradient
+                    move_length = np.linalg.norm(move)
+                    if move_length > step:
+                        move *= step / move_length
+                    new_value = await evaluate(pos + move)
+                    if new_value < value:
+                        pos = pos + move
+                        value = new_value
+                    # Poll along the estimated descent directions first.
+                    axes = np.argsort(-np.abs(gradient), kind='stable')
+                    directions = np.where(gradient[axes, None] > 0, -1.,
+                                          1.) * np.eye(dim)[axes]
+                if slope > 0:
+                    # Poll well within the estimated distance to the root.
+                    new_step = min(new_step, 0.25 * value / slope)
+            step = new_step
+        iterations += 1
+        simplex = update_simplex()
+        history.append(simplex, fun_simplex)
+        fprime_exceeded = (
+            fprime_cutoff is not None
+            and value / (2 * poll_step) > fprime_cutoff
+        )
+
+    if aborted:
+        status = ABORTED_STATUS
+        message = _status_message['aborted']
+    elif stopped:
+        status = STOP_VALUE_STATUS
+        message = _status_message['stop_value']
+    elif num_fev >= maxfev:
+        status = 1
+        message = _status_message['maxfev']
+    elif iterations >= maxiter:
+        status = 2
+        message = _status_message['maxiter']
+    elif fprime_exceeded:
+        status = 3
+        message = _status_message['fprime_cutoff']
+    else:
+        status = 0
+        message = _status_message['success']
+
+    return MinimizationResult(
+        pos=pos,
+        value=value,
+        num_iter=iterations,
+        num_fev=num_fev,
+        status=status,
+        success=(status == 0),
+        message=message,
+        **history.get_kwargs(copy=True)
+    )
+
+
+def _get_step(simplex):
+    """
+    Get the length of the longest edge of the simplex which contains the
+    first vertex.
+    """
+    return np.max(np.linalg.norm(simplex[1:] - simplex[0], axis=-1))
+
+
+def _get_step_and_directions(simplex):
+    """
+    Recover the step and the ordered poll directions from the simplex
+    representing the state of the pattern search.
+    """
+    step = _get_step(simplex)
+    edges = simplex[1:] - simplex[0]
+    directions = np.zeros_like(edges)
+    for direction, edge in zip(directions, edges):
+        axis = np.argmax(np.abs(edge))
+        direction[axis] = np.sign(edge[axis])
+    return step, directions
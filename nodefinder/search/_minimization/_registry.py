@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the registry of the minimizers which can be selected by name.
+"""
+
+from fsc.export import export
+
+from ._nelder_mead import root_nelder_mead
+from ._gauss_newton import root_gauss_newton
+from ._pattern_search import root_pattern_search
+
+_MINIMIZERS = {
+    'nelder_mead': root_nelder_mead,
+    'gauss_newton': root_gauss_newton,
+    'pattern_search': root_pattern_search,
+}
+
+
+@export
+def register_minimizer(name, minimizer, *, overwrite=False):
+    """
+    Register a minimizer, such that it can be selected by name in the
+    ``minimizer`` option of :func:`.run`.
+
+    Arguments
+    ---------
+    name : str
+        Name of the minimizer.
+    minimizer : collections.abc.Callable
+        Coroutine implementing the minimizer interface described in
+        :mod:`nodefinder.search.minimizer`.
+    overwrite : bool
+        Replace an existing minimizer of the same name. Otherwise, a
+        ``ValueError`` is raised if the name is already registered.
+    """
+    if not overwrite and name in _MINIMIZERS:
+        raise ValueError(
+            "A minimizer with name '{}' is already registered.".format(name)
+        )
+    _MINIMIZERS[name] = minimizer
+
+
+def get_minimizer(minimizer):
+    """
+    Get the minimizer coroutine from its name, or return it unchanged if it
+    is already given as a coroutine.
+    """
+    if isinstance(minimizer, str):
+        try:
+            return _MINIMIZERS[minimizer]
+        except KeyError:
+            raise ValueError(
+                "Unknown minimizer '{}', must be one of {}.".format(
+                    minimizer, sorted(_MINIMIZERS)
+                )
+            )
+    return minimizer
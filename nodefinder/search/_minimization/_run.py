@@ -7,27 +7,68 @@ Defines the function running the minimization, including the fake potential.
 """
 
 from types import MappingProxyType
+from collections import ChainMap
 
+import numpy as np
 from fsc.export import export
 
-from ..result._minimization import JoinedMinimizationResult
-from ._nelder_mead import root_nelder_mead
+from ..result._minimization import (
+    JoinedMinimizationResult, ABORTED_STATUS, COARSE_FIDELITY,
+    ACCURATE_FIDELITY
+)
+from ._registry import get_minimizer
+
+
+def resolve_speculative(nelder_mead_kwargs, *, has_spare_capacity):
+    """
+    Replace the ``speculative='auto'`` option of the Nelder-Mead algorithm
+    by the given function, which checks whether there is spare capacity for
+    evaluating the function.
+    """
+    if nelder_mead_kwargs.get('speculative') == 'auto':
+        return ChainMap({'speculative': has_spare_capacity},
+                        nelder_mead_kwargs)
+    return nelder_mead_kwargs
 
 
 def add_fake_potential(fake_pot, func):
     async def evaluate(x):
-        return (await func(x)) + fake_pot(x)
+        res = await func(x)
+        if isinstance(res, tuple):
+            # The fake potential is piecewise constant, and does not change
+            # the gradient.
+            value, gradient = res
+            return value + fake_pot(x), gradient
+        return res + fake_pot(x)
 
     return evaluate
 
 
+def set_fidelity(result, fidelity):
+    """
+    Set the fidelity of a minimization result, including the results of all
+    steps if it is joined.
+    """
+    if isinstance(result, JoinedMinimizationResult):
+        set_fidelity(result.ancestor, fidelity)
+        set_fidelity(result.child, fidelity)
+    else:
+        result.fidelity = fidelity
+
+
 @export
 async def run_minimization(
     func,
     *,
     initial_simplex,
     fake_potential=None,
-    nelder_mead_kwargs=MappingProxyType({})
+    nelder_mead_kwargs=MappingProxyType({}),
+    should_continue=None,
+    checkpoint=None,
+    resume_from=None,
+    coarse_func=None,
+    coarse_threshold=None,
+    minimizer='nelder_mead'
 ):
     """Runs the minimization, including handling the fake potential.
 
@@ -47,7 +88,76 @@ async def run_minimization(
         Function describing the fake potential.
     nelder_mead_kwargs : collections.abc.Mapping
         Keyword arguments passed to the Nelder-Mead algorithm.
+    should_continue : collections.abc.Callable
+        Check whether the minimization should be continued, passed to the
+        Nelder-Mead algorithm. If the minimization with fake potential is
+        aborted, the second step is skipped.
+    checkpoint : collections.abc.Callable
+        Function which is called with a :class:`.MinimizationCheckpoint` at
+        the start of each iteration. The checkpoint contains the
+        ``initial_simplex``, and the result of the first step as
+        ``ancestor`` when the second step is running.
+    resume_from : MinimizationCheckpoint
+        Checkpoint from which the minimization is resumed.
+    coarse_func : collections.abc.Callable
+        Function or coroutine describing a cheaper approximation of the
+        potential. If given, the minimization (including the fake potential)
+        is first run on the coarse potential, until its value is below
+        ``coarse_threshold``. Only then is the minimization continued
+        without fake potential on ``func``, starting from the enlarged final
+        simplex of the coarse minimization. If the coarse value does not
+        reach the threshold, ``func`` is not evaluated at all. The
+        ``fidelity`` attribute of the result is set accordingly.
+    coarse_threshold : float
+        Value of the coarse potential below which the minimization switches
+        to ``func``.
+    minimizer : str or collections.abc.Callable
+        The minimization algorithm, given either as a name or as a coroutine
+        implementing the interface described in
+        :mod:`nodefinder.search.minimizer`. The built-in names are
+        ``'nelder_mead'`` for :func:`.root_nelder_mead`,
+        ``'pattern_search'`` for :func:`.root_pattern_search`, and
+        ``'gauss_newton'`` for :func:`.root_gauss_newton`, where the
+        function must return a tuple of its value and gradient. Further
+        minimizers can be added with :func:`.register_minimizer`. The
+        ``nelder_mead_kwargs`` are passed to the minimizer.
     """
+    minimizer = get_minimizer(minimizer)
+    if coarse_func is not None:
+        return await _run_multi_fidelity_minimization(
+            func,
+            coarse_func=coarse_func,
+            coarse_threshold=coarse_threshold,
+            initial_simplex=initial_simplex,
+            fake_potential=fake_potential,
+            nelder_mead_kwargs=nelder_mead_kwargs,
+            should_continue=should_continue,
+            checkpoint=checkpoint,
+            resume_from=resume_from,
+            minimizer=minimizer
+        )
+    if resume_from is not None:
+        ancestor = getattr(resume_from, 'ancestor', None)
+    else:
+        ancestor = None
+
+    def get_checkpoint_fct(ancestor):
+        """
+        Create the function which adds the information about the
+        minimization run to the checkpoints of a single Nelder-Mead run.
+        """
+        if checkpoint is None:
+            return None
+        initial_simplex_array = np.array(initial_simplex)
+
+        def inner(state):
+            state.initial_simplex = initial_simplex_array
+            if ancestor is not None:
+                state.ancestor = ancestor
+            checkpoint(state)
+
+        return inner
+
     if fake_potential is not None:
         # TODO: Check if deepcopying fake potential is valid / better.
         # possible issue when not deep-copying is that the fake potential may
@@ -56,21 +166,106 @@ async def run_minimization(
         # region.
         modified_kwargs = dict(nelder_mead_kwargs)
         modified_kwargs['ftol'] = float('inf')
-        res_fake = await root_nelder_mead(
-            func=add_fake_potential(fake_potential, func),
-            initial_simplex=initial_simplex,
-            **modified_kwargs
+        if ancestor is None:
+            res_fake = await minimizer(
+                func=add_fake_potential(fake_potential, func),
+                initial_simplex=initial_simplex,
+                should_continue=should_continue,
+                checkpoint=get_checkpoint_fct(ancestor=None),
+                resume_from=resume_from,
+                **modified_kwargs
+            )
+            if res_fake.status == ABORTED_STATUS:
+                return res_fake
+            resume_from = None
+        else:
+            res_fake = ancestor
+        res = await minimizer(
+            func=func,
+            initial_simplex=_enlarge_final_simplex(res_fake),
+            should_continue=should_continue,
+            checkpoint=get_checkpoint_fct(ancestor=res_fake),
+            resume_from=resume_from,
+            **nelder_mead_kwargs
         )
-        simplex_final = res_fake.simplex_history[-1]
-        simplex_blowup = simplex_final[
-            0] + 1.5 * (simplex_final - simplex_final[0])
 
-        res = await root_nelder_mead(
-            func=func, initial_simplex=simplex_blowup, **nelder_mead_kwargs
+        return JoinedMinimizationResult(child=res, ancestor=res_fake)
+    else:
+        return await minimizer(
+            func=func,
+            initial_simplex=initial_simplex,
+            should_continue=should_continue,
+            checkpoint=get_checkpoint_fct(ancestor=None),
+            resume_from=resume_from,
+            **nelder_mead_kwargs
         )
 
-        return JoinedMinimizationResult(child=res, ancestor=res_fake)
+
+def _enlarge_final_simplex(result):
+    """
+    Enlarge the final simplex of a minimization result, to be used as the
+    initial simplex of the next step.
+    """
+    simplex_final = result.simplex_history[-1]
+    return simplex_final[0] + 1.5 * (simplex_final - simplex_final[0])
+
+
+async def _run_multi_fidelity_minimization(
+    func, *, coarse_func, coarse_threshold, initial_simplex, fake_potential,
+    nelder_mead_kwargs, should_continue, checkpoint, resume_from, minimizer
+):
+    """
+    Run the minimization first on the coarse potential, and then on the
+    accurate potential. Arguments are the same as in
+    :func:`.run_minimization`.
+    """
+    def get_checkpoint_fct(fidelity, ancestor=None):
+        """
+        Create the function which adds the fidelity of the running step to
+        the checkpoints.
+        """
+        if checkpoint is None:
+            return None
+        initial_simplex_array = np.array(initial_simplex)
+
+        def inner(state):
+            state.initial_simplex = initial_simplex_array
+            state.fidelity = fidelity
+            if ancestor is not None:
+                state.ancestor = ancestor
+            checkpoint(state)
+
+        return inner
+
+    if getattr(resume_from, 'fidelity', None) == ACCURATE_FIDELITY:
+        res_coarse = resume_from.ancestor
     else:
-        return await root_nelder_mead(
-            func=func, initial_simplex=initial_simplex, **nelder_mead_kwargs
+        res_coarse = await run_minimization(
+            coarse_func,
+            initial_simplex=initial_simplex,
+            fake_potential=fake_potential,
+            nelder_mead_kwargs=ChainMap({'stop_value': coarse_threshold},
+                                        nelder_mead_kwargs),
+            should_continue=should_continue,
+            checkpoint=get_checkpoint_fct(COARSE_FIDELITY),
+            resume_from=resume_from,
+            minimizer=minimizer
         )
+        set_fidelity(res_coarse, COARSE_FIDELITY)
+        if (
+            res_coarse.status == ABORTED_STATUS
+            or res_coarse.value >= coarse_threshold
+        ):
+            return res_coarse
+        resume_from = None
+
+    res = await minimizer(
+        func=func,
+        initial_simplex=_enlarge_final_simplex(res_coarse),
+        should_continue=should_continue,
+        checkpoint=get_checkpoint_fct(ACCURATE_FIDELITY, ancestor=res_coarse),
+        resume_from=resume_from,
+        **nelder_mead_kwargs
+    )
+    set_fidelity(res, ACCURATE_FIDELITY)
+    return JoinedMinimizationResult(child=res, ancestor=res_coarse)
@@ -6,8 +6,10 @@
 Defines the SimplexQueue, which tracks the state of simplices to be minimized.
 """
 
+import heapq
+import itertools
 from abc import ABC, abstractmethod
-from queue import Queue
+from queue import Empty
 
 import numpy as np
 from fsc.export import export
@@ -17,15 +19,22 @@ from fsc.hdf5_io import HDF5Enabled, subscribe_hdf5
 class ObjectQueue(HDF5Enabled, ABC):
     """
     General queue class. Implements caching (queueing objects only once) and
-    HDF5 serialization on top of the built-in Queue.
+    HDF5 serialization on top of a priority queue. Objects with a lower
+    priority value are returned first, and objects of equal priority are
+    returned in the order they were added.
     """
 
     HDF5_ATTRIBUTES = ['objects']
+    HDF5_OPTIONAL = ['priorities']
 
-    def __init__(self, objects=frozenset()):
+    def __init__(self, objects=frozenset(), priorities=None):
         all_objects = self.normalize(objects)
-        self._queued_objects = Queue()
-        self._extend_queue(all_objects)
+        all_priorities = self._normalize_priorities(
+            priorities, num_objects=len(all_objects)
+        )
+        self._queued_objects = []
+        self._counter = itertools.count()
+        self._extend_queue(all_objects, all_priorities)
 
         self._all_objects = set(all_objects)
         self.needs_saving = True
@@ -34,51 +43,102 @@ class ObjectQueue(HDF5Enabled, ABC):
     def normalize(self, objects):
         raise NotImplementedError
 
+    @staticmethod
+    def _normalize_priorities(priorities, *, num_objects):
+        """
+        Convert the priorities to a list of floats, using the default priority
+        of zero if no priorities are given.
+        """
+        if priorities is None:
+            return [0.] * num_objects
+        priorities = [float(p) for p in priorities]
+        if len(priorities) != num_objects:
+            raise ValueError(
+                'The number of priorities ({}) does not match the number of objects ({}).'
+                .format(len(priorities), num_objects)
+            )
+        return priorities
+
     @property
     def objects(self):
-        return list(self._queued_objects.queue)
+        return [obj for _, _, obj in sorted(self._queued_objects)]
+
+    @property
+    def priorities(self):
+        """
+        The priorities of the objects, in the same order as ``objects``.
+        """
+        return [priority for priority, _, _ in sorted(self._queued_objects)]
 
     def pop_queued(self):
-        return self._queued_objects.get_nowait()
+        return self._pop_queued_with_priority()[1]
+
+    def _pop_queued_with_priority(self):
+        """
+        Get the queued object with the lowest priority value, together with
+        its priority.
+        """
+        try:
+            priority, _, obj = heapq.heappop(self._queued_objects)
+        except IndexError as exc:
+            raise Empty from exc
+        return priority, obj
 
-    def add_objects(self, objects):
+    def add_objects(self, objects, priorities=None):
         """
         Add new objects to the queue.
         """
         new_objects = self.normalize(objects)
-        new_objects_filtered = [
-            obj for obj in new_objects if obj not in self._all_objects
-        ]
+        new_priorities = self._normalize_priorities(
+            priorities, num_objects=len(new_objects)
+        )
+        new_objects_filtered = []
+        new_priorities_filtered = []
+        for obj, priority in zip(new_objects, new_priorities):
+            if obj not in self._all_objects:
+                new_objects_filtered.append(obj)
+                new_priorities_filtered.append(priority)
         if new_objects_filtered:
-            self._extend_queue(new_objects_filtered)
+            self._extend_queue(new_objects_filtered, new_priorities_filtered)
             self._all_objects.update(new_objects_filtered)
             self.needs_saving = True
 
-    def _extend_queue(self, objects):
+    def _extend_queue(self, objects, priorities):
         """
         Add given objects to '_queued_objects'. Note that this does _not_
         handle the other attributes, use 'add_objects' for this purpose.
         """
-        for obj in objects:
-            self._queued_objects.put_nowait(obj)
+        for obj, priority in zip(objects, priorities):
+            heapq.heappush(
+                self._queued_objects, (priority, next(self._counter), obj)
+            )
 
     @property
     def has_queued(self):
         """
         Shows if there are currently queued objects.
         """
-        return not self._queued_objects.empty()
+        return bool(self._queued_objects)
+
+    @property
+    def num_queued(self):
+        """
+        Gives the number of currently queued objects.
+        """
+        return len(self._queued_objects)
 
     @classmethod
     def from_hdf5(cls, hdf5_handle):
-        # try:
         objects = np.array(hdf5_handle['objects'])
-        # except
-        return cls(objects=objects)
+        if 'priorities' in hdf5_handle:
+            priorities = np.array(hdf5_handle['priorities'])
+        else:
+            priorities = None
+        return cls(objects=objects, priorities=priorities)
 
     def to_hdf5(self, hdf5_handle):
-        objects = np.array(self.objects)
-        hdf5_handle['objects'] = objects
+        hdf5_handle['objects'] = np.array(self.objects)
+        hdf5_handle['priorities'] = np.array(self.priorities, dtype=float)
 
 
 class RunningQueue(ObjectQueue, HDF5Enabled):  # pylint: disable=abstract-method
@@ -86,11 +146,13 @@ class RunningQueue(ObjectQueue, HDF5Enabled):  # pylint: disable=abstract-method
     Queue class for objects which can have a 'running' state. Objects are
     automatically put in the 'running' state when pop-ed from the queue, and
     need to be set to 'finished' to be removed from the queue. When reloading
-    the queue, all running objects are put back into the queue.
+    the queue, all running objects are put back into the queue, keeping their
+    priority.
     """
-    def __init__(self, objects=frozenset()):
-        super().__init__(objects=objects)
-        self._running_objects = set()
+    def __init__(self, objects=frozenset(), priorities=None):
+        # Maps the running objects to their priority.
+        self._running_objects = dict()
+        super().__init__(objects=objects, priorities=priorities)
 
     @property
     def objects(self):
@@ -98,19 +160,23 @@ class RunningQueue(ObjectQueue, HDF5Enabled):  # pylint: disable=abstract-method
         # restarting a calculation.
         return list(self._running_objects) + super().objects
 
+    @property
+    def priorities(self):
+        return list(self._running_objects.values()) + super().priorities
+
     def pop_queued(self):
         """
         Get a queued object, and add it to the running objects.
         """
-        obj = super().pop_queued()
-        self._running_objects.add(obj)
+        priority, obj = self._pop_queued_with_priority()
+        self._running_objects[obj] = priority
         return obj
 
     def set_finished(self, obj):
         """
         Mark a given object as finished.
         """
-        self._running_objects.remove(obj)
+        del self._running_objects[obj]
         self.needs_saving = True
 
     @property
@@ -118,7 +184,7 @@ class RunningQueue(ObjectQueue, HDF5Enabled):  # pylint: disable=abstract-method
         """
         Indicates whether the queue is finished.
         """
-        return not self.objects
+        return not (self._running_objects or self._queued_objects)
 
     @property
     def num_running(self):
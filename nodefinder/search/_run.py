@@ -15,12 +15,14 @@ from types import MappingProxyType
 from fsc.export import export
 
 from ._controller import Controller
+from ._channels import run_channels
+from ._server import SearchServer
 from ._logging import SEARCH_LOGGER
 
 
 @export
 async def run_async(
-    gap_fct,
+    gap_fct=None,
     *,
     limits=((0, 1), ) * 3,
     periodic=True,
@@ -39,7 +41,24 @@ async def run_async(
     num_minimize_parallel=50,
     recheck_pos_dist=True,
     recheck_count_cutoff=0,
-    simplex_check_cutoff=0
+    simplex_check_cutoff=0,
+    batch_gap_fct=None,
+    batch_kwargs=MappingProxyType({}),
+    executor=None,
+    simplex_priority=None,
+    max_fev=None,
+    deadline=None,
+    abort_redundant=False,
+    ensemble_initial_mesh=False,
+    node_callback=None,
+    saturation_window=None,
+    evaluation_cache=None,
+    num_channels=None,
+    coarse_gap_fct=None,
+    coarse_threshold_factor=100,
+    minimizer='nelder_mead',
+    server_address=None,
+    server_authkey=None
 ):
     """Run the nodal point search.
 
@@ -47,7 +66,7 @@ async def run_async(
     ---------
     gap_fct : collections.abc.Callable
         Function or coroutine describing the potential of which nodes should be
-        found.
+        found. Can be omitted if ``batch_gap_fct`` is given.
     limits : tuple(tuple(float))
         The limits of the box where nodes are searched, given as tuple for each
         dimension.
@@ -59,7 +78,9 @@ async def run_async(
     save_delay : float
         Minimum delay (in seconds) between saving the results.
     load : bool
-        Enable or disable loading the initial state from ``save_file``.
+        Enable or disable loading the initial state from ``save_file``. The
+        minimizations which were running when the state was saved are
+        resumed from the start of their last Nelder-Mead iteration.
     load_quiet : bool
         When set to ``True``, ignore errors when loading the initial state.
     initial_mesh_size : int or tuple(int)
@@ -86,10 +107,17 @@ async def run_async(
         steps, first adding a fake potential to repel the minimization from
         existing nodes.
     nelder_mead_kwargs : collections.abc.Mapping
-        Keyword arguments passed to the Nelder-Mead algorithm.
-    num_minimize_parallel : int
+        Keyword arguments passed to the Nelder-Mead algorithm. For slow gap
+        functions, ``speculative=True`` or ``speculative='auto'`` can be used
+        to reduce the latency of each minimization by evaluating several
+        points of an iteration concurrently.
+    num_minimize_parallel : int or str or AdaptiveConcurrency
         Maximum number of minimization calculations which are launched in
-        parallel.
+        parallel. If set to 'auto', the number is adapted during the run based
+        on the observed latency and throughput of the gap function evaluations,
+        see :class:`.AdaptiveConcurrency`. An :class:`.AdaptiveConcurrency`
+        instance can be given to customize this, and inspect its ``history``
+        after the run.
     recheck_pos_dist : bool
         Indicates whether the position of a refinement box is checked again
         before launching the corresponding refinement.
@@ -99,14 +127,203 @@ async def run_async(
     simplex_check_cutoff : int
         Number of vertices which are allowed to be within the cutoff distance
         when re-checking the simplex.
+    batch_gap_fct : collections.abc.Callable
+        Vectorized function or coroutine describing the potential, which takes
+        an array of positions with shape (N, dim) and returns N values. If
+        given, the evaluations requested by concurrently running minimizations
+        are collected into batches which are evaluated by a single call to
+        this function. Cannot be used together with ``gap_fct``.
+    batch_kwargs : collections.abc.Mapping
+        Keyword arguments passed to :class:`fsc.async_tools.BatchSubmitter`
+        which collects the batches, such as the flush ``timeout`` (in seconds)
+        and the ``max_batch_size``.
+    executor : concurrent.futures.Executor or int
+        Executor in which the (synchronous) gap function is evaluated, such
+        that the concurrent minimizations can run in parallel. If an integer
+        is given, a :class:`concurrent.futures.ProcessPoolExecutor` with that
+        number of workers is created, and shut down when the search finishes.
+        When using a process pool, the gap function must be picklable, e.g. a
+        module-level function or a :func:`functools.partial` thereof.
+    simplex_priority : str or collections.abc.Callable
+        Policy which determines the order in which the simplices are
+        minimized. Can be either the name of one of the policies defined in
+        :mod:`nodefinder.search.priority` ('refinement_first',
+        'lowest_value_first' or 'node_distance_first'), or a callable with the
+        same signature. If ``None``, the initial mesh is minimized before the
+        refinement simplices.
+    max_fev : int
+        Maximum number of gap function evaluations in this run. When it is
+        reached, the running minimizations are cancelled and no new ones are
+        started.
+    deadline : float or datetime.datetime
+        Wall-clock time after which the running minimizations are cancelled
+        and no new ones are started. Can be given either in seconds from the
+        start of the search, or as an absolute point in time.
+    abort_redundant : bool
+        If ``True``, running minimizations are aborted once they converge
+        onto an existing node, or onto the same position as another running
+        minimization with a lower function value. The estimated number of
+        evaluations saved is given by the ``num_fev_saved`` attribute of the
+        result.
+    ensemble_initial_mesh : bool
+        If ``True``, the simplices of the initial mesh are minimized in
+        lockstep, with a single (vectorized) evaluation of the gap function
+        per step for all simplices. This reduces the overhead of running many
+        minimizations when the gap function is cheap, in particular when
+        ``batch_gap_fct`` is given. The refinement simplices are minimized
+        as usual, and ``abort_redundant`` is not applied to the initial mesh.
+    node_callback : collections.abc.Callable
+        Function or coroutine which is called with each node (as a
+        :class:`.MinimizationResult`) as soon as it is found, starting with
+        the nodes of the initial state. A minimization is considered finished
+        only after the callback has returned, such that a slow coroutine
+        callback limits the number of minimizations which are started. See
+        also :func:`.iter_search`.
+    saturation_window : int
+        If given, the search is stopped once this number of consecutive
+        minimizations has finished without finding a new node, i.e. a node
+        which is not within the cutoff distance (a third of the
+        ``feature_size``) of the existing nodes. The counts used for this
+        decision are stored in the ``saturation_statistics`` of the result.
+    evaluation_cache : bool or EvaluationCache
+        If ``True``, the values of the gap function are cached, such that
+        positions which are evaluated repeatedly (e.g. when restarting the
+        minimization after the fake potential step, or by refinement
+        stencils of coinciding nodes) are evaluated only once. Positions
+        which agree to within a small fraction of the Nelder-Mead ``xtol``
+        share a value. An :class:`.EvaluationCache` can be given to set
+        its size, to share it between searches with the same gap function,
+        or to inspect its ``num_hits`` and ``num_misses`` after the run.
+        To re-use the values across runs, the cache can be backed by an
+        :class:`.EvaluationStore` file. The cache is not used by the
+        ensemble minimization with a ``batch_gap_fct``.
+    num_channels : int
+        If given, the gap function is vector-valued and returns one value for
+        each of ``num_channels`` channels, e.g. the gaps between several pairs
+        of bands. A separate search is run for each channel, and the channels
+        share the evaluations of the gap function through the
+        ``evaluation_cache``, which cannot be disabled or backed by an
+        :class:`.EvaluationStore`. The ``save_file`` of each channel is given
+        by appending the channel index, and the ``initial_state`` must be a
+        list of states for each channel. The ``node_callback`` is called with
+        the channel index as a second argument. The limits ``max_fev`` and
+        ``saturation_window`` apply to each channel separately, where
+        ``max_fev`` counts the evaluations requested by the channel, including
+        the ones shared with other channels. Cannot be used in server mode.
+    coarse_gap_fct : collections.abc.Callable
+        Function or coroutine describing a cheaper approximation of the
+        potential. If given, each minimization (including the initial
+        simplex) is run on the coarse potential, and the accurate gap
+        function is evaluated only once the coarse value is below
+        ``coarse_threshold_factor`` times ``gap_threshold``. Minimizations
+        which do not reach this value never evaluate the accurate gap
+        function. The ``fidelity`` attribute of each minimization result is
+        set to ``COARSE_FIDELITY`` or ``ACCURATE_FIDELITY``, depending on
+        whether the accurate gap function was used. The coarse evaluations
+        do not count towards ``max_fev``, and are not cached. Cannot be used
+        together with ``ensemble_initial_mesh`` or ``num_channels``, or in
+        server mode.
+    coarse_threshold_factor : float
+        Value of the coarse gap function, relative to ``gap_threshold``,
+        below which the minimization switches to the accurate gap function.
+        This should be large enough to account for the error of the coarse
+        approximation close to the nodes.
+    minimizer : str or collections.abc.Callable
+        The algorithm used for the minimizations. The default
+        ``'nelder_mead'`` is derivative-free, as is the adaptive pattern
+        search ``'pattern_search'`` (see :func:`.root_pattern_search`),
+        which converges the nodes more accurately but covers nodal
+        surfaces less evenly. With ``'gauss_newton'``, a
+        damped Gauss-Newton algorithm (see :func:`.root_gauss_newton`) is
+        used, which needs far fewer evaluations but requires the gap
+        function (and ``coarse_gap_fct``) to return a tuple of the value
+        and its gradient, for example
+        :meth:`.HamiltonianGap.value_and_gradient`. A ``batch_gap_fct``
+        then returns a tuple of the N values and the gradients with shape
+        (N, dim). The ``nelder_mead_kwargs`` are passed to the chosen
+        algorithm. Can also be given as the name of a minimizer added with
+        :func:`.register_minimizer`, or directly as a coroutine implementing
+        the interface described in :mod:`nodefinder.search.minimizer`.
+        Cannot be used together with ``ensemble_initial_mesh``, and
+        ``'gauss_newton'`` cannot be used with an ``evaluation_cache`` backed
+        by an :class:`.EvaluationStore`, since it cannot contain gradients.
+    server_address : str or tuple(str, int)
+        If given, the search runs as a server which distributes the
+        minimizations to worker processes started with :func:`.run_worker`.
+        The address is either the path of a Unix socket, or ``(host, port)``
+        of a TCP socket. Workers can join or leave at any time, and the
+        simplices of a worker which leaves are re-queued. The gap function
+        is passed to the workers instead of this function, and ``max_fev``
+        is checked only after each minimization.
+    server_authkey : bytes
+        Key used to authenticate the server and the workers to each other.
+        Defaults to the ``authkey`` of the current process, which is
+        inherited by worker processes started with :mod:`multiprocessing`.
 
     Returns
     -------
     SearchResultContainer:
-        The result of the search algorithm.
+        The result of the search algorithm. If the search was stopped because
+        of ``max_fev``, ``deadline`` or ``saturation_window``, its
+        ``stop_reason`` is set. The state written to ``save_file`` is
+        consistent, such that the search can be resumed using ``load=True``.
+        If ``num_channels`` is given, a list containing the result of each
+        channel is returned.
     """
+    if num_channels is not None:
+        if server_address is not None:
+            raise ValueError(
+                "The 'num_channels' option cannot be used in server mode."
+            )
+        if coarse_gap_fct is not None:
+            raise ValueError(
+                "The 'coarse_gap_fct' cannot be used together with "
+                "'num_channels'."
+            )
+        return await run_channels(
+            num_channels=num_channels,
+            gap_fct=gap_fct,
+            batch_gap_fct=batch_gap_fct,
+            batch_kwargs=batch_kwargs,
+            executor=executor,
+            evaluation_cache=evaluation_cache,
+            initial_state=initial_state,
+            save_file=save_file,
+            node_callback=node_callback,
+            limits=limits,
+            periodic=periodic,
+            save_delay=save_delay,
+            load=load,
+            load_quiet=load_quiet,
+            initial_mesh_size=initial_mesh_size,
+            force_initial_mesh=force_initial_mesh,
+            gap_threshold=gap_threshold,
+            feature_size=feature_size,
+            use_fake_potential=use_fake_potential,
+            nelder_mead_kwargs=nelder_mead_kwargs,
+            num_minimize_parallel=num_minimize_parallel,
+            refinement_stencil=refinement_stencil,
+            recheck_pos_dist=recheck_pos_dist,
+            recheck_count_cutoff=recheck_count_cutoff,
+            simplex_check_cutoff=simplex_check_cutoff,
+            simplex_priority=simplex_priority,
+            max_fev=max_fev,
+            deadline=deadline,
+            abort_redundant=abort_redundant,
+            ensemble_initial_mesh=ensemble_initial_mesh,
+            saturation_window=saturation_window,
+            minimizer=minimizer
+        )
     SEARCH_LOGGER.debug('Initializing search controller.')
-    controller = Controller(
+    if server_address is None:
+        controller_class = Controller
+    else:
+        controller_class = partial(
+            SearchServer,
+            server_address=server_address,
+            server_authkey=server_authkey
+        )
+    controller = controller_class(
         gap_fct=gap_fct,
         limits=limits,
         periodic=periodic,
@@ -125,7 +342,21 @@ async def run_async(
         refinement_stencil=refinement_stencil,
         recheck_pos_dist=recheck_pos_dist,
         recheck_count_cutoff=recheck_count_cutoff,
-        simplex_check_cutoff=simplex_check_cutoff
+        simplex_check_cutoff=simplex_check_cutoff,
+        batch_gap_fct=batch_gap_fct,
+        batch_kwargs=batch_kwargs,
+        executor=executor,
+        simplex_priority=simplex_priority,
+        max_fev=max_fev,
+        deadline=deadline,
+        abort_redundant=abort_redundant,
+        ensemble_initial_mesh=ensemble_initial_mesh,
+        node_callback=node_callback,
+        saturation_window=saturation_window,
+        evaluation_cache=evaluation_cache,
+        coarse_gap_fct=coarse_gap_fct,
+        coarse_threshold_factor=coarse_threshold_factor,
+        minimizer=minimizer
     )
     SEARCH_LOGGER.debug('Running search controller.')
     await controller.run()
@@ -144,6 +375,14 @@ def run(*args, **kwargs):
     kwargs : collections.abc.Mapping
         Keyword arguments passed to :func:`.run_async`.
     """
+    return run_sync(run_async, *args, **kwargs)
+
+
+def run_sync(coro_fct, *args, **kwargs):
+    """
+    Run a coroutine function synchronously. If an event loop is already
+    running in the current thread, the coroutine is run in a separate thread.
+    """
     try:
         loop = asyncio.get_event_loop()
         close_loop = False
@@ -160,6 +399,7 @@ def run(*args, **kwargs):
             thread = threading.Thread(
                 target=partial(
                     _run_in_thread,
+                    coro_fct,
                     *args,
                     res_queue=res_queue,
                     exc_queue=exc_queue,
@@ -175,21 +415,21 @@ def run(*args, **kwargs):
             res = res_queue.get()
         else:
             SEARCH_LOGGER.debug('Running in the current thread.')
-            res = loop.run_until_complete(run_async(*args, **kwargs))
+            res = loop.run_until_complete(coro_fct(*args, **kwargs))
     finally:
         if close_loop:
             loop.close()
     return res
 
 
-def _run_in_thread(*args, res_queue, exc_queue, **kwargs):
+def _run_in_thread(coro_fct, *args, res_queue, exc_queue, **kwargs):
     """
-    Helper function that runs the search function, to be used as a thread target.
-    This assumes that no (running or other) loop exists.
+    Helper function that runs the coroutine function, to be used as a thread
+    target. This assumes that no (running or other) loop exists.
     """
     try:
         loop = asyncio.new_event_loop()
-        res = loop.run_until_complete(run_async(*args, **kwargs))
+        res = loop.run_until_complete(coro_fct(*args, **kwargs))
         loop.close()
         res_queue.put(res)
     except Exception as exc:
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the search server, which distributes the minimizations to worker
+processes, and the protocol used to communicate with the workers.
+"""
+
+import os
+import hmac
+import time
+import pickle
+import struct
+import asyncio
+import itertools
+import multiprocessing
+
+from fsc.export import export
+
+from ._controller import Controller
+from ._logging import SEARCH_LOGGER
+
+_HEADER = struct.Struct('!Q')
+_CHALLENGE_SIZE = 32
+_DIGEST = 'sha256'
+_DIGEST_SIZE = 32
+
+
+@export
+class SearchServer(Controller):
+    """
+    Controller which does not run the minimizations itself, but distributes
+    the simplices to worker processes connecting to ``server_address``. The
+    workers are started with :func:`.run_worker`.
+
+    Arguments
+    ---------
+    server_address : str or tuple(str, int)
+        Path of a Unix socket, or ``(host, port)`` of a TCP socket on which
+        the server listens.
+    server_authkey : bytes
+        Key used to authenticate the server and the workers to each other.
+    kwargs :
+        Keyword arguments passed to :class:`.Controller`.
+    """
+    def __init__(self, *, server_address, server_authkey=None, **kwargs):
+        super().__init__(**kwargs)
+        if self.concurrency is not None:
+            raise ValueError(
+                'Adaptive concurrency cannot be used with the search server, '
+                'since the gap function is evaluated by the workers.'
+            )
+        for option in [
+            'abort_redundant', 'ensemble_initial_mesh', 'evaluation_cache',
+            'coarse_gap_fct'
+        ]:
+            if getattr(self, option):
+                raise ValueError(
+                    "The '{}' option is not supported by the search server.".
+                    format(option)
+                )
+        self.gap_fct = None
+        self.server_address = server_address
+        if server_authkey is None:
+            server_authkey = multiprocessing.current_process().authkey
+        self.server_authkey = server_authkey
+
+        # Simplices waiting to be sent to a worker. Simplices re-queued from
+        # a disconnected worker are sent first.
+        self._pending = asyncio.PriorityQueue()
+        self._pending_counter = itertools.count()
+        self._task_counter = itertools.count()
+        self._handlers = set()
+        # Nodes in the order they were found, such that each worker can be
+        # sent only the nodes it does not know yet.
+        self._nodes = list(self.state.result.nodes.values())
+
+    @staticmethod
+    def create_gap_fct(*, gap_fct, batch_gap_fct, batch_kwargs, executor):  # pylint: disable=unused-argument
+        if any(obj is not None for obj in [gap_fct, batch_gap_fct, executor]):
+            raise ValueError(
+                'When running a search server, the gap function is evaluated '
+                "by the workers and must be passed to 'run_worker' instead."
+            )
+        return None
+
+    async def run(self):
+        """
+        Run the search, accepting connections from workers until it is
+        finished.
+        """
+        server = await _start_server(
+            self._connect_worker, address=self.server_address
+        )
+        SEARCH_LOGGER.info(
+            'Search server listening on {}.'.format(self.server_address)
+        )
+        try:
+            await super().run()
+        finally:
+            server.close()
+            handlers = list(self._handlers)
+            for handler in handlers:
+                handler.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await server.wait_closed()
+
+    async def run_simplex(self, simplex):
+        """
+        Send a simplex to the next available worker, and process the result.
+        """
+        fut = asyncio.get_event_loop().create_future()
+        self._add_pending(simplex, fut, requeue=False)
+        result = await fut
+        self.num_fev += result.num_fev
+        if self.process_result(result):
+            self._nodes.append(result)
+            await self.report_node(result)
+        self.set_finished(simplex)
+
+    def _add_pending(self, simplex, fut, *, requeue):
+        self._pending.put_nowait(
+            (0 if requeue else 1, next(self._pending_counter), simplex, fut)
+        )
+
+    def _get_worker_config(self):
+        return dict(
+            limits=self.coordinate_system.limits,
+            periodic=self.coordinate_system.periodic,
+            gap_threshold=self.state.result.gap_threshold,
+            dist_cutoff=self.dist_cutoff,
+            nelder_mead_kwargs=dict(self.nelder_mead_kwargs),
+            use_fake_potential=self.fake_potential is not None,
+            minimizer=self.minimizer,
+        )
+
+    def _connect_worker(self, reader, writer):
+        """
+        Start handling a newly connected worker, keeping track of the handler
+        task such that it can be cancelled when the search is finished.
+        """
+        handler = asyncio.ensure_future(self._handle_worker(reader, writer))
+        self._handlers.add(handler)
+        handler.add_done_callback(self._handlers.discard)
+
+    async def _handle_worker(self, reader, writer):
+        """
+        Handle the connection to a single worker. When the connection is
+        lost, the simplices which the worker did not finish are re-queued.
+        """
+        in_flight = {}
+        tasks = []
+        try:
+            await _deliver_challenge(reader, writer, self.server_authkey)
+            await _answer_challenge(reader, writer, self.server_authkey)
+            num_parallel = await _receive(reader)
+            await _send(writer, self._get_worker_config())
+            SEARCH_LOGGER.info(
+                'Worker connected, running up to {} minimizations.'.
+                format(num_parallel)
+            )
+            slots = asyncio.Semaphore(num_parallel)
+            tasks = [
+                asyncio.ensure_future(
+                    self._send_simplices(writer, in_flight, slots)
+                ),
+                asyncio.ensure_future(
+                    self._receive_results(reader, in_flight, slots)
+                )
+            ]
+            done, _ = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            SEARCH_LOGGER.info('Worker disconnected.')
+        except multiprocessing.AuthenticationError:
+            SEARCH_LOGGER.warning('Rejected worker with invalid authkey.')
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            unfinished = [(simplex, fut) for simplex, fut in in_flight.values()
+                          if not fut.done()]
+            if unfinished:
+                SEARCH_LOGGER.info(
+                    'Re-queueing {} simplices of the disconnected worker.'.
+                    format(len(unfinished))
+                )
+            for simplex, fut in unfinished:
+                self._add_pending(simplex, fut, requeue=True)
+            writer.close()
+
+    async def _send_simplices(self, writer, in_flight, slots):
+        """
+        Send pending simplices to a worker whenever it has a free slot.
+        """
+        num_nodes_sent = 0
+        while True:
+            await slots.acquire()
+            _, _, simplex, fut = await self._pending.get()
+            if fut.done():
+                # The minimization was cancelled while it was pending.
+                slots.release()
+                continue
+            task_id = next(self._task_counter)
+            in_flight[task_id] = (simplex, fut)
+            if self.fake_potential is None:
+                new_nodes = []
+            else:
+                new_nodes = self._nodes[num_nodes_sent:]
+                num_nodes_sent = len(self._nodes)
+            await _send(writer, (task_id, simplex, new_nodes))
+
+    @staticmethod
+    async def _receive_results(reader, in_flight, slots):
+        """
+        Receive the results from a worker, and set them on the corresponding
+        futures.
+        """
+        while True:
+            task_id, success, value = await _receive(reader)
+            _, fut = in_flight.pop(task_id)
+            slots.release()
+            if fut.done():
+                continue
+            if success:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
+
+
+async def _start_server(client_connected_cb, *, address):
+    if isinstance(address, str):
+        return await asyncio.start_unix_server(
+            client_connected_cb, path=address
+        )
+    host, port = address
+    return await asyncio.start_server(
+        client_connected_cb, host=host, port=port
+    )
+
+
+async def _open_connection(address, *, timeout):
+    """
+    Connect to the given address, retrying until the timeout (in seconds) is
+    reached.
+    """
+    end_time = time.monotonic() + timeout
+    while True:
+        try:
+            if isinstance(address, str):
+                return await asyncio.open_unix_connection(path=address)
+            host, port = address
+            return await asyncio.open_connection(host=host, port=port)
+        except OSError:
+            if time.monotonic() >= end_time:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def _send(writer, obj):
+    data = pickle.dumps(obj)
+    writer.write(_HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def _receive(reader):
+    (size, ) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return pickle.loads(await reader.readexactly(size))
+
+
+async def _deliver_challenge(reader, writer, authkey):
+    """
+    Check that the other side of the connection knows the authkey, before
+    any pickled data is received from it.
+    """
+    message = os.urandom(_CHALLENGE_SIZE)
+    writer.write(message)
+    await writer.drain()
+    response = await reader.readexactly(_DIGEST_SIZE)
+    if not hmac.compare_digest(
+        response,
+        hmac.new(authkey, message, _DIGEST).digest()
+    ):
+        raise multiprocessing.AuthenticationError('Invalid authkey.')
+
+
+async def _answer_challenge(reader, writer, authkey):
+    """
+    Prove to the other side of the connection that the authkey is known.
+    """
+    message = await reader.readexactly(_CHALLENGE_SIZE)
+    writer.write(hmac.new(authkey, message, _DIGEST).digest())
+    await writer.drain()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the search session, which re-uses the event loop, executor and
+refinement stencils for many searches.
+"""
+
+import inspect
+import asyncio
+import threading
+
+from fsc.export import export
+
+from ._run import run_async
+from ._executor import get_executor
+from .refinement_stencil import get_auto_stencil
+
+_DEFAULT_LIMITS = inspect.signature(run_async).parameters['limits'].default
+
+
+@export
+class SearchSession:
+    """
+    Session for running many searches with little overhead per search. The
+    session keeps an event loop running in a background thread, the
+    executor, and the automatically created refinement stencils, which are
+    re-used by all searches run in the session.
+
+    The session should be closed after use, either by calling :meth:`close`
+    or by using it as a context manager.
+
+    Arguments
+    ---------
+    executor : concurrent.futures.Executor or int
+        Executor in which the gap functions are evaluated, used by all
+        searches which do not explicitly set the ``executor``. If an integer
+        is given, a :class:`concurrent.futures.ProcessPoolExecutor` with that
+        number of workers is created, and shut down when the session is
+        closed.
+    """
+    def __init__(self, *, executor=None):
+        self.executor, self._owns_executor = get_executor(executor)
+        self._stencils = {}
+        self._stencil_lock = threading.Lock()
+        self._searches = set()
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def closed(self):
+        """
+        bool:
+            Indicates whether the session has been closed.
+        """
+        return self._closed
+
+    def submit(self, *args, **kwargs):
+        """Start a search in the background.
+
+        Arguments
+        ---------
+        args : tuple
+            Positional arguments passed to :func:`.run_async`.
+        kwargs : collections.abc.Mapping
+            Keyword arguments passed to :func:`.run_async`.
+
+        Returns
+        -------
+        concurrent.futures.Future :
+            Future containing the result of the search.
+        """
+        if self._closed:
+            raise ValueError('The search session is closed.')
+        return asyncio.run_coroutine_threadsafe(
+            self._run_search(*args, **self._update_kwargs(kwargs)), self._loop
+        )
+
+    async def _run_search(self, *args, **kwargs):
+        """
+        Run a search, keeping track of the running searches such that they
+        can be cancelled when the session is closed.
+        """
+        task = asyncio.ensure_future(run_async(*args, **kwargs))
+        self._searches.add(task)
+        try:
+            return await task
+        finally:
+            self._searches.discard(task)
+
+    def run(self, *args, **kwargs):
+        """Run a search, and wait for its result.
+
+        Arguments
+        ---------
+        args : tuple
+            Positional arguments passed to :func:`.run_async`.
+        kwargs : collections.abc.Mapping
+            Keyword arguments passed to :func:`.run_async`.
+        """
+        return self.submit(*args, **kwargs).result()
+
+    def _update_kwargs(self, kwargs):
+        """
+        Set the keyword arguments of the search which are provided by the
+        session.
+        """
+        kwargs = dict(kwargs)
+        kwargs.setdefault('executor', self.executor)
+        refinement_stencil = kwargs.get('refinement_stencil', 'auto')
+        if isinstance(
+            refinement_stencil, str
+        ) and refinement_stencil == 'auto':
+            kwargs['refinement_stencil'] = self._get_auto_stencil(
+                dim=len(kwargs.get('limits', _DEFAULT_LIMITS))
+            )
+        return kwargs
+
+    def _get_auto_stencil(self, *, dim):
+        """
+        Get the default stencil for the given dimension, creating it only
+        once per session.
+        """
+        with self._stencil_lock:
+            try:
+                return self._stencils[dim]
+            except KeyError:
+                stencil = get_auto_stencil(dim=dim)
+                stencil.flags.writeable = False
+                self._stencils[dim] = stencil
+                return stencil
+
+    def close(self):
+        """
+        Close the session, cancelling the searches which are still running.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        asyncio.run_coroutine_threadsafe(self._cancel_searches(),
+                                         self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+            self._owns_executor = False
+
+    async def _cancel_searches(self):
+        """
+        Cancel the searches which are still running. The searches themselves
+        cancel the minimizations they started.
+        """
+        searches = list(self._searches)
+        for task in searches:
+            task.cancel()
+        await asyncio.gather(*searches, return_exceptions=True)
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the persistent on-disk store for the gap function evaluations.
+"""
+
+import sqlite3
+import threading
+
+import numpy as np
+from fsc.export import export
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS functions (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    tolerance REAL NOT NULL,
+    UNIQUE (fingerprint, tolerance)
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    function_id INTEGER NOT NULL,
+    position BLOB NOT NULL,
+    value REAL,
+    PRIMARY KEY (function_id, position)
+) WITHOUT ROWID;
+"""
+
+
+@export
+class EvaluationStore:
+    """
+    Persistent store for the values of the gap function, in an SQLite
+    database file. It is used as the backing layer of an
+    :class:`.EvaluationCache`, such that a search which is re-run with
+    different parameters (e.g. ``feature_size`` or the refinement stencil)
+    re-uses the values computed by previous runs.
+
+    The values are stored for the given ``fingerprint``, which must
+    identify the gap function (including its parameters). It is the
+    responsibility of the user to change the fingerprint when the gap
+    function changes. Values are looked up by the position quantized by the
+    cache ``tolerance``, through the primary key index of the database. New
+    values are written in batches of ``batch_size``, and when the search
+    is finished.
+
+    Since the Nelder-Mead steps do not depend on the tolerances of the
+    minimization, runs with a different ``feature_size`` evaluate many of
+    the same positions. To re-use these values, the quantization step must
+    not depend on the parameters of the search. For this reason, a cache
+    which is backed by the store uses its fixed ``tolerance`` by default.
+
+    Arguments
+    ---------
+    filename : str
+        Path of the database file, e.g. next to the ``save_file`` of the
+        search. It is created if it does not exist.
+    fingerprint : str
+        Identifier of the gap function.
+    tolerance : float
+        Default quantization step of the positions, for caches which are
+        backed by the store.
+    batch_size : int
+        Number of new values which are collected before they are written to
+        the file.
+    """
+    def __init__(
+        self, filename, *, fingerprint, tolerance=1e-10, batch_size=10000
+    ):
+        if batch_size < 1:
+            raise ValueError(
+                "The 'batch_size' must be positive, got {}.".
+                format(batch_size)
+            )
+        self.filename = filename
+        self.fingerprint = str(fingerprint)
+        self.tolerance = tolerance
+        self.batch_size = batch_size
+        # The store can be used from the event loop thread of a
+        # 'SearchSession', the lock protects the connection.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._function_ids = dict()
+        self._pending = dict()
+
+    def __len__(self):
+        """
+        Number of values stored for the fingerprint, including the values
+        which are not yet written.
+        """
+        self.flush()
+        with self._lock:
+            (num_values, ), = self._connection.execute(
+                'SELECT COUNT(*) FROM evaluations JOIN functions '
+                'ON evaluations.function_id = functions.id '
+                'WHERE functions.fingerprint = ?', (self.fingerprint, )
+            )
+        return num_values
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def closed(self):
+        """
+        bool:
+            Indicates whether the store has been closed.
+        """
+        return self._connection is None
+
+    def _get_function_id(self, tolerance):
+        try:
+            return self._function_ids[tolerance]
+        except KeyError:
+            pass
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR IGNORE INTO functions (fingerprint, tolerance) '
+                'VALUES (?, ?)', (self.fingerprint, tolerance)
+            )
+        (function_id, ), = self._connection.execute(
+            'SELECT id FROM functions WHERE fingerprint = ? AND tolerance = ?',
+            (self.fingerprint, tolerance)
+        )
+        self._function_ids[tolerance] = function_id
+        return function_id
+
+    @staticmethod
+    def _to_blob(key):
+        return np.array(key, dtype=np.int64).tobytes()
+
+    def get(self, key, *, tolerance):
+        """
+        Get the stored value for a position, or ``None`` if it is not
+        stored.
+
+        Arguments
+        ---------
+        key : tuple(int)
+            The position, quantized to multiples of ``tolerance``.
+        tolerance : float
+            The quantization step of the position.
+        """
+        try:
+            return self._pending[(tolerance, key)]
+        except KeyError:
+            pass
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM evaluations '
+                'WHERE function_id = ? AND position = ?',
+                (self._get_function_id(tolerance), self._to_blob(key))
+            ).fetchone()
+        if row is None:
+            return None
+        # SQLite stores NaN as NULL.
+        value, = row
+        return float('nan') if value is None else value
+
+    def add(self, key, value, *, tolerance):
+        """
+        Add a value to the store. The values are written to the file when
+        ``batch_size`` values have been collected, or when :meth:`flush` is
+        called.
+
+        Arguments
+        ---------
+        key : tuple(int)
+            The position, quantized to multiples of ``tolerance``.
+        value : float
+            The value of the gap function.
+        tolerance : float
+            The quantization step of the position.
+        """
+        self._pending[(tolerance, key)] = float(value)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the pending values to the file.
+        """
+        if not self._pending:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, dict()
+            rows = [
+                (self._get_function_id(tolerance), self._to_blob(key), value)
+                for (tolerance, key), value in pending.items()
+            ]
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO evaluations '
+                    '(function_id, position, value) VALUES (?, ?, ?)', rows
+                )
+
+    def close(self):
+        """
+        Write the pending values and close the file.
+        """
+        if self.closed:
+            return
+        self.flush()
+        with self._lock:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Defines the worker which runs minimizations for a search server.
+"""
+
+import pickle
+import asyncio
+import multiprocessing
+from types import MappingProxyType
+
+from fsc.export import export
+
+from ..coordinate_system import CoordinateSystem
+from .result import SearchResultContainer
+from ._controller import Controller
+from ._minimization import run_minimization
+from ._minimization._run import resolve_speculative
+from ._fake_potential import FakePotential
+from ._executor import get_executor, shutdown_executor_async
+from ._run import run_sync
+from ._server import (
+    _open_connection, _answer_challenge, _deliver_challenge, _send, _receive
+)
+from ._logging import SEARCH_LOGGER
+
+
+@export
+async def run_worker_async(
+    gap_fct=None,
+    *,
+    server_address,
+    server_authkey=None,
+    num_minimize_parallel=10,
+    batch_gap_fct=None,
+    batch_kwargs=MappingProxyType({}),
+    executor=None,
+    connect_timeout=10.
+):
+    """Run minimizations for a search server, until the search is finished.
+
+    The search server is started by passing ``server_address`` to
+    :func:`.run`. Workers can be started before the server, and join or leave
+    while the search is running.
+
+    Arguments
+    ---------
+    gap_fct : collections.abc.Callable
+        Function or coroutine describing the potential of which nodes should be
+        found. Can be omitted if ``batch_gap_fct`` is given.
+    server_address : str or tuple(str, int)
+        Address of the search server, given either as the path of a Unix
+        socket, or as ``(host, port)`` of a TCP socket.
+    server_authkey : bytes
+        Key used to authenticate the worker and the server to each other.
+        Defaults to the ``authkey`` of the current process.
+    num_minimize_parallel : int
+        Maximum number of minimizations which the worker runs in parallel.
+    batch_gap_fct : collections.abc.Callable
+        Vectorized gap function, see :func:`.run`.
+    batch_kwargs : collections.abc.Mapping
+        Keyword arguments for collecting the batches, see :func:`.run`.
+    executor : concurrent.futures.Executor or int
+        Executor in which the gap function is evaluated, see :func:`.run`.
+    connect_timeout : float
+        Time (in seconds) during which connecting to the server is retried.
+
+    Returns
+    -------
+    int :
+        The number of minimizations the worker has started.
+    """
+    executor, owns_executor = get_executor(executor)
+    try:
+        gap_fct = Controller.create_gap_fct(
+            gap_fct=gap_fct,
+            batch_gap_fct=batch_gap_fct,
+            batch_kwargs=batch_kwargs,
+            executor=executor
+        )
+        if server_authkey is None:
+            server_authkey = multiprocessing.current_process().authkey
+        reader, writer = await _open_connection(
+            server_address, timeout=connect_timeout
+        )
+        try:
+            return await _run_connected_worker(
+                gap_fct,
+                reader=reader,
+                writer=writer,
+                server_authkey=server_authkey,
+                num_minimize_parallel=num_minimize_parallel
+            )
+        finally:
+            writer.close()
+    finally:
+        if owns_executor:
+            await shutdown_executor_async(executor)
+
+
+async def _run_connected_worker(
+    gap_fct, *, reader, writer, server_authkey, num_minimize_parallel
+):
+    """
+    Run the minimizations sent by the server, until the connection is
+    closed.
+    """
+    # The authentication is mutual, such that no pickled data is received
+    # from a server which does not know the authkey.
+    try:
+        await _answer_challenge(reader, writer, server_authkey)
+        await _deliver_challenge(reader, writer, server_authkey)
+    except (asyncio.IncompleteReadError, ConnectionError) as exc:
+        raise multiprocessing.AuthenticationError(
+            'The search server closed the connection during the handshake.'
+        ) from exc
+    await _send(writer, num_minimize_parallel)
+    config = await _receive(reader)
+    SEARCH_LOGGER.info('Connected to search server.')
+
+    # The nodes which the server has found so far, used for the fake
+    # potential.
+    nodes = SearchResultContainer(
+        coordinate_system=CoordinateSystem(
+            limits=config['limits'], periodic=config['periodic']
+        ),
+        gap_threshold=config['gap_threshold'],
+        dist_cutoff=config['dist_cutoff'],
+    )
+    if config['use_fake_potential']:
+        fake_potential = FakePotential(
+            result=nodes, width=config['dist_cutoff']
+        )
+    else:
+        fake_potential = None
+
+    tasks = set()
+    nelder_mead_kwargs = resolve_speculative(
+        config['nelder_mead_kwargs'],
+        has_spare_capacity=lambda: len(tasks) < num_minimize_parallel
+    )
+
+    async def minimize(task_id, simplex):
+        try:
+            res = await run_minimization(
+                gap_fct,
+                initial_simplex=simplex,
+                fake_potential=fake_potential,
+                nelder_mead_kwargs=nelder_mead_kwargs,
+                minimizer=config['minimizer'],
+            )
+            message = (task_id, True, res)
+        except Exception as exc:  # pylint: disable=broad-except
+            message = (task_id, False, _make_picklable(exc))
+        try:
+            await _send(writer, message)
+        except ConnectionError:
+            pass
+
+    num_minimizations = 0
+    try:
+        while True:
+            try:
+                task_id, simplex, new_nodes = await _receive(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                SEARCH_LOGGER.info('Disconnected from search server.')
+                break
+            for node in new_nodes:
+                nodes.add_result(node)
+            task = asyncio.ensure_future(minimize(task_id, simplex))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            num_minimizations += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return num_minimizations
+
+
+def _make_picklable(exc):
+    try:
+        pickle.dumps(exc)
+        return exc
+    except Exception:  # pylint: disable=broad-except
+        return RuntimeError(repr(exc))
+
+
+@export
+def run_worker(*args, **kwargs):
+    """Wrapper around :func:`.run_worker_async` that runs the worker
+    synchronously.
+
+    Arguments
+    ---------
+    args : tuple
+        Positional arguments passed to :func:`.run_worker_async`.
+    kwargs : collections.abc.Mapping
+        Keyword arguments passed to :func:`.run_worker_async`.
+    """
+    return run_sync(run_worker_async, *args, **kwargs)
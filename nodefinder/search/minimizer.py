@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Contains the minimizers which can be used to find the nodes starting from a
+simplex, and the function to register additional minimizers.
+
+A minimizer is a coroutine with signature
+``minimizer(func, *, initial_simplex, xtol, ftol, maxiter=None,
+maxfev=None, fprime_cutoff=None, stop_value=None, keep_history=True,
+should_continue=None, checkpoint=None, resume_from=None)``, where ``func``
+is the coroutine to be minimized and ``initial_simplex`` has shape
+(dim + 1, dim). It returns a :class:`.MinimizationResult`. Additional
+keyword arguments can be accepted, and are given through the
+``nelder_mead_kwargs`` of :func:`.run`. The minimizer needs to fulfill the
+following requirements, on which the minimization with fake potential and
+with a coarse gap function rely:
+
+* The last entry of the ``simplex_history`` of the result is the final
+  simplex, which is enlarged and used as starting point of the next step.
+  Minimizers which keep only a single point represent it as the first
+  vertex of the simplex.
+* An ``ftol`` of ``inf`` stops the minimization as soon as ``xtol`` is
+  reached, which is used for the step with fake potential.
+* If ``should_continue`` returns ``False`` for the current simplex and its
+  function values, the minimization is aborted with status
+  ``ABORTED_STATUS``. The status ``STOP_VALUE_STATUS`` is used when the
+  value drops below ``stop_value``. A status of 0 indicates convergence.
+* ``checkpoint`` is called with a :class:`.MinimizationCheckpoint` at the
+  start of each iteration, and passing it as ``resume_from`` continues the
+  minimization from that state.
+"""
+
+from ._minimization._nelder_mead import root_nelder_mead
+from ._minimization._gauss_newton import root_gauss_newton
+from ._minimization._pattern_search import root_pattern_search
+from ._minimization._registry import register_minimizer
+
+__all__ = [
+    'root_nelder_mead', 'root_gauss_newton', 'root_pattern_search',
+    'register_minimizer'
+]
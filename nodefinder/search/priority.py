@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Contains the policies which can be used to prioritize the simplices in the
+search procedure.
+
+A priority policy is a function with signature
+``policy(simplex, *, is_refinement, result, vertex_values)``, where
+``simplex`` is the starting simplex, ``is_refinement`` indicates whether the
+simplex is part of a refinement around an existing node, ``result`` is the
+current :class:`.SearchResultContainer`, and ``vertex_values`` contains the
+gap values of the simplex vertices which are known from the evaluation cache
+(``None`` for the unknown values). The priority is computed when the simplex
+is queued. It returns a float, and simplices with a lower value are minimized
+first.
+"""
+
+import numpy as np
+from fsc.export import export
+
+
+@export
+def refinement_first(simplex, *, is_refinement, result, vertex_values):  # pylint: disable=unused-argument
+    """
+    Minimize the refinement simplices around existing nodes before the
+    simplices of the initial mesh.
+    """
+    return 0. if is_refinement else 1.
+
+
+@export
+def lowest_value_first(simplex, *, is_refinement, result, vertex_values):  # pylint: disable=unused-argument
+    """
+    Prioritize simplices by the lowest cached gap value of their vertices.
+    Refinement simplices without cached values are placed at the gap
+    threshold, since they surround a node. The other simplices without cached
+    values come last. The cached values are only known when the search uses
+    an ``evaluation_cache``.
+    """
+    known_values = [value for value in vertex_values if value is not None]
+    if known_values:
+        return float(min(known_values))
+    if is_refinement:
+        return result.gap_threshold
+    return float('inf')
+
+
+@export
+def node_distance_first(simplex, *, is_refinement, result, vertex_values):  # pylint: disable=unused-argument
+    """
+    Prioritize simplices by their distance to the closest existing node.
+    Simplices without known nodes in their vicinity come last.
+    """
+    centroid = _get_centroid(simplex, result)
+    return float(
+        min(result.get_all_neighbour_distances(centroid), default=np.inf)
+    )
+
+
+def _get_centroid(simplex, result):
+    return result.coordinate_system.average(np.array(simplex))
+
+
+_PRIORITY_POLICIES = {
+    'refinement_first': refinement_first,
+    'lowest_value_first': lowest_value_first,
+    'node_distance_first': node_distance_first,
+}
+
+
+def get_priority_policy(policy):
+    """
+    Get the priority policy from either its name or a callable. Returns
+    ``None`` if no policy is given.
+    """
+    if policy is None or callable(policy):
+        return policy
+    try:
+        return _PRIORITY_POLICIES[policy]
+    except KeyError as exc:
+        raise ValueError(
+            "Invalid priority policy '{}', must be one of {} or a callable.".
+            format(policy, sorted(_PRIORITY_POLICIES))
+        ) from exc
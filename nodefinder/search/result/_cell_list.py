@@ -25,9 +25,9 @@ class CellList:
         if not self.periodic:
             self._total_num_cells += 2  # add 'boundary' boxes for outside points.
         assert np.all(self.num_cells > 0)
-        self._cells = np.empty(shape=self._total_num_cells, dtype=np.object)
-        filler = np.frompyfunc(lambda x: list(), 1, 1)
-        filler(self._cells, self._cells)
+        # Only the non-empty cells are stored, such that creating the cell
+        # list does not scale with the total number of cells.
+        self._cells = dict()
         self._values_flat = []
 
         self._neighbour_offset = np.array(
@@ -58,7 +58,7 @@ class CellList:
 
     def add_point(self, frac, value):
         idx = self.get_index(frac)
-        self._cells[idx].append(value)
+        self._cells.setdefault(idx, []).append(value)
         self._values_flat.append(value)
 
     def get_index(self, frac):  # pylint: disable=missing-function-docstring
@@ -83,4 +83,4 @@ class CellList:
     def get_neighbour_values(self, frac):
         idx = self.get_index(frac)
         for cell_idx in self._get_neighbour_indices(idx):
-            yield from self._cells[cell_idx]
+            yield from self._cells.get(cell_idx, ())
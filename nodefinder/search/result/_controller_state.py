@@ -9,6 +9,8 @@ Defines the data class for the controller state.
 from fsc.export import export
 from fsc.hdf5_io import SimpleHDF5Mapping, subscribe_hdf5
 
+from .._queue import SimplexQueue
+
 
 @export
 @subscribe_hdf5('nodefinder.controller_state')
@@ -16,17 +18,62 @@ class ControllerState(SimpleHDF5Mapping):
     """
     Container class for the current result and queue of the :func:`.search.run`
     function.
+
+    Attributes
+    ----------
+    checkpoints : list(MinimizationCheckpoint)
+        Checkpoints of the running minimizations, from which they are resumed
+        when the calculation is restarted.
     """
     HDF5_ATTRIBUTES = ['result', 'simplex_queue', 'position_queue']
+    HDF5_OPTIONAL = ['checkpoints']
 
-    def __init__(self, *, result, simplex_queue, position_queue):
+    def __init__(
+        self, *, result, simplex_queue, position_queue, checkpoints=()
+    ):
         self.result = result
         self.simplex_queue = simplex_queue
         self.position_queue = position_queue
+        self._checkpoints = {
+            self._get_key(checkpoint.initial_simplex): checkpoint
+            for checkpoint in checkpoints
+        }
+        self._checkpoints_need_saving = True
+
+    @staticmethod
+    def _get_key(simplex):
+        return SimplexQueue.normalize([simplex])[0]
+
+    @property
+    def checkpoints(self):
+        return list(self._checkpoints.values())
+
+    def get_checkpoint(self, simplex):
+        """
+        Get the checkpoint of the minimization starting from the given
+        simplex, or ``None`` if no checkpoint exists.
+        """
+        return self._checkpoints.get(self._get_key(simplex))
+
+    def set_checkpoint(self, simplex, checkpoint):
+        """
+        Set the checkpoint of the minimization starting from the given
+        simplex, which must be normalized as in the :class:`.SimplexQueue`.
+        """
+        self._checkpoints[simplex] = checkpoint
+        self._checkpoints_need_saving = True
+
+    def remove_checkpoint(self, simplex):
+        """
+        Remove the checkpoint of the minimization starting from the given
+        simplex, if it exists.
+        """
+        if self._checkpoints.pop(self._get_key(simplex), None) is not None:
+            self._checkpoints_need_saving = True
 
     @property
     def needs_saving(self):
-        return self.result.needs_saving or self.simplex_queue.needs_saving or self.position_queue.needs_saving
+        return self.result.needs_saving or self.simplex_queue.needs_saving or self.position_queue.needs_saving or self._checkpoints_need_saving
 
     @needs_saving.setter
     def needs_saving(self, value):
@@ -34,3 +81,4 @@ class ControllerState(SimpleHDF5Mapping):
         self.result.needs_saving = value
         self.simplex_queue.needs_saving = value
         self.position_queue.needs_saving = value
+        self._checkpoints_need_saving = value
@@ -20,6 +20,27 @@ import numpy as np
 from fsc.export import export
 from fsc.hdf5_io import subscribe_hdf5, SimpleHDF5Mapping, HDF5Enabled
 
+__all__ = [
+    'ABORTED_STATUS', 'STOP_VALUE_STATUS', 'PRECISION_LOSS_STATUS',
+    'COARSE_FIDELITY', 'ACCURATE_FIDELITY'
+]
+
+#: Status of a minimization which was aborted because it was redundant.
+ABORTED_STATUS = 4
+#: Status of a minimization which was stopped because the function value
+#: reached the given stopping value.
+STOP_VALUE_STATUS = 5
+#: Status of a minimization which could not make progress, because the
+#: function value is not finite or its gradient vanishes away from a root.
+PRECISION_LOSS_STATUS = 6
+
+#: Fidelity of a minimization result which was obtained with the coarse gap
+#: function only.
+COARSE_FIDELITY = 0
+#: Fidelity of a minimization result which was obtained with the accurate gap
+#: function.
+ACCURATE_FIDELITY = 1
+
 
 @export
 @subscribe_hdf5(
@@ -51,6 +72,10 @@ class JoinedMinimizationResult(SimpleHDF5Mapping):
         Joins child and ancestor values where that makes sense, and returns the
         child value otherwise.
         """
+        # Avoid infinite recursion when the attributes are not yet set, for
+        # example when unpickling.
+        if key in self.HDF5_ATTRIBUTES or key.startswith('__'):
+            raise AttributeError(key)
         if key in self.JOIN_KEYS:
             return self._join(
                 getattr(self.ancestor, key), getattr(self.child, key)
@@ -95,6 +120,10 @@ class MinimizationResult(SimpleNamespace, HDF5Enabled):
         History of simplex values.
     fun_simplex_history : ndarray, optional
         History of function values of the simplex.
+    fidelity : int, optional
+        Fidelity of the gap function which produced the result, either
+        ``COARSE_FIDELITY`` or ``ACCURATE_FIDELITY``. This is set only when
+        the search uses a coarse gap function.
     """
     def to_hdf5(self, hdf5_handle):
         for key, val in self.__dict__.items():
@@ -109,3 +138,76 @@ class MinimizationResult(SimpleNamespace, HDF5Enabled):
                 for key, val in hdf5_handle.items() if key != 'type_tag'
             }
         )
+
+
+@export
+@subscribe_hdf5('nodefinder.minimization_checkpoint')
+class MinimizationCheckpoint(SimpleHDF5Mapping):
+    """
+    Snapshot of a running minimization, taken at the start of an iteration
+    of the Nelder-Mead algorithm, from which the minimization can be resumed.
+
+    Attributes
+    ----------
+    simplex : numpy.ndarray
+        The current simplex, sorted by the function values.
+    fun_simplex : numpy.ndarray
+        The function values of the current simplex.
+    num_iter : int
+        Number of iterations performed so far.
+    num_fev : int
+        Number of function evaluations performed so far.
+    simplex_history : numpy.ndarray
+        History of simplex values.
+    fun_simplex_history : numpy.ndarray, optional
+        History of function values of the simplex.
+    initial_simplex : numpy.ndarray, optional
+        Initial simplex of the minimization run, which identifies the
+        minimization in the search.
+    ancestor : MinimizationResult, optional
+        Result of the first step with fake potential, if the minimization is
+        already in the second step.
+    fidelity : int, optional
+        Fidelity of the gap function used by the running Nelder-Mead run,
+        either ``COARSE_FIDELITY`` or ``ACCURATE_FIDELITY``.
+    gradient : numpy.ndarray, optional
+        Gradient of the function at the first vertex of the simplex, for
+        minimizers which use the gradient.
+    """
+    HDF5_ATTRIBUTES = [
+        'simplex', 'fun_simplex', 'num_iter', 'num_fev', 'simplex_history'
+    ]
+    HDF5_OPTIONAL = [
+        'fun_simplex_history', 'initial_simplex', 'ancestor', 'fidelity',
+        'gradient'
+    ]
+
+    def __init__(
+        self,
+        *,
+        simplex,
+        fun_simplex,
+        num_iter,
+        num_fev,
+        simplex_history,
+        fun_simplex_history=None,
+        initial_simplex=None,
+        ancestor=None,
+        fidelity=None,
+        gradient=None
+    ):
+        self.simplex = np.array(simplex)
+        self.fun_simplex = np.array(fun_simplex)
+        self.num_iter = int(num_iter)
+        self.num_fev = int(num_fev)
+        self.simplex_history = simplex_history
+        if fun_simplex_history is not None:
+            self.fun_simplex_history = fun_simplex_history
+        if initial_simplex is not None:
+            self.initial_simplex = np.array(initial_simplex)
+        if ancestor is not None:
+            self.ancestor = ancestor
+        if fidelity is not None:
+            self.fidelity = int(fidelity)
+        if gradient is not None:
+            self.gradient = np.array(gradient)
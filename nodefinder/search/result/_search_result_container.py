@@ -11,6 +11,7 @@ from fsc.export import export
 from fsc.hdf5_io import SimpleHDF5Mapping, subscribe_hdf5
 
 from ._cell_list import CellList
+from ._minimization import ABORTED_STATUS
 
 
 @export
@@ -32,7 +33,13 @@ class SearchResultContainer(SimpleHDF5Mapping):
         Threshold for results to be considered a node.
     dist_cutoff : float
         Cutoff distance for searching neighbouring nodes.
-
+    stop_reason : str or None
+        Reason why the search was stopped before it was finished, or ``None``
+        if the search is complete.
+    saturation_statistics : dict or None
+        Statistics of the search run used for the saturation stopping
+        criterion (see the ``saturation_window`` argument of
+        :func:`.search.run`), or ``None`` if the criterion was not used.
     """
 
     HDF5_ATTRIBUTES = [
@@ -41,7 +48,7 @@ class SearchResultContainer(SimpleHDF5Mapping):
         'dist_cutoff',
         'gap_threshold',
     ]
-    HDF5_OPTIONAL = ['refined_results']
+    HDF5_OPTIONAL = ['refined_results', 'stop_reason', 'saturation_statistics']
 
     def __init__(
         self,
@@ -50,9 +57,15 @@ class SearchResultContainer(SimpleHDF5Mapping):
         minimization_results=(),
         gap_threshold,
         dist_cutoff,
-        refined_results=()
+        refined_results=(),
+        stop_reason=None,
+        saturation_statistics=None
     ):
         self.coordinate_system = coordinate_system
+        if isinstance(stop_reason, bytes):
+            stop_reason = stop_reason.decode()
+        self.stop_reason = stop_reason
+        self.saturation_statistics = saturation_statistics
         self.gap_threshold = gap_threshold
         self.dist_cutoff = dist_cutoff
 
@@ -87,6 +100,46 @@ class SearchResultContainer(SimpleHDF5Mapping):
             self, len(self.minimization_results)
         )
 
+    @property
+    def complete(self):
+        """
+        bool:
+            Indicates whether the search which produced this result has
+            finished.
+        """
+        return self.stop_reason is None
+
+    @property
+    def num_aborted(self):
+        """
+        int:
+            Number of minimizations which were aborted because they were
+            redundant.
+        """
+        return sum(
+            res.status == ABORTED_STATUS for res in self.rejected_results
+        )
+
+    @property
+    def num_fev_saved(self):
+        """
+        int:
+            Estimated number of function evaluations saved by aborting
+            redundant minimizations, based on the average number of
+            evaluations of the minimizations which converged to a node.
+        """
+        node_fev = [res.num_fev for res in self.nodes.values()]
+        if not node_fev:
+            return 0
+        average_fev = sum(node_fev) / len(node_fev)
+        return int(
+            sum(
+                max(0, average_fev - res.num_fev)
+                for res in self.rejected_results
+                if res.status == ABORTED_STATUS
+            )
+        )
+
     def add_result(self, res):
         """
         Add a minimization result to the container.
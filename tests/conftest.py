@@ -7,9 +7,16 @@
 
 import os
 import json
+import asyncio
 import operator
+from functools import partial
+from collections import ChainMap
 
 import pytest
+import numpy as np
+from fsc.async_tools import wrap_to_coroutine
+
+from nodefinder.search._minimization import run_minimization
 
 from score_fixtures import *  # pylint: disable=unused-wildcard-import
 
@@ -63,3 +70,109 @@ def sample():
         )
 
     return inner
+
+
+def _get_periodic_deltas(pos, node_positions):
+    return (np.array(pos) - node_positions + 0.5) % 1 - 0.5
+
+
+def _node_distance(pos, *, node_positions, per_node):
+    distances = np.linalg.norm(
+        _get_periodic_deltas(pos, node_positions), axis=-1
+    )
+    if per_node:
+        return distances
+    return np.min(distances)
+
+
+@pytest.fixture
+def distance_gap_fct():
+    """
+    Fixture to create a gap function which is the periodic distance (in the
+    unit cube) to the closest of the given node positions. If ``per_node`` is
+    set, the gap function is vector-valued, with the distance to each node.
+    The gap function can be pickled.
+    """
+    def inner(node_positions, *, per_node=False):
+        return partial(
+            _node_distance,
+            node_positions=np.atleast_2d(node_positions),
+            per_node=per_node
+        )
+
+    return inner
+
+
+@pytest.fixture
+def check_nodes():
+    """
+    Fixture to check that nodes were found, and that each of them is within
+    ``tol`` of one of the given node positions. If ``complete`` is set, it is
+    also checked that each node position was found.
+    """
+    def inner(nodes, node_positions, *, complete=True, tol=1e-6):
+        nodes = list(nodes)
+        node_positions = np.atleast_2d(node_positions)
+        assert nodes
+        distances = np.array([
+            np.linalg.norm(
+                _get_periodic_deltas(node.pos, node_positions), axis=-1
+            ) for node in nodes
+        ])
+        assert np.all(np.min(distances, axis=1) < tol)
+        if complete:
+            assert np.all(np.min(distances, axis=0) < tol)
+
+    return inner
+
+
+@pytest.fixture
+def count_evaluations():
+    """
+    Fixture to wrap a function such that the number of its evaluations is
+    counted in the ``num_evaluations`` attribute.
+    """
+    def inner(func):
+        def wrapped(pos):
+            wrapped.num_evaluations += 1
+            return func(pos)
+
+        wrapped.num_evaluations = 0
+        return wrapped
+
+    return inner
+
+
+@pytest.fixture
+def minimize():
+    """
+    Fixture to run a single minimization synchronously. The function and
+    coarse function can be given either as functions or as coroutines. The
+    ``nelder_mead_kwargs`` default to ``xtol`` and ``ftol`` of ``1e-8``.
+    """
+    def inner(
+        func,
+        *,
+        initial_simplex,
+        nelder_mead_kwargs=None,
+        coarse_func=None,
+        **kwargs
+    ):
+        if coarse_func is not None:
+            coarse_func = wrap_to_coroutine(coarse_func)
+        return asyncio.get_event_loop().run_until_complete(
+            run_minimization(
+                wrap_to_coroutine(func),
+                initial_simplex=initial_simplex,
+                nelder_mead_kwargs=ChainMap(
+                    nelder_mead_kwargs or {}, {
+                        'xtol': 1e-8,
+                        'ftol': 1e-8
+                    }
+                ),
+                coarse_func=coarse_func,
+                **kwargs
+            )
+        )
+
+    return inner
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the gap function of a Hamiltonian.
+"""
+
+import pickle
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.gap import HamiltonianGap
+
+PAULI_X = np.array([[0, 1], [1, 0]], dtype=complex)
+PAULI_Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+PAULI_Z = np.array([[1, 0], [0, -1]], dtype=complex)
+IDENTITY = np.eye(2, dtype=complex)
+
+NODE_POSITION = np.array([0.2, 0.4, 0.6])
+
+
+def hamiltonian(k):
+    """
+    Four-band Hamiltonian with a Weyl node between the bands 0 and 1 at
+    ``NODE_POSITION``.
+    """
+    kx, ky, kz = np.array(k) - NODE_POSITION
+    return (
+        kx * np.kron(PAULI_Z, PAULI_X) + ky * np.kron(PAULI_Z, PAULI_Y) +
+        kz * np.kron(PAULI_Z, PAULI_Z) + np.kron(PAULI_Z, IDENTITY) +
+        0.3 * kx * ky * np.kron(IDENTITY, IDENTITY)
+    )
+
+
+def vectorized_hamiltonian(k):
+    return np.array([hamiltonian(pos) for pos in k])
+
+
+def hamiltonian_gradient(k):
+    kx, ky, _ = np.array(k) - NODE_POSITION
+    return np.array([
+        np.kron(PAULI_Z, PAULI_X) + 0.3 * ky * np.kron(IDENTITY, IDENTITY),
+        np.kron(PAULI_Z, PAULI_Y) + 0.3 * kx * np.kron(IDENTITY, IDENTITY),
+        np.kron(PAULI_Z, PAULI_Z),
+    ])
+
+
+def vectorized_hamiltonian_gradient(k):
+    return np.array([hamiltonian_gradient(pos) for pos in k])
+
+
+TERMS = [
+    (lambda k: k[:, 0] - NODE_POSITION[0], np.kron(PAULI_Z, PAULI_X)),
+    (lambda k: k[:, 1] - NODE_POSITION[1], np.kron(PAULI_Z, PAULI_Y)),
+    (lambda k: k[:, 2] - NODE_POSITION[2], np.kron(PAULI_Z, PAULI_Z)),
+    (1, np.kron(PAULI_Z, IDENTITY)),
+    (
+        lambda k: 0.3 * (k[:, 0] - NODE_POSITION[0]) *
+        (k[:, 1] - NODE_POSITION[1]), np.kron(IDENTITY, IDENTITY)
+    ),
+]
+
+
+def reference_gap(k, band_index):
+    eigenvalues = np.linalg.eigvalsh(hamiltonian(k))
+    return eigenvalues[band_index + 1] - eigenvalues[band_index]
+
+
+@pytest.fixture(
+    params=[
+        dict(hamiltonian=hamiltonian),
+        dict(hamiltonian=vectorized_hamiltonian, vectorized=True),
+        dict(terms=TERMS),
+    ],
+    ids=['scalar', 'vectorized', 'terms']
+)
+def gap_kwargs(request):
+    return request.param
+
+
+@pytest.mark.parametrize('band_index', [0, 1, 2])
+def test_values(gap_kwargs, band_index):
+    """
+    Test the scalar and vectorized gap functions against a direct
+    diagonalization.
+    """
+    gap = HamiltonianGap(band_index=band_index, **gap_kwargs)
+    positions = np.random.RandomState(42).uniform(size=(20, 3))
+    reference = [reference_gap(k, band_index) for k in positions]
+    assert np.allclose(gap.batch(positions), reference)
+    assert np.allclose([gap(k) for k in positions], reference)
+    assert np.allclose(
+        gap.hamiltonians(positions), [hamiltonian(k) for k in positions]
+    )
+
+
+def test_multiple_bands(gap_kwargs):
+    """
+    Test the vector-valued gap function for multiple band indices.
+    """
+    band_indices = [0, 2, 1]
+    gap = HamiltonianGap(band_index=band_indices, **gap_kwargs)
+    positions = np.random.RandomState(42).uniform(size=(20, 3))
+    reference = np.array([[
+        reference_gap(k, band_index) for band_index in band_indices
+    ] for k in positions])
+    assert gap.batch(positions).shape == (20, 3)
+    assert np.allclose(gap.batch(positions), reference)
+    assert np.allclose([gap(k) for k in positions], reference)
+
+
+@pytest.mark.parametrize('band_index', [0, [0, 2, 1]])
+def test_gradient(gap_kwargs, band_index):
+    """
+    Test the gradient of the gap against finite differences.
+    """
+    if 'hamiltonian' in gap_kwargs and not gap_kwargs.get('vectorized'):
+        gradient_fct = hamiltonian_gradient
+    else:
+        gradient_fct = vectorized_hamiltonian_gradient
+    gap = HamiltonianGap(
+        band_index=band_index, hamiltonian_gradient=gradient_fct, **gap_kwargs
+    )
+    positions = np.random.RandomState(42).uniform(size=(20, 3))
+    delta = 1e-6
+    reference = np.moveaxis([(
+        gap.batch(positions + delta * direction) -
+        gap.batch(positions - delta * direction)
+    ) / (2 * delta) for direction in np.eye(3)], 0, -1)
+    values, gradients = gap.batch_value_and_gradient(positions)
+    assert np.allclose(values, gap.batch(positions))
+    assert np.allclose(gradients, reference, atol=1e-6)
+    for k, value, gradient in zip(positions, values, gradients):
+        single_value, single_gradient = gap.value_and_gradient(k)
+        assert np.allclose(single_value, value)
+        assert np.allclose(single_gradient, gradient)
+
+
+def test_search_gradient():
+    """
+    Test that the Weyl node is found with the gradient-based minimizer.
+    """
+    gap = HamiltonianGap(
+        terms=TERMS,
+        band_index=0,
+        hamiltonian_gradient=vectorized_hamiltonian_gradient
+    )
+    result = nf.search.run(
+        gap.value_and_gradient,
+        initial_mesh_size=2,
+        refinement_stencil=None,
+        minimizer='gauss_newton'
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert np.linalg.norm(node.pos - NODE_POSITION) < 1e-4
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_search(batched):
+    """
+    Test that the Weyl node is found with the scalar and vectorized gap
+    functions.
+    """
+    gap = HamiltonianGap(terms=TERMS, band_index=0)
+    if batched:
+        gap_fct_kwargs = dict(batch_gap_fct=gap.batch)
+    else:
+        gap_fct_kwargs = dict(gap_fct=gap)
+    result = nf.search.run(
+        initial_mesh_size=2, refinement_stencil=None, **gap_fct_kwargs
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert np.linalg.norm(node.pos - NODE_POSITION) < 1e-4
+
+
+def test_pickle():
+    """
+    Test that the gap function of a scalar Hamiltonian can be pickled, and
+    used in a search running the evaluations in separate processes.
+    """
+    gap = HamiltonianGap(
+        hamiltonian, band_index=0, hamiltonian_gradient=hamiltonian_gradient
+    )
+    gap_copy = pickle.loads(pickle.dumps(gap))
+    positions = np.random.RandomState(42).uniform(size=(5, 3))
+    for values, values_copy in zip(
+        gap.batch_value_and_gradient(positions),
+        gap_copy.batch_value_and_gradient(positions)
+    ):
+        assert np.allclose(values, values_copy)
+    result = nf.search.run(
+        gap, initial_mesh_size=2, refinement_stencil=None, executor=2
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert np.linalg.norm(node.pos - NODE_POSITION) < 1e-4
+
+
+def test_invalid():
+    """
+    Test the errors raised for invalid input.
+    """
+    with pytest.raises(ValueError):
+        HamiltonianGap(band_index=0)
+    with pytest.raises(ValueError):
+        HamiltonianGap(hamiltonian, terms=TERMS, band_index=0)
+    with pytest.raises(ValueError):
+        HamiltonianGap(terms=[], band_index=0)
+    with pytest.raises(ValueError):
+        HamiltonianGap(terms=TERMS, band_index=-1)
+    with pytest.raises(ValueError):
+        HamiltonianGap(terms=TERMS, band_index=3)
+    with pytest.raises(ValueError):
+        HamiltonianGap(terms=TERMS, band_index=[0, 3])
+    with pytest.raises(ValueError):
+        HamiltonianGap(terms=TERMS, band_index=[])
+    with pytest.raises(ValueError):
+        HamiltonianGap(hamiltonian, band_index=3)([0.1, 0.2, 0.3])
+    with pytest.raises(ValueError):
+        HamiltonianGap(hamiltonian,
+                       band_index=0).value_and_gradient([0.1, 0.2, 0.3])
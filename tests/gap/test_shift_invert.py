@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the gap function computed from a part of the spectrum.
+"""
+
+import pickle
+
+import pytest
+import numpy as np
+import scipy.sparse as sp
+
+import nodefinder as nf
+from nodefinder.gap import ShiftInvertGap
+
+NODE_POSITION = np.array([0.2, 0.4, 0.6])
+NUM_SITES = 5
+
+
+def create_lattice():
+    """
+    Create the sparse Hamiltonian of a cubic lattice of ``NUM_SITES**3``
+    sites with random on-site energies, shifted away from zero.
+    """
+    hopping = sp.diags([1, 1], [-1, 1], shape=(NUM_SITES, NUM_SITES))
+    identity = sp.identity(NUM_SITES)
+    onsite = np.random.RandomState(42).uniform(-1, 1, size=NUM_SITES**3)
+    onsite += 8 * np.sign(onsite)
+    return (
+        sp.kron(sp.kron(hopping, identity), identity) +
+        sp.kron(sp.kron(identity, hopping), identity) +
+        sp.kron(sp.kron(identity, identity), hopping) + sp.diags(onsite)
+    )
+
+
+LATTICE = create_lattice()
+LATTICE_IDENTITY = sp.identity(NUM_SITES**3)
+
+
+def lattice_hamiltonian(pos):
+    """
+    Hamiltonian consisting of the lattice, with an energy shift depending on
+    the position, and a block containing a Weyl node at zero energy.
+    """
+    kx, ky, kz = pos - NODE_POSITION
+    weyl = np.array([[kz, kx - 1j * ky], [kx + 1j * ky, -kz]])
+    return sp.block_diag([
+        LATTICE + np.cos(2 * np.pi * pos[0]) * LATTICE_IDENTITY, weyl
+    ],
+                         format='csc')
+
+
+def reference_gap(pos, energy, num_eigenvalues):
+    """
+    Compute the gap from the eigenvalues closest to the energy, out of the
+    full spectrum.
+    """
+    eigenvalues = np.linalg.eigvalsh(lattice_hamiltonian(pos).toarray())
+    eigenvalues = eigenvalues[np.argsort(np.abs(eigenvalues - energy)
+                                         )[:num_eigenvalues]]
+    below = eigenvalues[eigenvalues <= energy]
+    above = eigenvalues[eigenvalues > energy]
+    if len(below) == 0:
+        return np.min(above) + np.max(above) - 2 * energy
+    if len(above) == 0:
+        return 2 * energy - np.max(below) - np.min(below)
+    return np.min(above) - np.max(below)
+
+
+@pytest.mark.parametrize('energy', [0., 1.5, 8.])
+@pytest.mark.parametrize('num_eigenvalues', [2, 6])
+@pytest.mark.parametrize('warm_start', [False, True])
+def test_values(energy, num_eigenvalues, warm_start):
+    """
+    Test the gap values against the full diagonalization, including the
+    positions where all computed eigenvalues are on the same side of the
+    energy.
+    """
+    gap = ShiftInvertGap(
+        lattice_hamiltonian,
+        energy=energy,
+        num_eigenvalues=num_eigenvalues,
+        warm_start=warm_start
+    )
+    positions = np.random.RandomState(1).uniform(size=(5, 3))
+    reference = [
+        reference_gap(pos, energy, num_eigenvalues) for pos in positions
+    ]
+    assert np.allclose([gap(pos) for pos in positions], reference)
+    assert np.allclose(gap.batch(positions), reference)
+    gap_copy = pickle.loads(pickle.dumps(gap))
+    assert np.allclose(gap_copy.batch(positions), reference)
+
+
+def test_one_sided():
+    """
+    Test the lower estimate of the gap when all computed eigenvalues are
+    above the energy.
+    """
+    gap = ShiftInvertGap(lambda pos: np.diag(np.arange(1., 11.)), energy=-1)
+    assert gap([0.]) == pytest.approx(2 + 5)
+
+
+def test_search():
+    """
+    Test that the Weyl node at zero energy is found.
+    """
+    result = nf.search.run(
+        ShiftInvertGap(lattice_hamiltonian, energy=0., warm_start=True),
+        initial_mesh_size=1,
+        refinement_stencil=None
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert np.linalg.norm(node.pos - NODE_POSITION) < 1e-4
+
+
+def test_invalid():
+    """
+    Test that requesting less than two eigenvalues raises an error.
+    """
+    with pytest.raises(ValueError):
+        ShiftInvertGap(lattice_hamiltonian, energy=0., num_eigenvalues=1)
+
+
+def test_warm_start_copies_position():
+    """
+    Test that the positions stored for the warm start are not affected by
+    modifying the array passed to the gap function.
+    """
+    gap = ShiftInvertGap(lattice_hamiltonian, energy=0., warm_start=True)
+    pos = np.array([0.1, 0.2, 0.3])
+    gap(pos)
+    pos[:] = 0.
+    (stored_pos, _), = gap._recent_eigenvectors
+    assert np.allclose(stored_pos, [0.1, 0.2, 0.3])
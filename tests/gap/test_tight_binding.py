@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the Bloch Hamiltonian of tight-binding models.
+"""
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.gap import HamiltonianGap, TightBindingHamiltonian
+
+PAULI_X = np.array([[0, 1], [1, 0]], dtype=complex)
+PAULI_Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+PAULI_Z = np.array([[1, 0], [0, -1]], dtype=complex)
+
+# Weyl semimetal with H(k) = sin(kx) X + sin(ky) Y
+# + (2 - cos(kx) - cos(ky) - cos(kz)) Z, which has nodes at k = (0, 0, +-1/4)
+# in reduced coordinates.
+WEYL_HOPPINGS = {
+    (0, 0, 0): 2 * PAULI_Z,
+    (1, 0, 0): (PAULI_X / 2j - PAULI_Z / 2),
+    (-1, 0, 0): (-PAULI_X / 2j - PAULI_Z / 2),
+    (0, 1, 0): (PAULI_Y / 2j - PAULI_Z / 2),
+    (0, -1, 0): (-PAULI_Y / 2j - PAULI_Z / 2),
+    (0, 0, 1): -PAULI_Z / 2,
+    (0, 0, -1): -PAULI_Z / 2,
+}
+WEYL_NODES = np.array([[0, 0, 0.25], [0, 0, 0.75]])
+
+
+def naive_hamiltonian(k, hoppings):
+    return sum(
+        np.exp(2j * np.pi * np.dot(k, R)) * hopping_matrix
+        for R, hopping_matrix in hoppings.items()
+    )
+
+
+def random_hoppings(num_orbitals, max_distance, random_state):
+    """
+    Create the hoppings of a random Hermitian tight-binding model.
+    """
+    hoppings = dict()
+    distances = range(-max_distance, max_distance + 1)
+    for R in np.array(np.meshgrid(distances, distances,
+                                  distances)).reshape(3, -1).T:
+        R = tuple(R)
+        minus_R = tuple(-x for x in R)
+        if minus_R in hoppings:
+            hoppings[R] = hoppings[minus_R].conj().T
+        else:
+            matrix = random_state.normal(
+                size=(num_orbitals, num_orbitals)
+            ) + 1j * random_state.normal(size=(num_orbitals, num_orbitals))
+            if R == minus_R:
+                matrix += matrix.conj().T
+            hoppings[R] = matrix
+    return hoppings
+
+
+def test_hamiltonian():
+    """
+    Test the Hamiltonian of a random model against the naive Fourier sum.
+    """
+    random_state = np.random.RandomState(42)
+    hoppings = random_hoppings(4, 1, random_state)
+    hamiltonian = TightBindingHamiltonian(hoppings)
+    assert hamiltonian.num_orbitals == 4
+    assert hamiltonian.lattice_vectors.shape == (27, 3)
+    positions = random_state.uniform(size=(10, 3))
+    reference = np.array([naive_hamiltonian(k, hoppings) for k in positions])
+    assert np.allclose(reference, reference.conj().transpose(0, 2, 1))
+    assert np.allclose(hamiltonian(positions), reference)
+    assert np.allclose(hamiltonian(positions[0]), reference[0])
+
+
+def test_gradient():
+    """
+    Test the derivatives of the Hamiltonian of a random model against
+    finite differences.
+    """
+    random_state = np.random.RandomState(42)
+    hamiltonian = TightBindingHamiltonian(random_hoppings(4, 1, random_state))
+    positions = random_state.uniform(size=(10, 3))
+    delta = 1e-6
+    reference = np.moveaxis([(
+        hamiltonian(positions + delta * direction) -
+        hamiltonian(positions - delta * direction)
+    ) / (2 * delta) for direction in np.eye(3)], 0, 1)
+    assert hamiltonian.gradient(positions).shape == (10, 3, 4, 4)
+    assert np.allclose(hamiltonian.gradient(positions), reference, atol=1e-6)
+    assert np.allclose(hamiltonian.gradient(positions[0]), reference[0])
+
+
+@pytest.mark.parametrize('batched', [False, True])
+@pytest.mark.parametrize('minimizer', ['nelder_mead', 'gauss_newton'])
+def test_search(batched, minimizer):
+    """
+    Test that the nodes of a Weyl semimetal are found with the scalar and
+    vectorized gap functions, and with the gradient-based minimizer.
+    """
+    hamiltonian = TightBindingHamiltonian(WEYL_HOPPINGS)
+    gap = HamiltonianGap(
+        hamiltonian,
+        vectorized=True,
+        band_index=0,
+        hamiltonian_gradient=hamiltonian.gradient
+    )
+    if minimizer == 'gauss_newton':
+        gap_fct = gap.value_and_gradient
+        batch_gap_fct = gap.batch_value_and_gradient
+    else:
+        gap_fct = gap
+        batch_gap_fct = gap.batch
+    if batched:
+        gap_fct_kwargs = dict(batch_gap_fct=batch_gap_fct)
+    else:
+        gap_fct_kwargs = dict(gap_fct=gap_fct)
+    result = nf.search.run(
+        initial_mesh_size=3,
+        refinement_stencil=None,
+        minimizer=minimizer,
+        **gap_fct_kwargs
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert min(
+            result.coordinate_system.distance(node.pos, node_pos)
+            for node_pos in WEYL_NODES
+        ) < 1e-4
+    for node_pos in WEYL_NODES:
+        assert min(
+            result.coordinate_system.distance(node.pos, node_pos)
+            for node in result.nodes
+        ) < 1e-4
+
+
+def test_invalid():
+    """
+    Test the errors raised for invalid hoppings.
+    """
+    with pytest.raises(ValueError):
+        TightBindingHamiltonian({})
+    with pytest.raises(ValueError):
+        TightBindingHamiltonian({(0, 0): PAULI_Z, (1, 0, 0): PAULI_X})
+    with pytest.raises(ValueError):
+        TightBindingHamiltonian({(0, 0, 0): PAULI_Z, (1, 0, 0): np.eye(3)})
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for aborting redundant minimizations.
+"""
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run
+from nodefinder.search._minimization import run_minimization
+from nodefinder.search.result._minimization import ABORTED_STATUS
+from nodefinder.search.result import SearchResultContainer
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.7, 0.2, 0.8]])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+@pytest.mark.parametrize('use_fake_potential', [True, False])
+def test_abort_redundant(use_fake_potential, gap_fct, check_nodes):
+    """
+    Test that aborting redundant minimizations finds all nodes with fewer
+    evaluations.
+    """
+    results = {
+        abort_redundant: run(
+            gap_fct,
+            initial_mesh_size=3,
+            use_fake_potential=use_fake_potential,
+            abort_redundant=abort_redundant
+        )
+        for abort_redundant in [False, True]
+    }
+    for result in results.values():
+        check_nodes(result.nodes, NODE_POSITIONS)
+    num_fev = {
+        key: sum(res.num_fev for res in result.minimization_results)
+        for key, result in results.items()
+    }
+    assert num_fev[True] < num_fev[False]
+    assert results[False].num_aborted == 0
+    assert results[False].num_fev_saved == 0
+    assert results[True].num_aborted > 0
+    assert results[True].num_fev_saved > 0
+
+    with tempfile.NamedTemporaryFile() as named_file:
+        nf.io.save(results[True], named_file.name)
+        result_reloaded = nf.io.load(named_file.name)
+    assert isinstance(result_reloaded, SearchResultContainer)
+    assert result_reloaded.num_aborted == results[True].num_aborted
+    assert result_reloaded.num_fev_saved == results[True].num_fev_saved
+
+
+@pytest.mark.parametrize('use_fake_potential', [True, False])
+def test_should_continue(use_fake_potential):
+    """
+    Test that a minimization is aborted when the continuation check fails.
+    """
+    num_calls = []
+
+    def should_continue(simplex, values):  # pylint: disable=unused-argument
+        num_calls.append(None)
+        return len(num_calls) < 3
+
+    async def func(pos):
+        return np.linalg.norm(pos - 0.5)
+
+    result = asyncio.get_event_loop().run_until_complete(
+        run_minimization(
+            func,
+            initial_simplex=np.array([[0., 0.], [0., 0.1], [0.1, 0.]]),
+            fake_potential=(lambda pos: 0) if use_fake_potential else None,
+            nelder_mead_kwargs=dict(xtol=1e-6, ftol=1e-6),
+            should_continue=should_continue
+        )
+    )
+    assert len(num_calls) == 3
+    assert result.status == ABORTED_STATUS
+    assert not result.success
+    assert result.num_fev < 10
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for evaluating a vectorized gap function in batches.
+"""
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+
+def batch_gap_fct(positions):
+    """
+    Vectorized distance to a single node, which records the batch sizes.
+    """
+    batch_gap_fct.batch_sizes.append(len(positions))
+    deltas = (positions - NODE_POSITION) % 1
+    deltas_periodic = np.minimum(deltas, 1 - deltas)
+    return np.linalg.norm(deltas_periodic, axis=-1)
+
+
+def test_batch():
+    """
+    Test that the node is found when using a batched gap function, and that
+    the evaluations are actually combined into batches.
+    """
+    batch_gap_fct.batch_sizes = []
+    result = run(
+        batch_gap_fct=batch_gap_fct,
+        initial_mesh_size=3,
+        refinement_stencil=None,
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert np.linalg.norm(node.pos - NODE_POSITION) < 1e-6
+    assert max(batch_gap_fct.batch_sizes) > 1
+    assert sum(batch_gap_fct.batch_sizes
+               ) == sum(res.num_fev for res in result.minimization_results)
+
+
+def test_batch_exclusive():
+    """
+    Test that giving both a scalar and a batch gap function raises an error.
+    """
+    with pytest.raises(ValueError):
+        run(lambda x: 0, batch_gap_fct=batch_gap_fct)
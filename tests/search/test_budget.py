@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for stopping the search with an evaluation budget or deadline.
+"""
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import logging
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run, run_async
+
+NODE_POSITIONS = np.array([(0.2, 0.9, 0.6), (0.99, 0.01, 0.0)])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+@pytest.fixture
+def check_complete(check_nodes):
+    """
+    Check that the search is complete and found all nodes.
+    """
+    def inner(result):
+        assert result.complete
+        assert result.stop_reason is None
+        check_nodes(result.nodes, NODE_POSITIONS)
+
+    return inner
+
+
+def test_max_fev_resume(gap_fct, check_complete):
+    """
+    Test that the search stops when the evaluation budget is reached, and
+    can be resumed from the save file.
+    """
+    with tempfile.NamedTemporaryFile() as named_file:
+        result = run(
+            gap_fct,
+            initial_mesh_size=2,
+            feature_size=0.1,
+            save_file=named_file.name,
+            max_fev=500,
+        )
+        assert not result.complete
+        assert result.stop_reason == 'max_fev'
+        assert sum(res.num_fev for res in result.minimization_results) <= 500
+
+        saved_state = nf.io.load(named_file.name)
+        assert saved_state.result.stop_reason == 'max_fev'
+        assert not saved_state.simplex_queue.finished
+
+        result_resumed = run(
+            gap_fct,
+            initial_mesh_size=2,
+            feature_size=0.1,
+            save_file=named_file.name,
+            load=True,
+        )
+        check_complete(result_resumed)
+        assert len(result_resumed.minimization_results
+                   ) > len(result.minimization_results)
+
+
+@pytest.mark.parametrize('deadline', [0.2, 1000.])
+def test_deadline(deadline, gap_fct, check_complete):
+    """
+    Test that the search stops at the deadline.
+    """
+    async def slow_gap_fct(pos):
+        await asyncio.sleep(1e-3)
+        return gap_fct(pos)
+
+    result = run(
+        slow_gap_fct,
+        initial_mesh_size=2,
+        feature_size=0.1,
+        deadline=deadline,
+    )
+    if deadline < 1:
+        assert result.stop_reason == 'deadline'
+    else:
+        check_complete(result)
+
+
+def test_deadline_timer(gap_fct):
+    """
+    Test that the deadline timer is cancelled when the search finishes.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(
+            run_async(
+                gap_fct, initial_mesh_size=2, feature_size=0.1, deadline=1000.
+            )
+        )
+        # pylint: disable=protected-access
+        assert all(handle.cancelled() for handle in loop._scheduled)
+    finally:
+        loop.close()
+
+
+def test_max_fev_batch(caplog, gap_fct):
+    """
+    Test that the evaluation budget can be used with a vectorized gap
+    function, without errors from the evaluations which are cancelled while
+    their batch is running.
+    """
+    async def batch_gap_fct(positions):
+        await asyncio.sleep(1e-2)
+        return [gap_fct(pos) for pos in positions]
+
+    async def run_search():
+        result = await run_async(
+            batch_gap_fct=batch_gap_fct,
+            initial_mesh_size=2,
+            feature_size=0.1,
+            max_fev=200,
+        )
+        # Let the batches which were running when the search stopped finish.
+        await asyncio.sleep(0.1)
+        return result
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(run_search())
+    finally:
+        loop.close()
+    assert result.stop_reason == 'max_fev'
+    assert not [
+        record for record in caplog.records if record.levelno >= logging.ERROR
+    ]
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the cache of the gap function evaluations.
+"""
+# pylint: disable=redefined-outer-name
+
+import asyncio
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run, EvaluationCache
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the node.
+    """
+    return distance_gap_fct(NODE_POSITION)
+
+
+@pytest.fixture
+def counting_fct():
+    """
+    Create a coroutine which counts its evaluations at each position.
+    """
+    def inner(func, delay=0.):
+        async def wrapped(pos):
+            wrapped.calls.append(tuple(pos))
+            await asyncio.sleep(delay)
+            return func(pos)
+
+        wrapped.calls = []
+        return wrapped
+
+    return inner
+
+
+def test_invalid_size():
+    """
+    Test that a maximum size which is not positive raises an error.
+    """
+    with pytest.raises(ValueError):
+        EvaluationCache(max_size=0)
+
+
+def evaluate(cache, func, positions):
+    return asyncio.get_event_loop().run_until_complete(
+        asyncio.gather(*[cache.evaluate(func, pos) for pos in positions])
+    )
+
+
+def test_hits(counting_fct, gap_fct):
+    """
+    Test that positions which agree to within the tolerance are evaluated
+    only once.
+    """
+    cache = EvaluationCache(tolerance=1e-10)
+    func = counting_fct(gap_fct)
+    positions = [[0.1, 0.2, 0.3], [0.1 + 1e-14, 0.2, 0.3], [0.1, 0.2, 0.4]]
+    values = evaluate(cache, func, positions)
+    values_again = evaluate(cache, func, positions)
+    assert values == values_again
+    assert values[0] == values[1] == gap_fct(positions[0])
+    assert len(func.calls) == 2
+    assert cache.num_misses == 2
+    assert cache.num_hits == 4
+
+
+def test_concurrent(counting_fct, gap_fct):
+    """
+    Test that concurrent requests for the same position wait for a single
+    evaluation.
+    """
+    cache = EvaluationCache(tolerance=1e-10)
+    func = counting_fct(gap_fct, delay=0.01)
+    values = evaluate(cache, func, [[0.1, 0.2, 0.3]] * 5)
+    assert len(set(values)) == 1
+    assert len(func.calls) == 1
+    assert cache.num_misses == 1
+    assert cache.num_hits == 4
+
+
+def test_lru(counting_fct, gap_fct):
+    """
+    Test that the least recently used values are removed when the maximum
+    size is exceeded.
+    """
+    cache = EvaluationCache(max_size=2, tolerance=1e-10)
+    func = counting_fct(gap_fct)
+    pos_a, pos_b, pos_c = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]]
+    for pos in [pos_a, pos_b, pos_a, pos_c]:
+        evaluate(cache, func, [pos])
+    assert len(cache) == 2
+    evaluate(cache, func, [pos_a])
+    assert len(func.calls) == 3
+    evaluate(cache, func, [pos_b])
+    assert len(func.calls) == 4
+
+
+def test_exception():
+    """
+    Test that an exception is passed to all requests waiting for the
+    evaluation, and that the value is not cached.
+    """
+    num_calls = [0]
+
+    async def invalid_fct(pos):
+        num_calls[0] += 1
+        await asyncio.sleep(0.01)
+        raise ValueError
+
+    cache = EvaluationCache(tolerance=1e-10)
+
+    async def run_evaluations():
+        return await asyncio.gather(
+            *[cache.evaluate(invalid_fct, [0.1, 0.2]) for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = asyncio.get_event_loop().run_until_complete(run_evaluations())
+    assert all(isinstance(res, ValueError) for res in results)
+    assert num_calls[0] == 1
+    assert len(cache) == 0
+
+
+def test_cancelled(counting_fct, gap_fct):
+    """
+    Test that a request waiting for an evaluation which is cancelled
+    evaluates the function itself.
+    """
+    cache = EvaluationCache(tolerance=1e-10)
+    func = counting_fct(gap_fct, delay=0.01)
+    pos = [0.1, 0.2, 0.3]
+
+    async def run_evaluations():
+        first = asyncio.ensure_future(cache.evaluate(func, pos))
+        second = asyncio.ensure_future(cache.evaluate(func, pos))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.get_event_loop().run_until_complete(run_evaluations()
+                                                       ) == gap_fct(pos)
+    assert len(func.calls) == 2
+
+
+def test_search(counting_fct, gap_fct, check_nodes):
+    """
+    Test the search with the evaluation cache, where the restart after the
+    fake potential step re-evaluates known positions.
+    """
+    func = counting_fct(gap_fct)
+    cache = EvaluationCache()
+    result = run(
+        func,
+        initial_mesh_size=2,
+        use_fake_potential=True,
+        evaluation_cache=cache
+    )
+    check_nodes(result.nodes, NODE_POSITION)
+    assert cache.tolerance is not None
+    assert cache.num_hits > 0
+    assert len(func.calls) == cache.num_misses
+    assert len(func.calls
+               ) < sum(res.num_fev for res in result.minimization_results)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the search with a vector-valued gap function.
+"""
+# pylint: disable=redefined-outer-name
+
+import os
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import (
+    run, iter_search, EvaluationCache, EvaluationStore
+)
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.7, 0.3, 0.4]])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to each of the nodes.
+    """
+    return distance_gap_fct(NODE_POSITIONS, per_node=True)
+
+
+@pytest.fixture
+def batch_gap_fct(gap_fct):
+    """
+    Vectorized distance to each of the nodes.
+    """
+    def inner(positions):
+        return np.array([gap_fct(pos) for pos in positions])
+
+    return inner
+
+
+@pytest.fixture
+def check_results(check_nodes):
+    """
+    Check that each channel found the node of the corresponding band pair.
+    """
+    def inner(results):
+        assert len(results) == len(NODE_POSITIONS)
+        for result, node_pos in zip(results, NODE_POSITIONS):
+            check_nodes(result.nodes, node_pos)
+
+    return inner
+
+
+def test_channels(count_evaluations, gap_fct, check_results):
+    """
+    Test that the channels are searched separately, and that their
+    evaluations are shared.
+    """
+    counting_gap_fct = count_evaluations(gap_fct)
+    cache = EvaluationCache()
+    results = run(
+        counting_gap_fct,
+        num_channels=2,
+        initial_mesh_size=2,
+        evaluation_cache=cache
+    )
+    check_results(results)
+    assert cache.num_hits > 0
+    assert counting_gap_fct.num_evaluations == cache.num_misses
+
+    num_evaluations_separate = 0
+    for channel in range(2):
+        channel_gap_fct = count_evaluations(
+            lambda pos, channel=channel: gap_fct(pos)[channel]
+        )
+        run(channel_gap_fct, initial_mesh_size=2)
+        num_evaluations_separate += channel_gap_fct.num_evaluations
+    assert counting_gap_fct.num_evaluations < num_evaluations_separate
+
+
+def test_batch(batch_gap_fct, check_results):
+    """
+    Test the channels with a vectorized gap function.
+    """
+    check_results(
+        run(
+            batch_gap_fct=batch_gap_fct,
+            num_channels=2,
+            initial_mesh_size=2,
+            refinement_stencil=None
+        )
+    )
+
+
+def test_save_load(count_evaluations, gap_fct, check_results):
+    """
+    Test that the results of the channels are saved to separate files, and
+    can be loaded.
+    """
+    with tempfile.TemporaryDirectory() as dirname:
+        save_file = os.path.join(dirname, 'result.hdf5')
+        results = run(
+            gap_fct,
+            num_channels=2,
+            initial_mesh_size=2,
+            refinement_stencil=None,
+            save_file=save_file
+        )
+        states = [
+            nf.io.load('{}.channel_{}'.format(save_file, channel))
+            for channel in range(2)
+        ]
+        for state, result in zip(states, results):
+            assert len(state.result.nodes) == len(result.nodes)
+        counting_gap_fct = count_evaluations(gap_fct)
+        results_loaded = run(
+            counting_gap_fct,
+            num_channels=2,
+            initial_mesh_size=2,
+            refinement_stencil=None,
+            initial_state=states
+        )
+        assert counting_gap_fct.num_evaluations == 0
+        check_results(results_loaded)
+
+
+def test_node_callback(gap_fct, check_nodes):
+    """
+    Test that the node callback and the search iterator get the channel of
+    each node.
+    """
+    nodes = []
+    results = run(
+        gap_fct,
+        num_channels=2,
+        initial_mesh_size=2,
+        refinement_stencil=None,
+        node_callback=lambda node, channel: nodes.append((node, channel))
+    )
+    assert len(nodes) == sum(len(result.nodes) for result in results)
+    for node, channel in nodes:
+        check_nodes([node], NODE_POSITIONS[channel])
+
+    nodes_iter = list(
+        iter_search(
+            gap_fct,
+            num_channels=2,
+            initial_mesh_size=2,
+            refinement_stencil=None
+        )
+    )
+    assert sorted(channel for _, channel in nodes_iter
+                  ) == sorted(channel for _, channel in nodes)
+
+
+def test_invalid(gap_fct):
+    """
+    Test the errors raised for invalid input.
+    """
+    with pytest.raises(ValueError):
+        run(gap_fct, num_channels=0)
+    with pytest.raises(ValueError):
+        run(gap_fct, num_channels=2, evaluation_cache=False)
+    with pytest.raises(ValueError):
+        run(gap_fct, num_channels=2, initial_state=[None])
+    with tempfile.TemporaryDirectory() as dirname, EvaluationStore(
+        os.path.join(dirname, 'evaluations.sqlite'), fingerprint='a'
+    ) as store:
+        with pytest.raises(ValueError):
+            run(
+                gap_fct,
+                num_channels=2,
+                evaluation_cache=EvaluationCache(store=store)
+            )
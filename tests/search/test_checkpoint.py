@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for resuming interrupted minimizations from their checkpoints.
+"""
+# pylint: disable=redefined-outer-name
+
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run
+from nodefinder.search.result import ControllerState
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+INITIAL_SIMPLEX = np.array([[0.1, 0.1, 0.1], [0.3, 0.1, 0.1], [0.1, 0.3, 0.1],
+                            [0.1, 0.1, 0.3]])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the node.
+    """
+    return distance_gap_fct(NODE_POSITION)
+
+
+@pytest.fixture
+def step_fct(gap_fct):
+    """
+    Function with plateaus, which leads to shrink steps.
+    """
+    def inner(pos):
+        return np.floor(10 * np.linalg.norm(pos - 0.37)) + gap_fct(pos)
+
+    return inner
+
+
+def fake_potential(pos):
+    return float('inf') if np.linalg.norm(pos - 0.5) < 0.1 else 0
+
+
+@pytest.mark.parametrize('fake_pot', [None, fake_potential])
+def test_resume_minimization(fake_pot, minimize, step_fct):
+    """
+    Test that resuming the minimization from a checkpoint, saved to and
+    loaded from a file, gives the same result as the uninterrupted
+    minimization.
+    """
+    checkpoints = []
+    reference = minimize(
+        step_fct,
+        initial_simplex=INITIAL_SIMPLEX,
+        fake_potential=fake_pot,
+        checkpoint=checkpoints.append
+    )
+    assert len(checkpoints) > 10
+    for checkpoint in checkpoints[::5]:
+        with tempfile.NamedTemporaryFile() as named_file:
+            nf.io.save(checkpoint, named_file.name)
+            checkpoint = nf.io.load(named_file.name)
+        assert np.all(checkpoint.initial_simplex == INITIAL_SIMPLEX)
+        result = minimize(
+            step_fct,
+            initial_simplex=INITIAL_SIMPLEX,
+            fake_potential=fake_pot,
+            resume_from=checkpoint
+        )
+        assert np.all(result.pos == reference.pos)
+        assert result.num_fev == reference.num_fev
+        assert result.num_iter == reference.num_iter
+        assert np.all(result.simplex_history == reference.simplex_history)
+        assert np.all(
+            result.fun_simplex_history == reference.fun_simplex_history
+        )
+
+
+def test_resume_search(gap_fct, check_nodes):
+    """
+    Test that a search which is stopped resumes the running minimizations
+    from their checkpoints.
+    """
+    with tempfile.NamedTemporaryFile() as named_file:
+        run(
+            gap_fct,
+            initial_mesh_size=2,
+            refinement_stencil=None,
+            max_fev=100,
+            save_file=named_file.name
+        )
+        state = nf.io.load(named_file.name)
+    assert state.checkpoints
+    assert max(checkpoint.num_fev
+               for checkpoint in state.checkpoints) > len(INITIAL_SIMPLEX)
+
+    def resume(initial_state):
+        num_evaluations = []
+
+        def counting_gap_fct(pos):
+            num_evaluations.append(None)
+            return gap_fct(pos)
+
+        result = run(
+            counting_gap_fct,
+            initial_state=initial_state,
+            initial_mesh_size=2,
+            refinement_stencil=None
+        )
+        assert result.complete
+        check_nodes(result.nodes, NODE_POSITION)
+        return len(num_evaluations)
+
+    num_fev_resumed = resume(state)
+    num_fev_restarted = resume(
+        ControllerState(
+            result=state.result,
+            simplex_queue=state.simplex_queue,
+            position_queue=state.position_queue,
+        )
+    )
+    assert num_fev_resumed < num_fev_restarted - 50
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the adaptive control of the number of parallel minimizations.
+"""
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run, AdaptiveConcurrency
+
+
+def test_increase_decrease():
+    """
+    Test that the limit is increased while the latency is constant, and
+    decreased when the latency increases.
+    """
+    concurrency = AdaptiveConcurrency(initial=10, min_window=10)
+    changes = [
+        concurrency.record(1., num_running=10, num_queued=1)
+        for _ in range(10)
+    ]
+    assert changes == [False] * 9 + [True]
+    assert concurrency.limit == 11
+
+    for _ in range(11):
+        concurrency.record(3., num_running=11, num_queued=1)
+    assert concurrency.limit == 8
+    assert [h.limit for h in concurrency.history] == [11, 8]
+
+
+def test_latency_rise_fall():
+    """
+    Test that the baseline latency follows a lasting rise of the latency,
+    such that the limit does not shrink to the minimum, and that the limit
+    is increased again when the latency falls.
+    """
+    concurrency = AdaptiveConcurrency(
+        initial=100, min_window=1, baseline_windows=5
+    )
+
+    def record_window(latency, num_queued):
+        limit = concurrency.limit
+        for _ in range(limit):
+            concurrency.record(
+                latency, num_running=limit, num_queued=num_queued
+            )
+
+    for _ in range(3):
+        record_window(1., num_queued=0)
+    assert concurrency.limit == 100
+    for _ in range(20):
+        record_window(4., num_queued=0)
+    limits = [h.limit for h in concurrency.history[3:]]
+    assert limits[:5] == [75, 56, 42, 31, 31]
+    assert all(limit == 31 for limit in limits[4:])
+
+    record_window(1., num_queued=1)
+    assert concurrency.limit == 32
+
+
+@pytest.mark.parametrize('num_running, num_queued', [(5, 1), (10, 0)])
+def test_no_increase_without_work(num_running, num_queued):
+    """
+    Test that the limit is not increased if not all allowed minimizations
+    are running, or if no simplices are queued.
+    """
+    concurrency = AdaptiveConcurrency(initial=10, min_window=10)
+    for _ in range(10):
+        concurrency.record(1., num_running=num_running, num_queued=num_queued)
+    assert concurrency.limit == 10
+
+
+def test_invalid_limits():
+    """
+    Test that inconsistent limits or an invalid number of baseline windows
+    raise an error.
+    """
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(initial=10, maximum=5)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(baseline_windows=0)
+
+
+@pytest.mark.parametrize('num_minimize_parallel', [0, -1, 2.5, 'invalid'])
+def test_invalid_num_minimize_parallel(num_minimize_parallel):
+    """
+    Test that an invalid number of parallel minimizations raises an error.
+    """
+    with pytest.raises(ValueError):
+        run(lambda pos: 1., num_minimize_parallel=num_minimize_parallel)
+
+
+@pytest.mark.parametrize(
+    'num_minimize_parallel', ['auto', AdaptiveConcurrency(initial=2)]
+)
+def test_search_auto(num_minimize_parallel, distance_gap_fct, check_nodes):
+    """
+    Test that a nodal point is found with adaptive concurrency.
+    """
+    node_position = np.array([0.2, 0.9, 0.6])
+    result = run(
+        distance_gap_fct(node_position),
+        initial_mesh_size=2,
+        feature_size=0.1,
+        num_minimize_parallel=num_minimize_parallel,
+    )
+    check_nodes(result.nodes, node_position)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the search on separate domains.
+"""
+
+from functools import partial
+
+import pytest
+import numpy as np
+
+from nodefinder.coordinate_system import CoordinateSystem
+from nodefinder.search import run_decomposed
+from nodefinder.search.result import SearchResultContainer, MinimizationResult
+from nodefinder.search._decomposed import get_domains, merge_domain_results
+
+
+def gap_fct(pos, node_positions, periodic):
+    """
+    Distance to the closest node.
+    """
+    deltas = np.array(pos) - node_positions
+    if periodic:
+        deltas %= 1
+        deltas = np.minimum(deltas, 1 - deltas)
+    return np.min(np.linalg.norm(deltas, axis=-1))
+
+
+@pytest.mark.parametrize('periodic', [True, False])
+def test_get_domains(periodic):
+    """
+    Test the splitting into domains with a halo.
+    """
+    domains = get_domains(
+        coordinate_system=CoordinateSystem(
+            limits=[(0, 1), (0, 2)], periodic=periodic
+        ),
+        num_domains=(2, 1),
+        halo=0.1
+    )
+    assert len(domains) == 2
+    core_limits, extended_limits = domains[0]
+    assert np.allclose(core_limits, [[0, 0.5], [0, 2]])
+    if periodic:
+        assert np.allclose(extended_limits, [[-0.1, 0.6], [-0.1, 2.1]])
+    else:
+        assert np.allclose(extended_limits, [[0, 0.6], [0, 2]])
+
+
+@pytest.mark.parametrize('periodic', [True, False])
+def test_run_decomposed(periodic):
+    """
+    Test that nodes (including ones on the domain boundaries and the periodic
+    boundary) are found exactly once.
+    """
+    node_positions = np.array([(0.2, 0.9, 0.6), (0.5, 0.5, 0.5),
+                               (0.99, 0.01, 0.3)])
+    feature_size = 0.1
+    result = run_decomposed(
+        partial(gap_fct, node_positions=node_positions, periodic=periodic),
+        num_domains=(2, 2, 1),
+        initial_mesh_size=4,
+        feature_size=feature_size,
+        periodic=periodic,
+        refinement_stencil=None,
+        num_processes=2,
+    )
+    assert result.complete
+    for node_pos in node_positions:
+        assert min(
+            result.coordinate_system.distance(node.pos, node_pos)
+            for node in result.nodes
+        ) < 1e-6
+
+
+def test_merge_halo():
+    """
+    Test that a node found in the halo of a domain, or outside the domain,
+    is taken only from the domain owning its position.
+    """
+    coordinate_system = CoordinateSystem(limits=[(0, 1)], periodic=True)
+    domains = get_domains(
+        coordinate_system=coordinate_system, num_domains=(2, ), halo=0.1
+    )
+
+    def get_result(pos, tag):
+        return MinimizationResult(
+            pos=np.array(pos), value=0., success=True, tag=tag
+        )
+
+    domain_results = []
+    for node_list in [
+        [get_result([0.45], 'core_0'),
+         get_result([0.55], 'halo_0')],
+        [
+            get_result([0.55], 'core_1'),
+            get_result([0.98], 'core_1_boundary'),
+            get_result([1.02], 'periodic_halo_1'),
+            get_result([0.3], 'outside_1')
+        ],
+    ]:
+        domain_result = SearchResultContainer(
+            coordinate_system=CoordinateSystem(
+                limits=[(-1, 2)], periodic=False
+            ),
+            gap_threshold=1e-6,
+            dist_cutoff=0.01,
+        )
+        for node in node_list:
+            domain_result.add_result(node)
+        domain_results.append(domain_result)
+
+    merged = merge_domain_results(
+        domain_results,
+        core_limits=[core for core, _ in domains],
+        coordinate_system=coordinate_system,
+        gap_threshold=1e-6,
+        dist_cutoff=0.01
+    )
+    assert sorted(node.tag for node in merged.nodes
+                  ) == ['core_0', 'core_1', 'core_1_boundary']
+
+
+def test_merge_outside_box():
+    """
+    Test that nodes outside the core of every domain are kept, unless they
+    are duplicates.
+    """
+    coordinate_system = CoordinateSystem(limits=[(0, 1)], periodic=False)
+    domains = get_domains(
+        coordinate_system=coordinate_system, num_domains=(2, ), halo=0.1
+    )
+    domain_results = []
+    for node_list in [[([0.2], 'core_0'), ([1.1], 'outside_0')],
+                      [([1.1], 'outside_1'), ([-0.1], 'outside_1_lower')]]:
+        domain_result = SearchResultContainer(
+            coordinate_system=CoordinateSystem(
+                limits=[(-1, 2)], periodic=False
+            ),
+            gap_threshold=1e-6,
+            dist_cutoff=0.01,
+        )
+        for pos, tag in node_list:
+            domain_result.add_result(
+                MinimizationResult(
+                    pos=np.array(pos), value=0., success=True, tag=tag
+                )
+            )
+        domain_results.append(domain_result)
+
+    merged = merge_domain_results(
+        domain_results,
+        core_limits=[core for core, _ in domains],
+        coordinate_system=coordinate_system,
+        gap_threshold=1e-6,
+        dist_cutoff=0.01
+    )
+    assert sorted(node.tag for node in merged.nodes
+                  ) == ['core_0', 'outside_0', 'outside_1_lower']
+
+
+def test_not_picklable():
+    """
+    Test that an error is raised if the gap function cannot be pickled.
+    """
+    with pytest.raises(ValueError):
+        run_decomposed(lambda pos: 0, num_domains=2)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the lockstep ensemble minimization.
+"""
+
+import asyncio
+import tempfile
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run, EvaluationCache
+from nodefinder.search._minimization import run_minimization
+from nodefinder.search._minimization._ensemble import run_ensemble_minimization
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.7, 0.2, 0.8]])
+
+
+def batch_gap_fct(positions):
+    deltas = (positions[:, None, :] - NODE_POSITIONS) % 1
+    deltas_periodic = np.minimum(deltas, 1 - deltas)
+    return np.min(np.linalg.norm(deltas_periodic, axis=-1), axis=-1)
+
+
+def gap_fct(pos):
+    return batch_gap_fct(np.array([pos]))[0]
+
+
+def step_fct(positions):
+    """
+    Function with plateaus, which leads to shrink steps.
+    """
+    return np.floor(10 * np.linalg.norm(positions - 0.5, axis=-1))
+
+
+def fake_potential(pos):
+    return float('inf') if np.linalg.norm(pos - 0.5) < 0.1 else 0
+
+
+@pytest.mark.parametrize('func', [batch_gap_fct, step_fct])
+@pytest.mark.parametrize('use_fake_potential', [False, True])
+@pytest.mark.parametrize(
+    'nelder_mead_kwargs', [
+        dict(xtol=1e-6, ftol=1e-7),
+        dict(xtol=1e-6, ftol=1e-7, fprime_cutoff=1.),
+        dict(xtol=1e-6, ftol=1e-7, maxfev=30),
+        dict(xtol=1e-6, ftol=1e-7, keep_history=False),
+    ]
+)
+def test_same_result(func, use_fake_potential, nelder_mead_kwargs):
+    """
+    Test that the ensemble minimization gives the same results as running
+    the minimizations separately.
+    """
+    rng = np.random.RandomState(42)
+    simplices = rng.uniform(size=(20, 1, 3)) + \
+        0.2 * rng.uniform(size=(20, 4, 3))
+    loop = asyncio.get_event_loop()
+    if use_fake_potential:
+        fake_pot = fake_potential
+    else:
+        fake_pot = None
+
+    ensemble_results = loop.run_until_complete(
+        run_ensemble_minimization(
+            func,
+            initial_simplices=simplices,
+            fake_potential=fake_pot,
+            nelder_mead_kwargs=nelder_mead_kwargs
+        )
+    )
+    assert len(ensemble_results) == len(simplices)
+
+    async def scalar_func(pos):
+        return func(np.array([pos]))[0]
+
+    for simplex, ensemble_res in zip(simplices, ensemble_results):
+        res = loop.run_until_complete(
+            run_minimization(
+                scalar_func,
+                initial_simplex=simplex,
+                fake_potential=fake_pot,
+                nelder_mead_kwargs=nelder_mead_kwargs
+            )
+        )
+        assert np.all(res.pos == ensemble_res.pos)
+        assert res.value == ensemble_res.value
+        assert res.num_fev == ensemble_res.num_fev
+        assert res.num_iter == ensemble_res.num_iter
+        assert res.status == ensemble_res.status
+        assert np.all(res.simplex_history == ensemble_res.simplex_history)
+
+
+@pytest.mark.parametrize('use_batch', [False, True])
+def test_search(use_batch):
+    """
+    Test the search using the ensemble minimization for the initial mesh.
+    """
+    if use_batch:
+        kwargs = dict(batch_gap_fct=batch_gap_fct)
+    else:
+        kwargs = dict(gap_fct=gap_fct)
+    result = run(initial_mesh_size=3, ensemble_initial_mesh=True, **kwargs)
+    for node in result.nodes:
+        assert min(
+            result.coordinate_system.distance(node.pos, node_pos)
+            for node_pos in NODE_POSITIONS
+        ) < 1e-6
+    for node_pos in NODE_POSITIONS:
+        assert min(
+            result.coordinate_system.distance(node.pos, node_pos)
+            for node in result.nodes
+        ) < 1e-6
+
+
+def test_budget_resume():
+    """
+    Test that the initial mesh is re-queued when the ensemble minimization
+    is stopped by the evaluation budget.
+    """
+    with tempfile.NamedTemporaryFile() as named_file:
+        result = run(
+            batch_gap_fct=batch_gap_fct,
+            initial_mesh_size=3,
+            ensemble_initial_mesh=True,
+            max_fev=500,
+            save_file=named_file.name,
+        )
+        assert result.stop_reason == 'max_fev'
+        assert not result.minimization_results
+
+        result = run(
+            batch_gap_fct=batch_gap_fct,
+            initial_mesh_size=3,
+            ensemble_initial_mesh=True,
+            save_file=named_file.name,
+            load=True,
+        )
+        assert result.complete
+        assert len(result.minimization_results) >= 27
+
+
+def test_budget_batch():
+    """
+    Test that the ensemble minimization with a vectorized gap function does
+    not exceed the evaluation budget.
+    """
+    def counting_batch_gap_fct(positions):
+        counting_batch_gap_fct.num_evaluations += len(positions)
+        return batch_gap_fct(positions)
+
+    counting_batch_gap_fct.num_evaluations = 0
+    result = run(
+        batch_gap_fct=counting_batch_gap_fct,
+        initial_mesh_size=3,
+        ensemble_initial_mesh=True,
+        max_fev=500,
+    )
+    assert result.stop_reason == 'max_fev'
+    assert counting_batch_gap_fct.num_evaluations == 500
+
+
+def test_cache_batch():
+    """
+    Test that the ensemble minimization with a vectorized gap function uses
+    the evaluation cache.
+    """
+    def counting_batch_gap_fct(positions):
+        counting_batch_gap_fct.num_evaluations += len(positions)
+        return batch_gap_fct(positions)
+
+    cache = EvaluationCache()
+    results = []
+    num_evaluations = []
+    for _ in range(2):
+        counting_batch_gap_fct.num_evaluations = 0
+        results.append(
+            run(
+                batch_gap_fct=counting_batch_gap_fct,
+                initial_mesh_size=2,
+                ensemble_initial_mesh=True,
+                evaluation_cache=cache,
+            )
+        )
+        num_evaluations.append(counting_batch_gap_fct.num_evaluations)
+    assert num_evaluations[0] > 0
+    assert num_evaluations[1] == 0
+    assert cache.num_misses == num_evaluations[0]
+    assert len(results[1].nodes) == len(results[0].nodes)
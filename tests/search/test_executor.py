@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for evaluating the gap function in an executor.
+"""
+# pylint: disable=redefined-outer-name
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+
+def invalid_gap_fct(pos):
+    """
+    Gap function which raises an error.
+    """
+    raise TypeError('Invalid position {}.'.format(pos))
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the node.
+    """
+    return distance_gap_fct(NODE_POSITION)
+
+
+@pytest.fixture(params=['num_workers', 'thread_pool'])
+def executor(request):
+    """
+    Fixture for the different ways of specifying the executor.
+    """
+    if request.param == 'num_workers':
+        yield 2
+    else:
+        with ThreadPoolExecutor(max_workers=2) as thread_pool:
+            yield thread_pool
+
+
+def test_executor(executor, gap_fct, check_nodes):
+    """
+    Test that the node is found when evaluating in an executor.
+    """
+    result = run(
+        gap_fct,
+        initial_mesh_size=2,
+        refinement_stencil=None,
+        executor=executor
+    )
+    check_nodes(result.nodes, NODE_POSITION)
+
+
+def test_executor_shutdown(monkeypatch, gap_fct, check_nodes):
+    """
+    Test that an executor created by the search is shut down outside of the
+    thread which runs the event loop, such that the loop is not blocked.
+    """
+    shutdown_threads = []
+    shutdown = ProcessPoolExecutor.shutdown
+
+    def recording_shutdown(self, *args, **kwargs):
+        shutdown_threads.append(threading.current_thread())
+        return shutdown(self, *args, **kwargs)
+
+    monkeypatch.setattr(ProcessPoolExecutor, 'shutdown', recording_shutdown)
+    result = run(
+        gap_fct, initial_mesh_size=2, refinement_stencil=None, executor=2
+    )
+    check_nodes(result.nodes, NODE_POSITION)
+    assert len(shutdown_threads) == 1
+    assert shutdown_threads[0] is not threading.current_thread()
+
+
+def test_executor_not_picklable(gap_fct):
+    """
+    Test that a gap function which cannot be pickled raises an error when
+    used with a process pool.
+    """
+    with pytest.raises(ValueError):
+        run(lambda pos: gap_fct(pos), executor=2)  # pylint: disable=unnecessary-lambda
+
+
+def test_executor_raises():
+    """
+    Test that an exception in the gap function is raised.
+    """
+    with pytest.raises(TypeError):
+        run(invalid_gap_fct, executor=2)
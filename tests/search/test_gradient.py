@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the search with the gradient-based minimizer.
+"""
+# pylint: disable=redefined-outer-name
+
+import os
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run
+from nodefinder.search.result._minimization import PRECISION_LOSS_STATUS
+
+NODE_POSITIONS = np.array([
+    [0.2, 0.9, 0.6],
+    [0.99, 0.01, 0.0],
+    [0.7, 0.2, 0.8],
+])
+
+INITIAL_SIMPLEX = np.array([[0.1, 0.8, 0.5], [0.3, 0.8, 0.5], [0.1, 1.0, 0.5],
+                            [0.1, 0.8, 0.7]])
+
+MINIMIZE_KWARGS = dict(
+    initial_simplex=INITIAL_SIMPLEX, minimizer='gauss_newton'
+)
+
+
+def get_deltas(pos):
+    return (np.array(pos) - NODE_POSITIONS + 0.5) % 1 - 0.5
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+def gap_fct_with_gradient(pos):
+    """
+    Distance to the nearest node, and its gradient.
+    """
+    deltas = get_deltas(pos)
+    distances = np.linalg.norm(deltas, axis=-1)
+    idx = np.argmin(distances)
+    if distances[idx] == 0:
+        return 0., np.zeros(len(pos))
+    return distances[idx], deltas[idx] / distances[idx]
+
+
+def batch_gap_fct_with_gradient(positions):
+    values, gradients = zip(*[gap_fct_with_gradient(pos) for pos in positions])
+    return np.array(values), np.array(gradients)
+
+
+@pytest.mark.parametrize('use_fake_potential', [False, True])
+def test_search(use_fake_potential, count_evaluations, gap_fct, check_nodes):
+    """
+    Test that the nodes are found with fewer evaluations than with the
+    Nelder-Mead algorithm.
+    """
+    counting_gap_fct = count_evaluations(gap_fct)
+    run(
+        counting_gap_fct,
+        initial_mesh_size=3,
+        use_fake_potential=use_fake_potential
+    )
+    counting_gap_fct_with_gradient = count_evaluations(gap_fct_with_gradient)
+    result = run(
+        counting_gap_fct_with_gradient,
+        initial_mesh_size=3,
+        use_fake_potential=use_fake_potential,
+        minimizer='gauss_newton'
+    )
+    check_nodes(result.nodes, NODE_POSITIONS)
+    assert (
+        counting_gap_fct_with_gradient.num_evaluations <
+        counting_gap_fct.num_evaluations / 5
+    )
+
+
+def test_batch(check_nodes):
+    """
+    Test the gradient-based minimizer with a vectorized gap function.
+    """
+    result = run(
+        batch_gap_fct=batch_gap_fct_with_gradient,
+        initial_mesh_size=3,
+        refinement_stencil=None,
+        minimizer='gauss_newton'
+    )
+    check_nodes(result.nodes, NODE_POSITIONS)
+
+
+def test_fprime_cutoff(minimize):
+    """
+    Test that the minimization of a function without root is aborted by
+    the ``fprime_cutoff`` criterion.
+    """
+    def func(pos):
+        return 1 + np.sum(pos**2), 2 * pos
+
+    result = minimize(
+        func, nelder_mead_kwargs=dict(fprime_cutoff=100), **MINIMIZE_KWARGS
+    )
+    assert result.status == 3
+    assert not result.success
+    result = minimize(func, **MINIMIZE_KWARGS)
+    assert result.status == 0
+    assert np.allclose(result.pos, 0, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    'func', [
+        lambda pos: (1 + np.sum(pos**2), np.zeros_like(pos)),
+        lambda pos: (np.nan, np.ones_like(pos)),
+    ]
+)
+def test_precision_loss(func, minimize):
+    """
+    Test that a minimization which stops because the gradient vanishes or
+    the value is not finite is not considered successful.
+    """
+    result = minimize(func, **MINIMIZE_KWARGS)
+    assert result.status == PRECISION_LOSS_STATUS
+    assert not result.success
+    assert result.num_fev == 1
+
+
+def test_resume_minimization(minimize):
+    """
+    Test that resuming from a checkpoint gives the same result as the
+    uninterrupted minimization.
+    """
+    def func(pos):
+        """
+        Function with local minima, which leads to rejected steps.
+        """
+        value, gradient = gap_fct_with_gradient(pos)
+        value += np.sum(np.sin(10 * pos)**2)
+        gradient += 10 * np.sin(20 * pos)
+        return value, gradient
+
+    checkpoints = []
+    reference = minimize(
+        func, checkpoint=checkpoints.append, **MINIMIZE_KWARGS
+    )
+    assert len(checkpoints) > 10
+    for checkpoint in checkpoints[::5]:
+        with tempfile.NamedTemporaryFile() as named_file:
+            nf.io.save(checkpoint, named_file.name)
+            checkpoint = nf.io.load(named_file.name)
+        result = minimize(func, resume_from=checkpoint, **MINIMIZE_KWARGS)
+        assert np.all(result.pos == reference.pos)
+        assert result.num_fev == reference.num_fev
+        assert result.num_iter == reference.num_iter
+        assert np.all(result.simplex_history == reference.simplex_history)
+
+
+def test_invalid(gap_fct):
+    """
+    Test the errors raised for an unknown minimizer, and for the ensemble
+    minimization and persistent store with the Gauss-Newton minimizer.
+    """
+    with pytest.raises(ValueError):
+        run(gap_fct, minimizer='invalid')
+    with pytest.raises(ValueError):
+        run(
+            gap_fct_with_gradient,
+            minimizer='gauss_newton',
+            ensemble_initial_mesh=True
+        )
+    with tempfile.TemporaryDirectory() as dirname, nf.search.EvaluationStore(
+        os.path.join(dirname, 'evaluations.sqlite'), fingerprint='a'
+    ) as store:
+        with pytest.raises(ValueError):
+            run(
+                gap_fct_with_gradient,
+                minimizer='gauss_newton',
+                evaluation_cache=nf.search.EvaluationCache(store=store)
+            )
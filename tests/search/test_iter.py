@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the generators yielding the nodes during the search.
+"""
+# pylint: disable=redefined-outer-name
+
+import time
+import asyncio
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import iter_search, iter_search_async
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.7, 0.2, 0.8]])
+
+SEARCH_KWARGS = dict(initial_mesh_size=3, refinement_stencil=None)
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+def test_iter_search(gap_fct, check_nodes):
+    """
+    Test that the synchronous generator yields the same nodes as are saved
+    in the final result.
+    """
+    with tempfile.NamedTemporaryFile() as named_file:
+        nodes = list(
+            iter_search(gap_fct, save_file=named_file.name, **SEARCH_KWARGS)
+        )
+        result = nf.io.load(named_file.name).result
+    check_nodes(nodes, NODE_POSITIONS, complete=False)
+    assert sorted(tuple(node.pos) for node in nodes
+                  ) == sorted(tuple(node.pos) for node in result.nodes)
+
+
+def test_iter_search_async(gap_fct, check_nodes):
+    """
+    Test that the asynchronous generator yields nodes while the search is
+    still running.
+    """
+    num_evaluations = []
+
+    def counting_gap_fct(pos):
+        num_evaluations.append(None)
+        return gap_fct(pos)
+
+    async def run():
+        nodes = []
+        num_evaluations_yielded = []
+        async for node in iter_search_async(
+            counting_gap_fct,
+            buffer_size=1,
+            num_minimize_parallel=2,
+            **SEARCH_KWARGS,
+        ):
+            nodes.append(node)
+            num_evaluations_yielded.append(len(num_evaluations))
+        return nodes, num_evaluations_yielded
+
+    nodes, num_evaluations_yielded = asyncio.get_event_loop(
+    ).run_until_complete(run())
+    check_nodes(nodes, NODE_POSITIONS, complete=False)
+    assert len(nodes) == 27
+    assert num_evaluations_yielded[0] < len(num_evaluations) / 2
+
+
+def test_back_pressure(gap_fct):
+    """
+    Test that the search does not run ahead of a blocked consumer.
+    """
+    num_evaluations = []
+
+    def counting_gap_fct(pos):
+        num_evaluations.append(None)
+        return gap_fct(pos)
+
+    nodes = iter_search(
+        counting_gap_fct,
+        buffer_size=1,
+        num_minimize_parallel=1,
+        **SEARCH_KWARGS,
+    )
+    next(nodes)
+    time.sleep(0.5)
+    num_blocked = len(num_evaluations)
+    time.sleep(0.5)
+    assert len(num_evaluations) == num_blocked
+    # Closing the generator early must stop the search.
+    nodes.close()
+
+
+def test_early_break(gap_fct):
+    """
+    Test that the search stops when the consumer stops iterating, even if
+    no further nodes are found.
+    """
+    num_evaluations = []
+    nodes = []
+
+    def counting_gap_fct(pos):
+        num_evaluations.append(None)
+        # No more nodes are found after the first one.
+        return gap_fct(pos) + (1. if nodes else 0.)
+
+    search_kwargs = dict(num_minimize_parallel=1, **SEARCH_KWARGS)
+    for node in iter_search(counting_gap_fct, **search_kwargs):
+        nodes.append(node)
+        break
+    num_stopped = len(num_evaluations)
+    time.sleep(0.2)
+    assert len(num_evaluations) == num_stopped
+
+    # Compare to the evaluations of the complete search.
+    num_evaluations.clear()
+    nf.search.run(counting_gap_fct, **search_kwargs)
+    assert num_stopped < len(num_evaluations) / 4
+
+
+def test_error():
+    """
+    Test that an error in the gap function is raised by the generator.
+    """
+    def invalid_gap_fct(pos):
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        list(iter_search(invalid_gap_fct, **SEARCH_KWARGS))
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the minimizer registry and the pattern search minimizer.
+"""
+# pylint: disable=redefined-outer-name
+
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run
+from nodefinder.search.minimizer import (
+    register_minimizer, root_nelder_mead, root_pattern_search
+)
+from nodefinder.search._minimization._registry import _MINIMIZERS
+
+NODE_POSITIONS = np.array([
+    [0.2, 0.9, 0.6],
+    [0.99, 0.01, 0.0],
+    [0.7, 0.2, 0.8],
+])
+
+INITIAL_SIMPLEX = np.array([[0.1, 0.8, 0.5], [0.3, 0.8, 0.5], [0.1, 1.0, 0.5],
+                            [0.1, 0.8, 0.7]])
+
+MINIMIZE_KWARGS = dict(
+    initial_simplex=INITIAL_SIMPLEX, minimizer='pattern_search'
+)
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+@pytest.mark.parametrize('use_fake_potential', [False, True])
+def test_pattern_search(use_fake_potential, gap_fct, check_nodes):
+    """
+    Test that the nodes are found with the pattern search minimizer.
+    """
+    result = run(
+        gap_fct,
+        initial_mesh_size=3,
+        use_fake_potential=use_fake_potential,
+        minimizer='pattern_search'
+    )
+    check_nodes(result.nodes, NODE_POSITIONS)
+
+
+def test_register_minimizer(gap_fct, check_nodes):
+    """
+    Test that a registered minimizer can be selected by name, and that
+    names cannot be registered twice unless ``overwrite`` is given.
+    """
+    num_calls = 0
+
+    async def counting_nelder_mead(func, **kwargs):
+        nonlocal num_calls
+        num_calls += 1
+        return await root_nelder_mead(func, **kwargs)
+
+    register_minimizer('counting_nelder_mead', counting_nelder_mead)
+    try:
+        result = run(
+            gap_fct, initial_mesh_size=3, minimizer='counting_nelder_mead'
+        )
+        check_nodes(result.nodes, NODE_POSITIONS)
+        assert num_calls > 0
+        with pytest.raises(ValueError):
+            register_minimizer('counting_nelder_mead', root_pattern_search)
+        register_minimizer(
+            'counting_nelder_mead', root_pattern_search, overwrite=True
+        )
+        assert _MINIMIZERS['counting_nelder_mead'] is root_pattern_search
+    finally:
+        del _MINIMIZERS['counting_nelder_mead']
+
+
+def test_minimize(minimize, gap_fct):
+    """
+    Test the pattern search on a function with a minimum which is not a
+    root, and with a root which is not aligned to the coordinate axes.
+    """
+    result = minimize(
+        lambda pos: 1 + np.sum((pos - 0.3)**2), **MINIMIZE_KWARGS
+    )
+    assert result.success
+    assert np.allclose(result.pos, 0.3, atol=1e-4)
+
+    result = minimize(gap_fct, **MINIMIZE_KWARGS)
+    assert result.success
+    assert result.value < 1e-8
+
+
+@pytest.mark.parametrize('minimizer', ['nelder_mead', 'pattern_search'])
+@pytest.mark.parametrize('offset', np.linspace(0, 1, 5, endpoint=False))
+def test_fprime_cutoff(minimizer, offset, minimize, gap_fct):
+    """
+    Test that the same ``fprime_cutoff`` aborts the minimization of a
+    function without root for both the Nelder-Mead algorithm and the
+    pattern search, but not the minimization towards a node.
+    """
+    minimize_kwargs = dict(
+        initial_simplex=INITIAL_SIMPLEX + offset,
+        minimizer=minimizer,
+        nelder_mead_kwargs=dict(fprime_cutoff=3)
+    )
+    result = minimize(gap_fct, **minimize_kwargs)
+    assert result.success
+    assert result.value < 1e-8
+    result = minimize(
+        lambda pos: 1 + np.sum((pos - 0.3)**2), **minimize_kwargs
+    )
+    assert result.status == 3
+
+
+def test_resume_minimization(minimize, gap_fct):
+    """
+    Test that resuming from a checkpoint gives the same result as the
+    uninterrupted minimization.
+    """
+    def func(pos):
+        """
+        Function with local minima, which leads to failed polls.
+        """
+        return gap_fct(pos) + np.sum(np.sin(10 * pos)**2)
+
+    checkpoints = []
+    reference = minimize(
+        func, checkpoint=checkpoints.append, **MINIMIZE_KWARGS
+    )
+    assert len(checkpoints) > 10
+    for checkpoint in checkpoints[::5]:
+        with tempfile.NamedTemporaryFile() as named_file:
+            nf.io.save(checkpoint, named_file.name)
+            checkpoint = nf.io.load(named_file.name)
+        result = minimize(func, resume_from=checkpoint, **MINIMIZE_KWARGS)
+        assert np.all(result.pos == reference.pos)
+        assert result.num_fev == reference.num_fev
+        assert result.num_iter == reference.num_iter
+        assert np.all(result.simplex_history == reference.simplex_history)
+
+
+def test_invalid(gap_fct):
+    """
+    Test the error raised for an unknown minimizer name.
+    """
+    with pytest.raises(ValueError):
+        run(gap_fct, minimizer='invalid')
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the search with a coarse approximation of the gap function.
+"""
+# pylint: disable=redefined-outer-name
+
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run
+from nodefinder.search.result import COARSE_FIDELITY, ACCURATE_FIDELITY
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.7, 0.3, 0.4], [0.1, 0.1, 0.1]])
+
+INITIAL_SIMPLEX = np.array([[0.1, 0.8, 0.5], [0.3, 0.8, 0.5], [0.1, 1.0, 0.5],
+                            [0.1, 0.8, 0.7]])
+
+
+def ripple(pos, phase=0.):
+    """
+    Factor which creates local minima away from the nodes.
+    """
+    return 1.2 + np.prod(np.cos(4 * np.pi * np.array(pos) + phase))
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node, with local minima away from the nodes.
+    """
+    distance = distance_gap_fct(NODE_POSITIONS)
+
+    def inner(pos):
+        return distance(pos) * ripple(pos)
+
+    return inner
+
+
+@pytest.fixture
+def coarse_gap_fct(distance_gap_fct):
+    """
+    Approximation of the gap function, with slightly shifted nodes.
+    """
+    distance = distance_gap_fct(NODE_POSITIONS + 1e-4)
+
+    def inner(pos):
+        return distance(pos) * ripple(pos, phase=0.05)
+
+    return inner
+
+
+def test_search(count_evaluations, gap_fct, coarse_gap_fct, check_nodes):
+    """
+    Test that the nodes are found with much fewer evaluations of the
+    accurate gap function, and that the fidelity of the results is set.
+    """
+    counting_gap_fct = count_evaluations(gap_fct)
+    run(counting_gap_fct, initial_mesh_size=4, refinement_stencil=None)
+    num_evaluations_reference = counting_gap_fct.num_evaluations
+
+    counting_gap_fct = count_evaluations(gap_fct)
+    counting_coarse_gap_fct = count_evaluations(coarse_gap_fct)
+    result = run(
+        counting_gap_fct,
+        coarse_gap_fct=counting_coarse_gap_fct,
+        initial_mesh_size=4,
+        refinement_stencil=None
+    )
+    assert counting_gap_fct.num_evaluations < num_evaluations_reference / 4
+    assert counting_coarse_gap_fct.num_evaluations > counting_gap_fct.num_evaluations
+
+    check_nodes(result.nodes, NODE_POSITIONS)
+
+    with tempfile.NamedTemporaryFile() as named_file:
+        nf.io.save(result, named_file.name)
+        result_loaded = nf.io.load(named_file.name)
+    for res in [result, result_loaded]:
+        assert res.nodes
+        for node in res.nodes:
+            assert node.fidelity == ACCURATE_FIDELITY
+        fidelities = [res.fidelity for res in res.rejected_results]
+        assert COARSE_FIDELITY in fidelities
+        assert set(fidelities) <= {COARSE_FIDELITY, ACCURATE_FIDELITY}
+
+
+def fake_potential(pos):
+    return float('inf') if np.linalg.norm(pos - 0.5) < 0.05 else 0
+
+
+@pytest.mark.parametrize('fake_pot', [None, fake_potential])
+def test_resume_minimization(fake_pot, minimize, gap_fct, coarse_gap_fct):
+    """
+    Test that resuming the minimization from a checkpoint of either step
+    gives the same result as the uninterrupted minimization.
+    """
+    checkpoints = []
+    minimize_kwargs = dict(
+        initial_simplex=INITIAL_SIMPLEX,
+        coarse_func=coarse_gap_fct,
+        coarse_threshold=1e-3,
+        fake_potential=fake_pot
+    )
+    reference = minimize(
+        gap_fct, checkpoint=checkpoints.append, **minimize_kwargs
+    )
+    assert reference.value < 1e-6
+    assert reference.fidelity == ACCURATE_FIDELITY
+    assert reference.ancestor.fidelity == COARSE_FIDELITY
+    assert {checkpoint.fidelity
+            for checkpoint in checkpoints
+            } == {COARSE_FIDELITY, ACCURATE_FIDELITY}
+    for checkpoint in checkpoints[::5]:
+        with tempfile.NamedTemporaryFile() as named_file:
+            nf.io.save(checkpoint, named_file.name)
+            checkpoint = nf.io.load(named_file.name)
+        result = minimize(gap_fct, resume_from=checkpoint, **minimize_kwargs)
+        assert np.all(result.pos == reference.pos)
+        assert result.num_fev == reference.num_fev
+        assert np.all(result.simplex_history == reference.simplex_history)
+
+
+def test_stop_value(minimize, gap_fct):
+    """
+    Test that the Nelder-Mead algorithm stops once the function value is
+    below the stopping value.
+    """
+    result = minimize(
+        gap_fct,
+        initial_simplex=INITIAL_SIMPLEX,
+        nelder_mead_kwargs=dict(stop_value=1e-2)
+    )
+    assert result.value < 1e-2
+    assert result.fun_simplex_history[-2][0] >= 1e-2
+    assert not result.success
+
+
+def test_invalid(gap_fct, coarse_gap_fct):
+    """
+    Test the errors raised for options which cannot be combined with the
+    coarse gap function.
+    """
+    with pytest.raises(ValueError):
+        run(gap_fct, coarse_gap_fct=coarse_gap_fct, ensemble_initial_mesh=True)
+    with pytest.raises(ValueError):
+        run(
+            lambda pos: [gap_fct(pos)],
+            coarse_gap_fct=coarse_gap_fct,
+            num_channels=1
+        )
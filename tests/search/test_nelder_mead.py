@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the concurrent evaluation within the Nelder-Mead algorithm.
+"""
+
+import asyncio
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run
+
+INITIAL_SIMPLEX = np.array([[0.1, 0.1], [0.3, 0.1], [0.1, 0.3]])
+
+
+@pytest.fixture
+def counting_fct():
+    """
+    Create a function which records the maximum number of concurrent
+    evaluations, after the evaluation of the initial simplex.
+    """
+    def inner(func):
+        running = [0]
+        num_calls = [0]
+        inner.max_running = 0
+
+        async def wrapped(pos):
+            running[0] += 1
+            num_calls[0] += 1
+            if num_calls[0] > len(INITIAL_SIMPLEX):
+                inner.max_running = max(inner.max_running, running[0])
+            await asyncio.sleep(0)
+            running[0] -= 1
+            return func(pos)
+
+        return wrapped
+
+    return inner
+
+
+def step_fct(pos):
+    """
+    Function with plateaus, which leads to shrink steps.
+    """
+    return np.floor(10 * np.linalg.norm(pos - 0.5))
+
+
+def smooth_fct(pos):
+    return np.linalg.norm(pos - 0.5)
+
+
+@pytest.mark.parametrize(
+    'func, kwargs', [
+        (step_fct, dict(parallel_shrink=True)),
+        (step_fct, dict(speculative=True)),
+        (smooth_fct, dict(speculative=True)),
+        (smooth_fct, dict(speculative=lambda: True)),
+    ]
+)
+def test_same_result(func, kwargs, counting_fct, minimize):
+    """
+    Test that the concurrent evaluation does not change the result of the
+    minimization, and that evaluations are actually run concurrently.
+    """
+    reference = minimize(
+        counting_fct(func),
+        initial_simplex=INITIAL_SIMPLEX,
+        nelder_mead_kwargs=dict(parallel_shrink=False)
+    )
+    assert counting_fct.max_running == 1
+    result = minimize(
+        counting_fct(func),
+        initial_simplex=INITIAL_SIMPLEX,
+        nelder_mead_kwargs=kwargs
+    )
+    assert counting_fct.max_running > 1
+    assert np.all(result.pos == reference.pos)
+    assert result.num_iter == reference.num_iter
+    assert np.all(result.simplex_history == reference.simplex_history)
+    if kwargs.get('speculative', False):
+        assert result.num_fev > reference.num_fev
+    else:
+        assert result.num_fev == reference.num_fev
+
+
+def test_speculative_disabled(counting_fct, minimize):
+    """
+    Test that the speculative evaluation is not used if the given function
+    returns False.
+    """
+    reference = minimize(
+        counting_fct(smooth_fct), initial_simplex=INITIAL_SIMPLEX
+    )
+    result = minimize(
+        counting_fct(smooth_fct),
+        initial_simplex=INITIAL_SIMPLEX,
+        nelder_mead_kwargs=dict(speculative=lambda: False)
+    )
+    assert result.num_fev == reference.num_fev
+
+
+def test_search_auto():
+    """
+    Test the search with the automatic speculative evaluation.
+    """
+    node_position = np.array([0.2, 0.9, 0.6])
+    result = run(
+        lambda pos: np.linalg.norm(pos - node_position),
+        initial_mesh_size=2,
+        refinement_stencil=None,
+        num_minimize_parallel=4,
+        nelder_mead_kwargs=dict(speculative='auto'),
+    )
+    assert result.nodes
+    for node in result.nodes:
+        assert np.linalg.norm(node.pos - node_position) < 1e-6
+
+
+@pytest.mark.parametrize(
+    'func, kwargs', [
+        (step_fct, dict(parallel_shrink=True)),
+        (step_fct, dict(parallel_shrink=False)),
+        (smooth_fct, dict(speculative=True)),
+    ]
+)
+def test_stored_positions(func, kwargs, minimize):
+    """
+    Test that the positions passed to the function are not changed after
+    the evaluation, such that they can be stored.
+    """
+    evaluations = []
+
+    async def recording_fct(pos):
+        evaluations.append((pos, np.copy(pos)))
+        return func(pos)
+
+    minimize(
+        recording_fct,
+        initial_simplex=INITIAL_SIMPLEX,
+        nelder_mead_kwargs=kwargs
+    )
+    assert len(evaluations) > 20
+    for pos, pos_copy in evaluations:
+        assert np.all(pos == pos_copy)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the priority scheduling of simplices.
+"""
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import tempfile
+
+import pytest
+import numpy as np
+from fsc.async_tools import wrap_to_coroutine
+
+import nodefinder as nf
+from nodefinder.search import run, EvaluationCache
+from nodefinder.search._queue import SimplexQueue
+from nodefinder.search._controller import Controller
+
+SIMPLICES = [[[float(i), 0.], [float(i), 1.], [float(i), 2.]]
+             for i in range(4)]
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the node.
+    """
+    return distance_gap_fct(NODE_POSITION)
+
+
+def test_queue_order():
+    """
+    Test that simplices are returned in the order of their priority, and in
+    insertion order for equal priorities.
+    """
+    queue = SimplexQueue(SIMPLICES, priorities=[1, 0, 1, 0])
+    order = [queue.pop_queued()[0][0] for _ in range(4)]
+    assert order == [1., 3., 0., 2.]
+
+
+def test_queue_fifo():
+    """
+    Test that the queue is FIFO if no priorities are given.
+    """
+    queue = SimplexQueue(SIMPLICES)
+    queue.add_objects([[[5., 0.], [5., 1.], [5., 2.]]])
+    order = [queue.pop_queued()[0][0] for _ in range(5)]
+    assert order == [0., 1., 2., 3., 5.]
+
+
+def test_queue_save_load():
+    """
+    Test that the priorities (including those of running simplices) are
+    kept when saving and loading the queue.
+    """
+    queue = SimplexQueue(SIMPLICES, priorities=[3, 2, 1, 0])
+    running = queue.pop_queued()
+    with tempfile.NamedTemporaryFile() as named_file:
+        nf.io.save(queue, named_file.name)
+        queue_loaded = nf.io.load(named_file.name)
+    assert queue_loaded.num_running == 0
+    assert queue_loaded.objects == queue.objects
+    assert queue_loaded.priorities == [0., 1., 2., 3.]
+    assert queue_loaded.pop_queued() == running
+
+
+@pytest.mark.parametrize(
+    'simplex_priority', [
+        'refinement_first', 'lowest_value_first', 'node_distance_first',
+        lambda simplex, *, is_refinement, result, vertex_values: -simplex[0][0]
+    ]
+)
+def test_search_priority(simplex_priority, gap_fct, check_nodes):
+    """
+    Test that a nodal point is found with the different priority policies.
+    """
+    result = run(
+        gap_fct,
+        initial_mesh_size=2,
+        feature_size=0.1,
+        simplex_priority=simplex_priority,
+    )
+    check_nodes(result.nodes, NODE_POSITION)
+
+
+def _get_queued_simplices(gap_fct, simplex_priority, evaluation_cache=None):
+    """
+    Get the initial simplices of a search in the order they would be
+    minimized.
+    """
+    controller = Controller(
+        gap_fct=gap_fct,
+        limits=[(0, 1)] * 3,
+        periodic=True,
+        initial_state=None,
+        save_file=None,
+        load=False,
+        load_quiet=True,
+        initial_mesh_size=2,
+        force_initial_mesh=False,
+        gap_threshold=1e-6,
+        feature_size=0.1,
+        nelder_mead_kwargs={},
+        num_minimize_parallel=1,
+        refinement_stencil=None,
+        simplex_priority=simplex_priority,
+        evaluation_cache=evaluation_cache,
+    )
+    queue = controller.state.simplex_queue
+    simplices = []
+    while queue.has_queued:
+        simplices.append(queue.pop_queued())
+    return simplices
+
+
+def test_lowest_value_order(gap_fct):
+    """
+    Test that the 'lowest_value_first' policy minimizes the simplices with
+    the lowest cached vertex value first, which differs from the order of
+    the 'refinement_first' policy.
+    """
+    default_order = _get_queued_simplices(gap_fct, 'refinement_first')
+    cache = EvaluationCache(tolerance=1e-8)
+    gap_coroutine = wrap_to_coroutine(gap_fct)
+
+    async def fill_cache():
+        for simplex in default_order:
+            for pos in simplex:
+                await cache.evaluate(gap_coroutine, pos)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(fill_cache())
+    finally:
+        loop.close()
+
+    value_order = _get_queued_simplices(
+        gap_fct, 'lowest_value_first', evaluation_cache=cache
+    )
+    min_values = [
+        min(gap_fct(pos) for pos in simplex) for simplex in value_order
+    ]
+    assert min_values == sorted(min_values)
+    assert value_order != default_order
+    assert sorted(map(str, value_order)) == sorted(map(str, default_order))
+
+
+def test_invalid_priority():
+    """
+    Test that an invalid priority policy name raises an error.
+    """
+    with pytest.raises(ValueError):
+        run(lambda pos: 1., simplex_priority='invalid')
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the saturation stopping criterion.
+"""
+# pylint: disable=redefined-outer-name
+
+import tempfile
+
+import pytest
+import numpy as np
+
+import nodefinder as nf
+from nodefinder.search import run
+
+NODE_POSITIONS = np.array([[0.2, 0.9, 0.6], [0.99, 0.01, 0.0], [0.7, 0.2,
+                                                                0.8]])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+def test_saturation(gap_fct, check_nodes):
+    """
+    Test that the search is stopped once no new nodes are found, and that it
+    can be resumed.
+    """
+    reference = run(gap_fct, initial_mesh_size=3)
+    assert reference.saturation_statistics is None
+    with tempfile.NamedTemporaryFile() as named_file:
+        result = run(
+            gap_fct,
+            initial_mesh_size=3,
+            saturation_window=20,
+            save_file=named_file.name
+        )
+        assert result.stop_reason == 'saturation'
+        check_nodes(result.nodes, NODE_POSITIONS)
+        statistics = result.saturation_statistics
+        assert statistics['saturation_window'] == 20
+        assert statistics['num_since_new_node'] == 20
+        assert statistics['num_new_nodes'] == len(NODE_POSITIONS)
+        assert statistics['num_fev'] < sum(
+            res.num_fev for res in reference.minimization_results
+        ) / 2
+        assert nf.io.load(
+            named_file.name
+        ).result.saturation_statistics == statistics
+
+        result = run(
+            gap_fct, initial_mesh_size=3, save_file=named_file.name, load=True
+        )
+        assert result.complete
+        check_nodes(result.nodes, NODE_POSITIONS)
+
+
+def test_invalid_window(gap_fct):
+    """
+    Test that a window which is not positive raises an error.
+    """
+    with pytest.raises(ValueError):
+        run(gap_fct, initial_mesh_size=3, saturation_window=0)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for running the search as a server, with minimizations distributed to
+worker processes.
+"""
+# pylint: disable=redefined-outer-name
+
+import os
+import asyncio
+import multiprocessing
+from functools import partial
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run, run_worker, run_worker_async
+from nodefinder.search._server import _answer_challenge, _send
+
+NODE_POSITIONS = np.array([[0.2, 0.4], [0.7, 0.9]])
+
+CRASH_AFTER = 30
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the closest node.
+    """
+    return distance_gap_fct(NODE_POSITIONS)
+
+
+def crashing_gap_fct(pos, *, gap_fct):
+    """
+    Gap function of a worker which dies after a few evaluations.
+    """
+    crashing_gap_fct.count += 1
+    if crashing_gap_fct.count > CRASH_AFTER:
+        os._exit(1)  # pylint: disable=protected-access
+    return gap_fct(pos)
+
+
+crashing_gap_fct.count = 0
+
+
+@pytest.fixture
+def server_address(tmpdir):
+    return str(tmpdir.join('server.sock'))
+
+
+@pytest.fixture
+def start_workers(server_address):
+    """
+    Start worker processes for the given gap functions.
+    """
+    processes = []
+
+    def inner(*gap_fcts):
+        for fct in gap_fcts:
+            proc = multiprocessing.Process(
+                target=run_worker,
+                args=(fct, ),
+                kwargs=dict(
+                    server_address=server_address, num_minimize_parallel=3
+                )
+            )
+            proc.start()
+            processes.append(proc)
+        return processes
+
+    yield inner
+    for proc in processes:
+        proc.join(timeout=10)
+        if proc.is_alive():
+            proc.terminate()
+
+
+@pytest.fixture
+def check_result(check_nodes):
+    """
+    Check that the search finished and found all nodes.
+    """
+    def inner(result):
+        assert result.complete
+        check_nodes(result.nodes, NODE_POSITIONS)
+
+    return inner
+
+
+@pytest.mark.parametrize('use_fake_potential', [True, False])
+def test_server(
+    server_address, start_workers, use_fake_potential, gap_fct, check_result
+):
+    """
+    Test that the search server finds all nodes using multiple workers.
+    """
+    processes = start_workers(gap_fct, gap_fct)
+    result = run(
+        limits=[(0, 1)] * 2,
+        initial_mesh_size=3,
+        use_fake_potential=use_fake_potential,
+        server_address=server_address,
+        deadline=60,
+    )
+    check_result(result)
+    for proc in processes:
+        proc.join(timeout=10)
+        assert proc.exitcode == 0
+
+
+def test_worker_crash(server_address, start_workers, gap_fct, check_result):
+    """
+    Test that the simplices of a worker which dies during the search are
+    re-queued and finished by the remaining worker.
+    """
+    processes = start_workers(
+        partial(crashing_gap_fct, gap_fct=gap_fct), gap_fct
+    )
+    result = run(
+        limits=[(0, 1)] * 2,
+        initial_mesh_size=3,
+        server_address=server_address,
+        deadline=60,
+    )
+    check_result(result)
+    assert processes[0].exitcode == 1
+
+
+def test_invalid_authkey(server_address, gap_fct):
+    """
+    Test that a worker using a different authkey is rejected.
+    """
+    proc = multiprocessing.Process(
+        target=run,
+        kwargs=dict(
+            limits=[(0, 1)] * 2,
+            initial_mesh_size=3,
+            server_address=server_address,
+            deadline=5,
+        )
+    )
+    proc.start()
+    try:
+        with pytest.raises(multiprocessing.AuthenticationError):
+            run_worker(
+                gap_fct,
+                server_address=server_address,
+                server_authkey=b'invalid',
+            )
+    finally:
+        proc.join()
+
+
+def test_invalid_server_authkey(server_address, gap_fct):
+    """
+    Test that a worker rejects a server using a different authkey, before
+    receiving any pickled data from it.
+    """
+    unpickled = []
+
+    class Payload:
+        def __reduce__(self):
+            return (unpickled.append, (None, ))
+
+    async def handle_worker(reader, writer):
+        # Skip checking the worker's response to the challenge.
+        writer.write(os.urandom(32))
+        await reader.readexactly(32)
+        await _answer_challenge(reader, writer, b'invalid')
+        await _send(writer, Payload())
+        writer.close()
+
+    async def run_test():
+        server = await asyncio.start_unix_server(
+            handle_worker, path=server_address
+        )
+        try:
+            with pytest.raises(multiprocessing.AuthenticationError):
+                await asyncio.wait_for(
+                    run_worker_async(gap_fct, server_address=server_address),
+                    timeout=10
+                )
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.new_event_loop().run_until_complete(run_test())
+    assert not unpickled
+
+
+def test_server_gap_fct(gap_fct):
+    """
+    Test that passing a gap function to the search server raises an error.
+    """
+    with pytest.raises(ValueError):
+        run(gap_fct, server_address='unused.sock')
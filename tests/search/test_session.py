@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the search session.
+"""
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import concurrent.futures
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run, SearchSession
+from nodefinder.search import _session
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+SEARCH_KWARGS = dict(initial_mesh_size=2, feature_size=0.1)
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the node.
+    """
+    return distance_gap_fct(NODE_POSITION)
+
+
+@pytest.fixture
+def slow_gap_fct(gap_fct):
+    """
+    Coroutine gap function which takes some time to evaluate.
+    """
+    async def inner(pos):
+        await asyncio.sleep(0.01)
+        return gap_fct(pos)
+
+    return inner
+
+
+def check_result(result, reference):
+    assert [res.pos.tolist() for res in result.minimization_results
+            ] == [res.pos.tolist() for res in reference.minimization_results]
+
+
+def test_same_result(gap_fct):
+    """
+    Test that running the search in a session gives the same result as
+    running it directly.
+    """
+    reference = run(gap_fct, **SEARCH_KWARGS)
+    with SearchSession() as session:
+        for _ in range(3):
+            check_result(session.run(gap_fct, **SEARCH_KWARGS), reference)
+
+
+def test_stencil_cached(monkeypatch, gap_fct):
+    """
+    Test that the refinement stencil is created only once per dimension.
+    """
+    dimensions = []
+
+    def counting_get_auto_stencil(*, dim):
+        dimensions.append(dim)
+        return np.array(get_auto_stencil(dim=dim))
+
+    get_auto_stencil = _session.get_auto_stencil
+    monkeypatch.setattr(
+        _session, 'get_auto_stencil', counting_get_auto_stencil
+    )
+    with SearchSession() as session:
+        for _ in range(3):
+            session.run(gap_fct, **SEARCH_KWARGS)
+        session.run(
+            lambda pos: np.linalg.norm(pos - 0.3),
+            limits=[(0, 1), (0, 1)],
+            initial_mesh_size=2,
+            feature_size=0.1
+        )
+    assert dimensions == [3, 2]
+
+
+def test_executor(gap_fct, check_nodes):
+    """
+    Test that the executor of the session is used for all searches, and
+    shut down when the session is closed.
+    """
+    with SearchSession(executor=1) as session:
+        executor = session.executor
+        for _ in range(2):
+            check_nodes(
+                session.run(gap_fct, **SEARCH_KWARGS).nodes, NODE_POSITION
+            )
+    with pytest.raises(RuntimeError):
+        executor.submit(gap_fct, NODE_POSITION)
+
+
+def test_submit(slow_gap_fct, check_nodes):
+    """
+    Test running several searches concurrently in the session.
+    """
+    with SearchSession() as session:
+        futures = [
+            session.submit(slow_gap_fct, **SEARCH_KWARGS) for _ in range(3)
+        ]
+        for fut in futures:
+            check_nodes(fut.result().nodes, NODE_POSITION)
+
+
+def test_close(gap_fct, slow_gap_fct):
+    """
+    Test that closing the session cancels the running searches, and that
+    no new searches can be started.
+    """
+    session = SearchSession()
+    future = session.submit(slow_gap_fct, initial_mesh_size=10)
+    session.close()
+    assert session.closed
+    with pytest.raises(concurrent.futures.CancelledError):
+        future.result()
+    with pytest.raises(ValueError):
+        session.run(gap_fct, **SEARCH_KWARGS)
+
+
+def test_running_loop(gap_fct):
+    """
+    Test using the session from within a running event loop.
+    """
+    reference = run(gap_fct, **SEARCH_KWARGS)
+
+    async def run_search(session):
+        return await asyncio.wrap_future(
+            session.submit(gap_fct, **SEARCH_KWARGS)
+        )
+
+    with SearchSession() as session:
+        result = asyncio.get_event_loop().run_until_complete(
+            run_search(session)
+        )
+    check_result(result, reference)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# © 2017-2019, ETH Zurich, Institut für Theoretische Physik
+# Author: Dominik Gresch <greschd@gmx.ch>
+"""
+Tests for the persistent store of the gap function evaluations.
+"""
+# pylint: disable=redefined-outer-name
+
+import os
+import tempfile
+
+import pytest
+import numpy as np
+
+from nodefinder.search import run, EvaluationCache, EvaluationStore
+
+NODE_POSITION = np.array([0.2, 0.9, 0.6])
+
+
+@pytest.fixture
+def gap_fct(distance_gap_fct):
+    """
+    Distance to the node.
+    """
+    return distance_gap_fct(NODE_POSITION)
+
+
+@pytest.fixture
+def store_file():
+    """
+    Get the path of a database file which does not exist yet.
+    """
+    with tempfile.TemporaryDirectory() as dirname:
+        yield os.path.join(dirname, 'evaluations.sqlite')
+
+
+def test_store(store_file):
+    """
+    Test adding and getting values, with pending and written values.
+    """
+    keys = [(i, -i, 2**40 + i) for i in range(5)]
+    with EvaluationStore(store_file, fingerprint='a', batch_size=3) as store:
+        for i, key in enumerate(keys):
+            store.add(key, i, tolerance=1e-10)
+        assert len(store._pending) == 2  # pylint: disable=protected-access
+        store.add((1, 2, 3), float('nan'), tolerance=1e-10)
+        for i, key in enumerate(keys):
+            assert store.get(key, tolerance=1e-10) == i
+        assert store.get(keys[0], tolerance=1e-9) is None
+    assert store.closed
+
+    with EvaluationStore(store_file, fingerprint='a') as store:
+        assert len(store) == 6
+        for i, key in enumerate(keys):
+            assert store.get(key, tolerance=1e-10) == i
+        assert np.isnan(store.get((1, 2, 3), tolerance=1e-10))
+        assert store.get((3, 2, 1), tolerance=1e-10) is None
+    with EvaluationStore(store_file, fingerprint='b') as store:
+        assert len(store) == 0
+        assert store.get(keys[0], tolerance=1e-10) is None
+
+
+@pytest.mark.parametrize(
+    'rerun_kwargs', [
+        dict(),
+        dict(feature_size=0.1),
+        dict(gap_threshold=1e-4),
+    ]
+)
+def test_rerun(store_file, rerun_kwargs, gap_fct, check_nodes):
+    """
+    Test that a search which is re-run with different parameters uses the
+    values stored by the previous run.
+    """
+    def search(**kwargs):
+        num_evaluations = []
+
+        def counting_gap_fct(pos):
+            num_evaluations.append(None)
+            return gap_fct(pos)
+
+        with EvaluationStore(store_file, fingerprint='gap_fct') as store:
+            cache = EvaluationCache(store=store)
+            result = run(
+                counting_gap_fct,
+                initial_mesh_size=2,
+                evaluation_cache=cache,
+                **kwargs
+            )
+        check_nodes(result.nodes, NODE_POSITION, tol=1e-4)
+        assert len(num_evaluations) == cache.num_misses
+        return cache
+
+    first_cache = search(feature_size=0.05)
+    assert first_cache.num_store_hits == 0
+    second_cache = search(**{'feature_size': 0.05, **rerun_kwargs})
+    assert second_cache.num_store_hits > 0
+    assert second_cache.num_misses < first_cache.num_misses
+    if not rerun_kwargs:
+        assert second_cache.num_misses == 0
+
+
+def test_invalid_batch_size(store_file):
+    """
+    Test that a batch size which is not positive raises an error.
+    """
+    with pytest.raises(ValueError):
+        EvaluationStore(store_file, fingerprint='a', batch_size=0)